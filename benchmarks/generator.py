@@ -0,0 +1,67 @@
+"""
+Seeded generator of synthetic contacts for the benchmarks.
+
+Names are built from small lists of first and last names, so many contacts share a part
+of the name (and a repeated full name gets a number), phones come in the formats people
+type them, about 80% of the contacts have a birthday and some of them are born on 02-29.
+"""
+import random
+import typing as t
+
+FIRST_NAMES = (
+    "Anna", "Andrey", "Bohdan", "Daria", "Dmytro", "Iryna", "Ivan", "Kateryna", "Maksym",
+    "Mariia", "Mykola", "Nadiia", "Oleh", "Olga", "Oksana", "Petro", "Roman", "Serg",
+    "Sofiia", "Taras", "Viktor", "Yulia", "Yurii", "Zlata",
+)
+LAST_NAMES = (
+    "Bondar", "Boyko", "Hnatiuk", "Kovalenko", "Koval", "Kravchenko", "Lysenko", "Melnyk",
+    "Moroz", "Oliynyk", "Petrenko", "Savchenko", "Shevchenko", "Shevchuk", "Tkachenko",
+    "Tkachuk", "Vasylenko", "Zinchenko",
+)
+OPERATORS = ("50", "63", "66", "67", "68", "73", "93", "95", "96", "97", "98", "99")
+LEAP_YEARS = tuple(year for year in range(1952, 2012, 4))
+
+
+def phone(rnd: random.Random) -> str:
+    operator, number = rnd.choice(OPERATORS), f"{rnd.randrange(10**7):07d}"
+    style = rnd.random()
+    if style < 0.4:
+        return f"380{operator}{number}"
+    if style < 0.7:
+        return f"+38 (0{operator}) {number[:3]}-{number[3:5]}-{number[5:]}"
+    return f"0{operator}-{number[:3]}-{number[3:]}"
+
+
+def birthday(rnd: random.Random) -> str | None:
+    chance = rnd.random()
+    if chance < 0.2:
+        return None
+    if chance < 0.21: # ~1% родились 29 февраля
+        return f"{rnd.choice(LEAP_YEARS)}-02-29"
+    return f"{rnd.randint(1950, 2010)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}"
+
+
+def contacts(count: int, seed: int = 12) -> t.Iterator[tuple[str, list[str], str | None]]:
+    """
+    Generate (name, phones, birthday) of count contacts with unique names, the same for a seed.
+    """
+    rnd = random.Random(seed)
+    seen: dict[str, int] = {}
+    for _ in range(count):
+        name = f"{rnd.choice(FIRST_NAMES)}{rnd.choice(LAST_NAMES)}"
+        number = seen.get(name, 0) + 1
+        seen[name] = number
+        if number > 1: # совпадение имени - как в жизни добавляем номер
+            name = f"{name}{number}"
+        phones = [phone(rnd) for _ in range(rnd.choice((1, 1, 1, 2, 2, 3)))]
+        yield name, phones, birthday(rnd)
+
+
+def book_dict(count: int, seed: int = 12) -> dict[str, dict]:
+    """
+    Contacts in the format of AddressBook.to_dict / the JSON file.
+    """
+    return {
+        name: {"phones": phones, "birthday": bday}
+        for name, phones, bday in contacts(count, seed)
+    }
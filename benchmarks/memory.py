@@ -0,0 +1,33 @@
+"""
+Memory per contact of an in-memory AddressBook.
+
+    python benchmarks/memory.py --count 1000000
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from package import AddressBook, Record
+from generator import contacts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    a_book = AddressBook()
+    for name, phones, birthday in contacts(args.count):
+        a_book.add_record(Record(name, phones, birthday))
+    current, peak = tracemalloc.get_traced_memory()
+    print(f"contacts: {len(a_book)}")
+    print(f"total: {current / 2**20:.1f} MiB (peak {peak / 2**20:.1f} MiB)")
+    print(f"per contact: {current / len(a_book):.0f} bytes")
+
+
+if __name__ == "__main__":
+    main()
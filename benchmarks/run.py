@@ -0,0 +1,152 @@
+"""
+Benchmarks of the hot paths of the address book on generated contacts, results as JSON.
+
+    python benchmarks/run.py --sizes 1000 100000 1000000 --output results.json
+
+Every result is {"size", "name", "seconds", "calls", "per_call_us"}, "seconds" is the best
+of --repeat runs (a run that changes the book is done on a fresh copy each time).
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import typing as t
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from package import AddressBook, AddressBookEncoder
+from package.query import BirthdayMonth, NameContains, PhoneContains, PhoneStartsWith
+from generator import book_dict
+
+
+def best(func: t.Callable[[], t.Any], repeat: int, setup: t.Callable[[], t.Any] | None = None) -> float:
+    times = []
+    for _ in range(repeat):
+        args = (setup(),) if setup else ()
+        gc.collect()
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def import_bot() -> t.Any:
+    """
+    Import main.py (it opens test.json of the current directory) from an empty temporary directory.
+    """
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix="bench-bot-"))
+    os.environ["BOT_STORAGE"] = "json"
+    try:
+        import main
+    finally:
+        os.chdir(cwd)
+    return main
+
+
+def bench_size(size: int, seed: int, repeat: int) -> t.Iterator[tuple[str, float, int]]:
+    data = book_dict(size, seed)
+    rnd = random.Random(seed)
+    names = rnd.sample(list(data), min(size, 1000))
+
+    yield "from_dict", best(lambda: AddressBook().from_dict(data), repeat), size
+    yield "from_dict_lazy", best(lambda: AddressBook().from_dict(data, lazy=True), repeat), size
+
+    book = AddressBook()
+    book.from_dict(data)
+    words = [name[:5] for name in names[:20]] + ["380", "02-29", "Koval", "nobody"]
+    fresh_books = []
+
+    def fresh_book() -> AddressBook:
+        if fresh_books: # большая книга строит индекс в фоне - дожидаемся, чтобы не мешал замерам
+            fresh_books.pop()._search_index()
+        fresh_books.append(_fresh(data))
+        return fresh_books[-1]
+    yield "search_first", best(lambda fresh: fresh.search("Ivan"), repeat, setup=fresh_book), 1
+    fresh_books.pop()._search_index()
+    yield "search_index", best(lambda fresh: fresh._search_index(), repeat, setup=lambda: _fresh(data)), size
+    book._search_index() # индекс, который иначе строился бы в фоне
+    yield "search", best(lambda: [book._search(word) for word in words], repeat), len(words) # без кэша
+    yield "search_cached", best(lambda: [book.search(word) for word in words], repeat), len(words)
+    typos = [name[:3] + name[4:] for name in names[:20]] # пропущена одна буква
+    book.closest_names(typos[0]) # индекс строится первым запросом
+    yield "closest_names", best(lambda: [book.closest_names(name) for name in typos], repeat), len(typos)
+
+    query = BirthdayMonth(6) & PhoneStartsWith("38066") & NameContains("an")
+    yield "find", best(lambda: book.find(query, limit=20), repeat), 1
+    scan = NameContains("an") & PhoneContains("77") # короткие слова - без индекса
+    yield "find_scan", best(lambda: book.find(scan, limit=20), repeat), 1
+    yield "iterator_pages", best(lambda: sum(1 for _ in book.iterator(100)), repeat), max(size // 100, 1)
+    yield "days_to_birthday", best(
+        lambda: [book[name].days_to_birthday() for name in names if book[name].birthday], repeat
+    ), sum(1 for name in names if book[name].birthday)
+    today = date.today()
+    yield "upcoming_7", best(lambda: book.upcoming(7, today), repeat), 1
+    yield "to_dict", best(book.to_dict, repeat), size
+    yield "save_json", best(
+        lambda: json.dumps(book, cls=AddressBookEncoder, sort_keys=True, indent=4), repeat
+    ), size
+
+
+def _fresh(data: dict) -> AddressBook:
+    book = AddressBook()
+    book.from_dict(data)
+    return book
+
+
+def bench_parser(bot: t.Any, repeat: int) -> tuple[str, float, int]:
+    lines = [
+        "add AnnaKoval 0501234567", "add phone AnnaKoval 0671234567", "change phone a 1 2",
+        "change birthday a 2000-01-01", "search Koval", "show all", "show page 10", "days a",
+        "delete a", "hello", "good bye", "unknown command here", "+ a 0501234567", "who 050",
+    ] * 1000
+    parse = bot.command_parser
+    return "command_parser", best(lambda: [parse(line) for line in lines], repeat), len(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--seed", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the JSON to a file instead of stdout")
+    args = parser.parse_args()
+
+    results = []
+    def add(size: int, name: str, seconds: float, calls: int) -> None:
+        results.append({
+            "size": size, "name": name, "seconds": round(seconds, 6), "calls": calls,
+            "per_call_us": round(seconds / max(calls, 1) * 1e6, 3),
+        })
+        print(f"{size:>9} {name:<18} {seconds:10.4f} s", file=sys.stderr)
+
+    for size in args.sizes:
+        for name, seconds, calls in bench_size(size, args.seed, args.repeat):
+            add(size, name, seconds, calls)
+    add(0, *bench_parser(import_bot(), args.repeat))
+
+    report = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
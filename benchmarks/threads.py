@@ -0,0 +1,112 @@
+"""
+Stress test of ThreadSafeAddressBook: reader threads search, page and export the book
+while a writer changes phones, adds and deletes contacts.
+
+Prints the reads per second for every number of reader threads and fails
+if a reader saw a half-done change or got an exception.
+
+    python benchmarks/threads.py --count 50000 --threads 1 2 4 8
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from package import Record, ThreadSafeAddressBook
+from generator import contacts
+
+SERIAL = itertools.count() # новые номера и имена писателя не повторяются между прогонами
+
+
+def check(record: Record) -> None:
+    # писатель меняет номера парами - у контакта всегда ровно два телефона
+    if len(record.phones) != 2 or record.phones[0] == record.phones[1]:
+        raise AssertionError(f"torn record {record!r}")
+
+
+def reader(
+        book: ThreadSafeAddressBook, names: list[str], stop: threading.Event, 
+        seed: int, counts: list, errors: list
+    ) -> None:
+    rnd = random.Random(seed)
+    done = 0
+    try:
+        while not stop.is_set():
+            kind = rnd.random()
+            if kind < 0.7:
+                for record in book.search(rnd.choice(names)):
+                    check(record)
+            elif kind < 0.9:
+                for page in book.iterator(1000):
+                    for record in page[:10]:
+                        check(record)
+                    break
+            else:
+                for data in book.to_dict().values():
+                    if len(data["phones"]) != 2:
+                        raise AssertionError(f"torn export {data}")
+            done += 1
+    except Exception as err:
+        errors.append(err)
+    counts.append(done)
+
+
+def writer(book: ThreadSafeAddressBook, names: list[str], stop: threading.Event, errors: list) -> None:
+    rnd = random.Random(0)
+    try:
+        while not stop.is_set():
+            new = next(SERIAL)
+            record = book[rnd.choice(names)]
+            old = record.phones[0].value
+            record.change_phone(old, f"38099{new:07d}")
+            name = f"New{new}"
+            book.add_record(Record(name, ["380500000001", "380500000002"]))
+            del book[name]
+    except Exception as err:
+        errors.append(err)
+
+
+def run(book: ThreadSafeAddressBook, names: list[str], threads: int, seconds: float) -> float:
+    stop, counts, errors = threading.Event(), [], []
+    workers = [
+        threading.Thread(target=reader, args=(book, names, stop, seed, counts, errors))
+        for seed in range(threads)
+    ]
+    workers.append(threading.Thread(target=writer, args=(book, names, stop, errors)))
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    if errors:
+        raise errors[0]
+    return sum(counts) / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=50_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+
+    book, names = ThreadSafeAddressBook(), []
+    for name, _, birthday in contacts(args.count):
+        book.add_record(Record(name, [f"380{len(book):09d}", f"381{len(book):09d}"], birthday))
+        names.append(name)
+    book.search(names[0]) # индекс строится один раз до замеров
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"contacts: {args.count}, cpus: {os.cpu_count()}, GIL: {'on' if gil else 'off'}")
+    for threads in args.threads:
+        print(f"{threads} readers: {run(book, names, threads, args.seconds):.0f} reads/s")
+
+
+if __name__ == "__main__":
+    main()
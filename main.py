@@ -1,16 +1,180 @@
-from package import AddressBook, Record, wraps, json, Phone, AddressBookEncoder
-import re
+from package import (
+    AddressBook, Record, wraps, json, Phone, Journal, load_json, save_json,
+    SQLiteAddressBook, SnapshotAddressBook, json_to_snapshot, write_snapshot, ParallelSearch,
+    ShardedAddressBook, Metrics, NameNotFoundError, AutoSaver,
+)
+from package.query import parse_query
+from contextlib import nullcontext
+from itertools import islice
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import typing as t
+try:
+    import readline # нет на Windows - тогда без автодополнения
+except ImportError:
+    readline = None
 
+storage = os.environ.get("BOT_STORAGE", "json") # json, snapshot, sharded или sqlite
 file_json  = "test.json"
-a_book = AddressBook() 
-try:
-    with open(file_json, "r") as file:
-        unpacked = json.load(file)
-    a_book.from_dict(unpacked)
-except FileNotFoundError:
-    with open(file_json, "w") as file:
-        json.dump({}, file)
+file_snapshot = "test.snapshot"
+dir_shards = "test.shards"
+file_sqlite = "test.sqlite3"
+journal_file = "test.journal" # изменения после последнего сохранения книги
+AUTOSAVE_INTERVAL = 5.0 # секунд между фоновыми сохранениями, не чаще
+SUGGESTIONS = 3 # имен в подсказке "Did you mean" при опечатке в имени
+FUZZY_LIMIT = 10
+OUTPUT_BLOCK = 1000 # ответов (частей вывода) batch в памяти до записи в out
+
+def open_book() -> AddressBook:
+    """
+    Open the address book in the storage chosen by BOT_STORAGE.
+    """
+    if storage == "sqlite":
+        book = SQLiteAddressBook(file_sqlite)
+        if not len(book) and os.path.exists(file_json): # первый запуск - переносим контакты
+            load_json(book, file_json)
+        return book
+    
+    if storage == "snapshot":
+        if not os.path.exists(file_snapshot):
+            if os.path.exists(file_json):
+                json_to_snapshot(file_json, file_snapshot)
+            else:
+                write_snapshot(AddressBook(), file_snapshot)
+        return SnapshotAddressBook(file_snapshot) # читается с диска только по запросу
+
+    if storage == "sharded":
+        new = not os.path.exists(dir_shards)
+        book = ShardedAddressBook(dir_shards)
+        if new and os.path.exists(file_json): # первый запуск - переносим контакты
+            load_json(book, file_json, lazy=True)
+            book.save()
+        return book
+    
+    book = AddressBook() 
+    try:
+        # читаем по одному контакту, Record создается только при первом обращении
+        load_json(book, file_json, lazy=True)
+    except FileNotFoundError:
+        with open(file_json, "w") as file:
+            json.dump({}, file)
+    return book
+
+def save_book(journal_seq: int = 0) -> None:
+    """
+    Save the book with the number of the last journal entry in it (see Journal.compact).
+    """
+    generation = a_book.generation
+    a_book.journal_seq = journal_seq
+    if storage == "snapshot":
+        a_book.save(file_snapshot)
+    elif storage == "sharded":
+        a_book.save() # только измененные шарды
+    else:
+        save_json(a_book, file_json)
+    a_book.mark_saved(generation)
+
+def capture_book() -> t.Callable[[], None]:
+    """
+    Take the book for the background save and rotate the journal (called under command_lock),
+    the returned function copies and writes the book and drops the rotated journal.
+    Under the lock only references to the contact data are taken, so commands wait 
+    neither for the conversion nor for the disk.
+    """
+    journal_seq = a_book.journal_seq = journal.seq # все записи до ротации уже в книге
+    if storage == "sharded":
+        write_book = a_book.prepare_save()
+    else:
+        copy = a_book._capture()
+
+        def write_book() -> None:
+            book = copy()
+            book.journal_seq = journal_seq
+            if storage == "snapshot":
+                write_snapshot(book, file_snapshot)
+            else:
+                save_json(book, file_json)
+    journal.rotate()
+
+    def write() -> None:
+        write_book()
+        journal.drop_rotated()
+    return write
+
+a_book = open_book()
+a_book.mark_saved() # все, что загружено, уже на диске
+searcher = ParallelSearch(a_book) # процессы запускаются только для большой книги
+if storage == "sqlite":
+    journal = None # каждая команда и так пишется в базу своей транзакцией
+else:
+    journal = Journal(journal_file)
+    journal.replay(a_book)
+command_lock = threading.Lock() # команды и снимок книги для фонового сохранения
+autosaver: AutoSaver | None = None # запускается в интерактивном режиме
+
+def log_change(operation: str, *args) -> None:
+    """
+    Write a change of the address book to the journal and wake up the background saver,
+    without it - when the journal is too long save the book and truncate it.
+    """
+    if journal is None:
+        return
+    journal.append(operation, *args)
+    if autosaver is not None:
+        autosaver.notify()
+    elif journal.needs_compaction:
+        journal.compact(save_book)
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+STATUS_UNKNOWN = 2
+
+class ErrorMessage(str):
+    """
+    Reply of a command that failed, so the batch mode can tell it from a result.
+    """
+    status = STATUS_ERROR
+
+class UnknownCommandMessage(ErrorMessage):
+    status = STATUS_UNKNOWN
+
+metrics = Metrics() # вызовы, ошибки и время каждой команды
      
+def error_message(func, err: Exception) -> ErrorMessage:
+    """
+    The reply of a command that raised IndexError, ValueError or KeyError.
+    """
+    if isinstance(err, IndexError):
+        command, formula = COMMANDS_HELP.get(func.__name__)
+        command = '/'.join(command)
+        return ErrorMessage(f"Wrong input for this command [{command}]\n"
+                f"for example:\t[{command}] {formula}"
+                )
+    if isinstance(err, ValueError):
+        return ErrorMessage(f"Input error: {str(err)}.")
+    message = f"Give me the name from phonebook: {str(err)}."
+    if isinstance(err, NameNotFoundError):
+        names = [name for _, name in a_book.closest_names(err.name, limit=SUGGESTIONS, wait=False)]
+        if names:
+            message += f"\nDid you mean: {', '.join(names)}?"
+    return ErrorMessage(message)
+
+def checked_chunks(func, chunks: t.Iterable[str]) -> t.Iterator[str]:
+    """
+    Chunks of a big reply, they are rendered only while printed, so an error 
+    raised then (e.g. by an invalid contact from the file) ends them with its message.
+    """
+    try:
+        yield from chunks
+    except (IndexError, ValueError, KeyError) as err:
+        yield error_message(func, err)
+
 def input_error(func):
     @wraps(func) #для отображения доки/имени
     def wrapper(*args):
@@ -18,19 +182,24 @@ def input_error(func):
         декоратор ловит ошибки функций 
         недостаток аргументов и созданние ошибки
         затем возвращает на принт 
+        и записывает время и ошибку вызова в metrics
         """
+        start = time.perf_counter_ns()
         try:
-            return func(*args)
-        except IndexError:
-            command, formula = COMMANDS_HELP.get(func.__name__)
-            command = '/'.join(command)
-            return (f"Wrong input for this command [{command}]\n"
-                    f"for example:\t[{command}] {formula}"
-                    )
-        except ValueError as err:
-            return f"Input error: {str(err)}."
-        except KeyError as err:
-            return f"Give me the name from phonebook: {str(err)}."
+            result = func(*args)
+        except (IndexError, ValueError, KeyError) as err:
+            message = error_message(func, err)
+            metrics.observe(func.__name__, time.perf_counter_ns() - start, err)
+            return message
+        except Exception as err:
+            metrics.observe(func.__name__, time.perf_counter_ns() - start, err)
+            raise
+        spent = time.perf_counter_ns() - start
+        if isinstance(result, str):
+            metrics.observe(func.__name__, spent)
+            return result
+        # части вывода считаются уже после return - время пишется, когда они кончатся
+        return checked_chunks(func, metrics.timed_iter(func.__name__, result, spent))
     return wrapper  
 
 @input_error
@@ -53,6 +222,7 @@ def add_handler(data: list[str]) -> str:
         record = Record(name, [phone])     
 
     a_book.add_record(record)
+    log_change("add", *record.to_dict().popitem())
     return f"contact {str(record)} has be added"
 
 @input_error
@@ -69,6 +239,7 @@ def add_handler_phone(data : list[str]) -> str:
     if len(data) <= 1 : raise IndexError
     name, new_phone, = data
     a_book[name].add_phone(new_phone)
+    log_change("add_phone", name, new_phone)
     return f"Successful added phone {Phone(new_phone)} to contact {name}"
 
 @input_error
@@ -85,6 +256,7 @@ def change_handler_phone(data: list[str]) -> str:
     if len(data) <= 2 : raise IndexError
     name, old_phone, new_phone, = data
     a_book[name].change_phone(old_phone, new_phone)
+    log_change("change_phone", name, old_phone, new_phone)
     return f"contact {name} has be changed phone to {Phone(new_phone)}"
 
 @input_error
@@ -101,6 +273,7 @@ def del_handler_phone(data: list[str]) -> str:
     if len(data) <= 1 : raise IndexError
     name, old_phone, = data
     a_book[name].remove_phone(old_phone)
+    log_change("remove_phone", name, old_phone)
     return f"phone - {Phone(old_phone)} from contact {name} has be deleted"
 
 @input_error
@@ -117,6 +290,7 @@ def delete_handler(data: list[str]) -> str:
     if len(data) < 1 : raise IndexError
     name, = data
     del a_book[name]
+    log_change("delete", name)
     return f"contact {name} has be deleted"
 
 @input_error
@@ -136,6 +310,7 @@ def add_handler_birthday(data: list[str]) -> str:
     if record.birthday is not None:
         return f"this contact {name} is already have a date of birth: {record.birthday}"
     record.change_birthday(birthday)
+    log_change("birthday", name, birthday)
     return f"contact {name} is added a date of birth: {record.birthday}"
     
 @input_error
@@ -152,6 +327,7 @@ def change_handler_birthday(data: list[str]) -> str:
     if len(data) <= 1 : raise IndexError
     name, birthday, = data
     a_book[name].change_birthday(birthday)
+    log_change("birthday", name, birthday)
     return f"contact {name} is changed to date of birth: {birthday}"  
 
 @input_error
@@ -171,7 +347,27 @@ def handler_days_to_birthday(data: list[str]) -> str:
     return f"{days} days left until {name}'s birthday"  
 
 @input_error
-def search_handler(data: list[str]) -> str:
+def handler_upcoming_birthdays(data: list[str]) -> str:
+    """
+    Show the contacts whose birthday is within the next N days.
+
+    Args:
+        data (list): A list containing the number of days.
+
+    Returns:
+        str: Contacts with the number of days until their birthday, nearest first.
+    """
+    if len(data) < 1 : raise IndexError
+    days, = data
+    res = "\n".join(
+        [f"{rec.name}: {left} days ({rec.birthday})" for rec, left in a_book.upcoming(int(days))]
+    )
+    if not res:
+        return f"no birthdays in the next {days} days"
+    return res
+
+@input_error
+def search_handler(data: list[str]) -> str | t.Iterator[str]:
     """
     Search for contacts by a given keyword.
 
@@ -179,15 +375,144 @@ def search_handler(data: list[str]) -> str:
         data (list): A list containing search keyword.
 
     Returns:
-        str: A formatted list of contacts matching the search keyword.
+        str | Iterator[str]: Chunks of the contacts matching the search keyword 
+            or a message that nothing was found.
     """
     if len(data) < 1 : raise IndexError
     search_word, = data
-    res = "\n".join([str(rec)[9:] for rec in a_book.search(search_word)])
-    if not res:  
+    records = a_book.search(search_word)
+    if not records:  
         return "not found any contact"
+    return render_chunks(records)
+
+@input_error
+def regex_search_handler(data: list[str]) -> str | t.Iterator[str]:
+    """
+    Search for contacts by a regular expression, on all CPUs for a big address book.
+
+    Args:
+        data (list): A list containing the regular expression (may contain spaces).
+
+    Returns:
+        str | Iterator[str]: Chunks of the contacts matching the expression
+            or a message that nothing was found.
+    """
+    if len(data) < 1 : raise IndexError
+    pattern = " ".join(data)
+    records = searcher.search(pattern, regex=True)
+    if not records:
+        return "not found any contact"
+    return render_chunks(records)
+
+@input_error
+def prefix_handler(data: list[str]) -> str | t.Iterator[str]:
+    """
+    Show the contacts whose name starts with a prefix, sorted by name.
+
+    Args:
+        data (list): A list containing the prefix.
+
+    Returns:
+        str | Iterator[str]: Chunks of the found contacts or a message that nothing was found.
+    """
+    if len(data) < 1 : raise IndexError
+    prefix, = data
+    records = a_book.prefix(prefix)
+    if not records:
+        return f"no contacts starting with {prefix}"
+    return render_chunks(records)
+
+@input_error
+def find_handler(data: list[str]) -> str | t.Iterator[str]:
+    """
+    Find the contacts by conditions on their fields, e.g. "find month=6 phone^38066 name~an".
+
+    Args:
+        data (list): Optional "explain", the conditions, optional "limit N" and "offset N".
+
+    Returns:
+        str | Iterator[str]: Chunks of the found contacts, the plan of the query for explain
+            or a message that nothing was found.
+    """
+    explain = bool(data) and data[0].lower() == "explain"
+    if explain:
+        data = data[1:]
+    if len(data) < 1 : raise IndexError
+    query, limit, offset = parse_query(data)
+    if explain:
+        return "\n".join(a_book.explain(query, limit, offset))
+    records = a_book.find(query, limit, offset)
+    if not records:
+        return "not found any contact"
+    return render_chunks(records)
+
+@input_error
+def fuzzy_handler(data: list[str]) -> str:
+    """
+    Show the names closest to a (mistyped) name and the number of typos in them.
+
+    Args:
+        data (list): A list containing the name.
+
+    Returns:
+        str: The closest names or a message that there are no similar names.
+    """
+    if len(data) < 1 : raise IndexError
+    name, = data
+    found = a_book.closest_names(name, limit=FUZZY_LIMIT)
+    if not found:
+        return f"no names similar to {name}"
+    return "\n".join(f"{name} ({distance})" for distance, name in found)
+
+@input_error
+def find_by_phone_handler(data: list[str]) -> str:
+    """
+    Find the contacts that own a phone number.
+
+    Args:
+        data (list): A list containing the phone number.
+
+    Returns:
+        str: A formatted list of contacts with this phone number.
+    """
+    if len(data) < 1 : raise IndexError
+    phone, = data
+    res = "\n".join([rec.render() for rec in a_book.find_by_phone(phone)])
+    if not res:
+        return f"nobody has phone {Phone(phone)}"
     return res
 
+@input_error
+def import_handler(data: list[str]) -> str:
+    """
+    Import contacts from a CSV or JSON lines file.
+
+    Args:
+        data (list): A list containing the file path and optional "trusted".
+
+    Returns:
+        str: The number of imported contacts and the rejected lines.
+    """
+    if len(data) < 1 : raise IndexError
+    path, *options = data
+    fmt = os.path.splitext(path)[1].lower().lstrip(".")
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"can import only .csv and .jsonl files, not {path}")
+    try:
+        with open(path, encoding="utf-8", newline="") as file:
+            report = a_book.bulk_add(file, fmt, trusted="trusted" in options)
+    except OSError as err:
+        raise ValueError(f"can't read {path}: {err.strerror}")
+    if journal is not None and report.added:
+        # импорт не пишем в журнал - книгу сохраняем целиком
+        if autosaver is not None:
+            autosaver.notify()
+        else:
+            journal.compact(save_book)
+    lines = [f"{report.added} contacts imported from {path}"]
+    lines += [f"line {line_no}: {error}" for line_no, error in report.errors]
+    return "\n".join(lines)
+
 @input_error
 def show_page(data: list[str]) -> str:
     """
@@ -202,17 +527,95 @@ def show_page(data: list[str]) -> str:
     count_record, = data if len(data) >= 1 else "1"
     try: 
         count_record = int(count_record)
-        yield "input any for next page"
-        for i, page in enumerate(a_book.iterator(count_record), 1):
-            page = "\n".join(map(lambda x: str(x)[9:], page ))
-            input("") 
-            head = f'{"-" * 15} Page {i} {"-" * 15}\n'
-            yield head + page
-        yield f'{"-" * 15} end {"-" * 15}\n'   
     except ValueError: # без єтого гавнокода все падает(с вводом не цифр) 
-        for _ in range(1):
-            yield "invalid input count page"
+        yield "invalid input count page"
+        return
+    # ошибку битого контакта в файле покажет input_error
+    yield "input any for next page"
+    for i, page in enumerate(a_book.iterator(count_record), 1):
+        page = "\n".join([record.render() for record in page])
+        head = f'{"-" * 15} Page {i} {"-" * 15}\n'
+        yield head + page
+    yield f'{"-" * 15} end {"-" * 15}\n'   
+
+def print_pages(pages: t.Iterable[str], pause: t.Callable[[str], t.Any] = input, 
+                lock: t.ContextManager = nullcontext()) -> None:
+    """
+    Print the output of show_page, waiting for pause() before every page 
+    (not before the first and the last message).
+
+    Every page is made under lock, the lock is not held while waiting for pause().
+    """
+    pages = iter(pages)
+    previous = None
+    inx = 0
+    while True:
+        with lock:
+            page = next(pages, None)
+        if page is None:
+            break
+        if inx:
+            if inx > 1:
+                pause("")
+            print(previous)
+        previous = page
+        inx += 1
+    if previous is not None:
+        print(previous)
+
+def stats_handler(*args) -> str:
+    """
+    Show calls, errors and p50/p95/p99/max time (ms) of every command and the search cache hits.
+    """
+    return f"{metrics.report()}\n{a_book.search_cache.report()}"
 
+@input_error
+def stats_dump_handler(data: list[str]) -> str:
+    """
+    Export the command statistics (with the histograms) to a JSON file.
+
+    Args:
+        data (list): A list with an optional file path (stats.json by default).
+
+    Returns:
+        str: A confirmation message.
+    """
+    path = data[0] if data else "stats.json"
+    try:
+        with open(path, "w") as file:
+            cache = a_book.search_cache
+            json.dump(
+                {**metrics.dump(), "search_cache": {"hits": cache.hits, "misses": cache.misses}}, 
+                file, indent=2,
+            )
+    except OSError as err:
+        raise ValueError(f"can't write {path}: {err.strerror}")
+    return f"statistics of {len(metrics.commands)} commands saved to {path}"
+
+@input_error
+def profile_handler(data: list[str]) -> str:
+    """
+    Run one command under cProfile and show its result with the 15 most expensive functions.
+
+    Args:
+        data (list): The command to profile with its arguments.
+
+    Returns:
+        str: The reply of the command and the profile sorted by cumulative time.
+    """
+    if len(data) < 1 : raise IndexError
+    func_handler, args = command_parser(" ".join(data))
+    if func_handler in (profile_handler, exit_handler):
+        raise ValueError(f"can't profile [{' '.join(data)}]")
+    profiler = cProfile.Profile()
+    bot_message = profiler.runcall(func_handler, args)
+    if not isinstance(bot_message, str):
+        bot_message = profiler.runcall(lambda chunks: "\n".join(chunks), bot_message)
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(15)
+    return f"{bot_message}\n{report.getvalue()}"
+
+@metrics.timed
 def help_handler(*args) -> str:
    return "\n".join(
         [
@@ -221,20 +624,43 @@ def help_handler(*args) -> str:
         ]
         )
 
-def show_all(*args) -> str:
+def render_chunks(records: t.Iterable[Record], size: int = 1000) -> t.Iterator[str]:
+    """
+    Rendered records joined by size, so a big output is printed without building it whole.
+    """
+    chunk = []
+    for record in records:
+        chunk.append(record.render())
+        if len(chunk) == size:
+            yield "\n".join(chunk)
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk)
+
+@input_error
+def show_all(*args) -> t.Iterator[str]:
     # тут может бить красивая формат обертка через цикл и поля рекорда
-    return "\n".join([str(record)[9:] for record in a_book.values()])
+    return render_chunks(a_book.values())
 
+@metrics.timed
 def hello_handler(*args) -> str:
     return "How can I help you?"
 
 def exit_handler(*args) -> str:
-    with open(file_json, "w") as file:
-        json.dump(a_book, file, cls=AddressBookEncoder, sort_keys=True, indent=4)
+    global autosaver
+    searcher.close()
+    if autosaver is not None:
+        autosaver.stop() # дописывает только то, что еще не сохранено
+        autosaver = None
+    if journal is not None:
+        journal.compact(save_book if a_book.dirty else lambda journal_seq: None)
+        journal.close()
+    if storage in ("sqlite", "snapshot"):
+        a_book.close()
     return "Good bye!"
 
 def unknown_command(*args) -> str:
-    return 'Unknown command'
+    return UnknownCommandMessage('Unknown command')
 
 def command_parser(row_str: str):
     """
@@ -246,17 +672,40 @@ def command_parser(row_str: str):
     Returns:
         tuple: A tuple containing the identified command key and a list of arguments.
     """
-    row_str = re.sub(r'\s+', ' ', row_str) 
-    elements = row_str.strip().split(" ")
-    for key, value in BOT_COMMANDS.items():
-        if elements[0].lower() in value[0]:
-            return key, elements[1:]
-        elif " ".join(elements[:2]).lower() in value[0]: 
-            return key, elements[2:] 
+    elements = row_str.split()
+    words = tuple(word.lower() for word in elements[:MAX_COMMAND_WORDS])
+    # самая длинная команда выигрывает: "add phone" раньше "add"
+    for size in range(len(words), 0, -1):
+        handler = COMMAND_TABLE.get(words[:size])
+        if handler is not None:
+            return handler, elements[size:]
     return unknown_command, None
 
+def compile_commands(commands: dict) -> dict[tuple[str, ...], t.Callable]:
+    """
+    Build the dispatch table of the bot from its commands.
+
+    Args:
+        commands (dict): handler -> (list of command phrases, help text), like BOT_COMMANDS.
+
+    Raises:
+        ValueError: If the same phrase is given for two commands.
+
+    Returns:
+        dict: A tuple of lowercase command words -> handler.
+    """
+    table = {}
+    for handler, (phrases, _) in commands.items():
+        for phrase in phrases:
+            words = tuple(phrase.lower().split())
+            if words in table and table[words] is not handler:
+                raise ValueError(
+                    f"Command '{phrase}' is used by {table[words].__name__} and {handler.__name__}"
+                )
+            table[words] = handler
+    return table
+
 BOT_COMMANDS = {
-    # при командах (с одинаковими первими словами)"add" & "add phone" работает какую первую найдет
     hello_handler: (
         ["hello"],
         "hello"
@@ -266,7 +715,7 @@ BOT_COMMANDS = {
         "name phone(num) or name phone(num) date(ISO)"
         ),
     add_handler_phone: (
-        ["add_phone"], 
+        ["add_phone", "add phone"], 
         "name phone(num)"
         ),
     change_handler_phone: (
@@ -284,6 +733,10 @@ BOT_COMMANDS = {
     handler_days_to_birthday: (
         ["days"], 
         "name"),
+    handler_upcoming_birthdays: (
+        ["upcoming"], 
+        "days(num)"
+        ),
     del_handler_phone: (
         ["del phone"], 
         "name phone(num)"
@@ -295,6 +748,31 @@ BOT_COMMANDS = {
         ["search"], 
         "search(alpha/num)"
         ),
+    regex_search_handler: (
+        ["grep", "regex"], 
+        "regex"
+        ),
+    prefix_handler: (
+        ["prefix"], 
+        "name_prefix"
+        ),
+    find_handler: (
+        ["find"], 
+        "[explain] name~an phone^38066 month=6 [or ...] [limit N] [offset N] "
+        "(=, ^ - starts with, ~ - contains; name, phone, birthday=ISO, month)"
+        ),
+    fuzzy_handler: (
+        ["fuzzy"], 
+        "name - names like this one (number of typos)"
+        ),
+    find_by_phone_handler: (
+        ["who"], 
+        "phone(num)"
+        ),
+    import_handler: (
+        ["import"], 
+        "path(.csv/.jsonl) [trusted]"
+        ),
     show_all: (
         ["show all"], 
         "show all address book"
@@ -303,6 +781,18 @@ BOT_COMMANDS = {
         ["show page"], 
         "int_num(positive) - show all address book"
         ),
+    stats_handler: (
+        ["stats"], 
+        "- calls, errors and p50/p95/p99 time (ms) of the commands"
+        ),
+    stats_dump_handler: (
+        ["stats dump"], 
+        "[path] - save the statistics to JSON (stats.json)"
+        ),
+    profile_handler: (
+        ["profile"], 
+        "command ... - run the command under cProfile"
+        ),
     help_handler: (
         ["help"], 
         "- show all bot commands"
@@ -314,25 +804,171 @@ BOT_COMMANDS = {
 }
 
 COMMANDS_HELP = {k.__name__:v for k,v in BOT_COMMANDS.items()}
+COMMAND_TABLE = compile_commands(BOT_COMMANDS) # собирается один раз при запуске
+MAX_COMMAND_WORDS = max(map(len, COMMAND_TABLE))
+
+COMPLETION_LIMIT = 100 # больше имен в подсказке все равно не прочитать
+_completions: list[str] = []
+
+def complete(text: str, state: int) -> str | None:
+    """
+    Readline completer: the first word of a command at the start of the line, 
+    contact names after it.
+    """
+    if state == 0:
+        line = readline.get_line_buffer()[:readline.get_begidx()]
+        if line.strip():
+            _completions[:] = a_book.prefix_names(text, COMPLETION_LIMIT)
+        else:
+            words = {words[0] for words in COMMAND_TABLE}
+            _completions[:] = sorted(word for word in words if word.startswith(text.lower()))
+    return _completions[state] if state < len(_completions) else None
+
+def setup_completion() -> None:
+    if readline is None:
+        return
+    if storage == "json": # индекс имен строим при загрузке, а не на первом Tab (0.3 с на 1M)
+        a_book._names()
+    readline.set_completer(complete)
+    if "libedit" in (readline.__doc__ or ""): # readline на macOS
+        readline.parse_and_bind("bind ^I rl_complete")
+    else:
+        readline.parse_and_bind("tab: complete")
+
+def start_autosave() -> None:
+    """
+    Save the book in the background some time after changes instead of only on exit.
+    """
+    global autosaver
+    if journal is None: # SQLite пишет каждое изменение сразу
+        return
+    autosaver = AutoSaver(a_book, capture_book, command_lock, AUTOSAVE_INTERVAL)
+    autosaver.start()
+    if a_book.dirty: # изменения из журнала
+        autosaver.notify()
 
 def main():
+    setup_completion()
+    start_autosave()
     while True:
         user_input = input(">>>")
         if not user_input or user_input.isspace():
             continue
 
         func_handler, data = command_parser(user_input)
+
+        if func_handler == exit_handler: # сохранение ждет command_lock
+            print(exit_handler(data))
+            break
         
-        if func_handler == show_page:
-            for page in func_handler(data):
-                print(page)
+        if func_handler == show_page: # пока ждем ввода, книгу может сохранить autosave
+            print_pages(func_handler(data), lock=command_lock)
             continue    
 
-        bot_message = func_handler(data)    
-        print(bot_message)
-        
-        if func_handler == exit_handler:
-            break
+        with command_lock:
+            bot_message = func_handler(data)    
+            if isinstance(bot_message, str):
+                print(bot_message)
+            else: # большой вывод приходит частями
+                for chunk in bot_message:
+                    print(chunk)
         
+def run_batch(lines: t.Iterable[str], out: t.TextIO, checkpoint: int = 0, 
+              status: t.TextIO | None = None) -> int:
+    """
+    Run bot commands without prompts, e.g. from a file.
+
+    Changes are not written to the journal one by one: the book is saved every 
+    checkpoint lines (for SQLite - the lines run in one transaction) and at the end. 
+    Replies are written to out in blocks of OUTPUT_BLOCK, "exit" stops the batch.
+
+    Args:
+        lines (Iterable[str]): Command lines.
+        out (TextIO): Where to write the replies.
+        checkpoint (int): Save the book every so many lines, 0 - only at the end.
+        status (TextIO | None): Where to write "line<TAB>status" of every command.
+
+    Returns:
+        int: The number of commands that failed.
+    """
+    global journal
+    book_journal, journal = journal, None # журнал заменяют сохранения на чекпоинтах
+    numbered = enumerate(lines, 1)
+    failed = 0
+    replies, statuses = [], []
+
+    def flush() -> None:
+        out.writelines(replies)
+        if status is not None:
+            status.writelines(statuses)
+        replies.clear()
+        statuses.clear()
+    try:
+        finished = False
+        while not finished:
+            count = 0
+            with a_book.transaction() if storage == "sqlite" else nullcontext():
+                for line_no, line in islice(numbered, checkpoint or None):
+                    count += 1
+                    if not line or line.isspace():
+                        continue
+                    func_handler, data = command_parser(line)
+                    if func_handler == exit_handler:
+                        finished = True
+                        break
+                    bot_message = func_handler(data)
+                    code = getattr(bot_message, "status", STATUS_OK)
+                    if isinstance(bot_message, str):
+                        replies += (bot_message, "\n")
+                    else: # страницы или части вывода, последняя может быть ошибкой
+                        for chunk in bot_message:
+                            replies += (chunk, "\n")
+                            code = getattr(chunk, "status", code)
+                            if len(replies) >= 2 * OUTPUT_BLOCK:
+                                out.writelines(replies)
+                                replies.clear()
+                    failed += code != STATUS_OK
+                    statuses.append(f"{line_no}\t{code}\n")
+                    if len(statuses) >= OUTPUT_BLOCK: # вывод не копится до чекпоинта
+                        flush()
+            finished = finished or not checkpoint or count < checkpoint
+            if not finished and book_journal is not None:
+                book_journal.compact(save_book)
+            flush()
+    finally:
+        journal = book_journal
+        out.write(exit_handler() + "\n")
+    return failed
+
+def batch_main(args: argparse.Namespace) -> int:
+    status = open(args.status, "w") if args.status else None
+    try:
+        if args.batch == "-":
+            failed = run_batch(sys.stdin, sys.stdout, args.checkpoint, status)
+        else:
+            with open(args.batch, encoding="utf-8") as file:
+                failed = run_batch(file, sys.stdout, args.checkpoint, status)
+    finally:
+        if status is not None:
+            status.close()
+    return 1 if failed else 0
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Address book bot")
+    parser.add_argument(
+        "--batch", metavar="FILE", help="run the commands from FILE ('-' - stdin) without prompts"
+    )
+    parser.add_argument(
+        "--checkpoint", metavar="N", type=int, default=0, 
+        help="in batch mode save the book every N lines (by default only at the end)"
+    )
+    parser.add_argument(
+        "--status", metavar="FILE", 
+        help="in batch mode write 'line<TAB>status' for every command: "
+             f"{STATUS_OK} - ok, {STATUS_ERROR} - error, {STATUS_UNKNOWN} - unknown command"
+    )
+    args = parser.parse_args()
+    if args.batch is None:
+        main()
+    else:
+        sys.exit(batch_main(args))
\ No newline at end of file
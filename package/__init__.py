@@ -1,4 +1,17 @@
-from .address_book import Record, AddressBook, AddressBookEncoder, Phone, Name, Birthday, Field
+from .address_book import (
+    Record, AddressBook, AddressBookEncoder, BulkReport, Phone, Name, Birthday, Field, NameNotFoundError,
+)
+from .autosave import AutoSaver
+from .birthdays import BirthdayStats
+from .cache import SearchCache
+from .journal import Journal
+from .locking import RWLock, ThreadSafeAddressBook
+from .metrics import Metrics
+from .parallel import ParallelSearch
+from .sharded import ShardedAddressBook
+from .snapshot import SnapshotAddressBook, json_to_snapshot, snapshot_to_json, write_snapshot
+from .sqlite_book import SQLiteAddressBook
+from .storage import load_json, save_json
 from functools import wraps
 import json, typing as t
 
@@ -0,0 +1,21 @@
+"""
+Convert address book files between JSON and the binary snapshot:
+
+    python -m package from-json test.json test.snapshot
+    python -m package to-json test.snapshot test.json
+"""
+import argparse
+
+from .snapshot import json_to_snapshot, snapshot_to_json
+
+
+parser = argparse.ArgumentParser(description="Convert address book files")
+parser.add_argument("direction", choices=["from-json", "to-json"])
+parser.add_argument("source")
+parser.add_argument("target")
+args = parser.parse_args()
+
+if args.direction == "from-json":
+    json_to_snapshot(args.source, args.target)
+else:
+    snapshot_to_json(args.source, args.target)
@@ -1,12 +1,72 @@
+from array import array
 from collections import UserDict
+from contextlib import contextmanager, nullcontext
+import csv
 import json
-from datetime import date 
+from datetime import date, timedelta
+import re
+import threading
 import typing as t
 
+from .birthdays import BirthdayStats, birthday_stats, days_until
+from .cache import SearchCache
+from .query import Query, run_query
+from .indexes import (
+    BirthdayIndex, FuzzyNameIndex, NameIndex, NgramIndex, PhoneIndex, day_of_year, prefix_stop,
+    record_text,
+)
+
+
+_NON_DIGITS = re.compile(r"\D")
+# с такой книги индексы поиска и подсказок строятся в фоне, а не посреди команды
+BACKGROUND_INDEX = 50_000
+
+
+def normalize_phone(value: str) -> str:
+    """
+    Keep only the digits of a phone number and check its length.
+
+    Raises:
+        ValueError: If the number has less than 10 digits.
+    """
+    if value.isascii():
+        phone = _NON_DIGITS.sub("", value)
+    else: # \D не совпадает с str.isdigit на не-ascii цифрах
+        phone = ''.join(filter(str.isdigit, value))
+    if 9 >= len(phone) <= 15 : #псевдо проверка номера
+        raise ValueError(f"Phone number {value} isn't correct")
+    return phone
+
+
+def birthday_ordinal(value: str) -> int:
+    """
+    Parse an ISO date string into a date ordinal.
+
+    Raises:
+        ValueError: If the input date string is not in a valid date format(ISO).
+    """
+    try:
+        return date.fromisoformat(value).toordinal()
+    except ValueError: 
+        raise ValueError(f'Value {value} is not correct format! Also "2023-12-30"')
+
+
+class NameNotFoundError(KeyError):
+    """
+    KeyError of a name that isn't in the address book, the name is kept for "did you mean" hints.
+    """
+
+    def __init__(self, name: str, message: str | None = None) -> None:
+        super().__init__(message or f"This name {name} isn't in Address Book")
+        self.name = name
+
+
 class Field:
     """
     Class parent representing a field used in the record of the address book.
     """
+    __slots__ = ('_value',) # без __dict__ у каждого поля
+
     def __init__(self, value: str) -> None:
         self.value = value 
       
@@ -25,6 +85,15 @@ class Field:
             value = validation(value)
         self._value = value
 
+    @classmethod
+    def _trusted(cls, value: t.Any) -> 'Field':
+        """
+        Create the field from an already valid (stored) value, without the validation.
+        """
+        field = cls.__new__(cls)
+        field._value = value
+        return field
+
     def __str__(self) -> str:
         return f'{self.value}'
     
@@ -41,18 +110,17 @@ class Name(Field):
     """
     Class representing the name field in a record of  the address book.
     """
-    pass
+    __slots__ = ()
  
        
 class Phone(Field):
     """
     Class representing the phone field in a record of the address book.
     """ 
+    __slots__ = ()
+
     def __valid_phone(self, value) -> str: 
-        phone = ''.join(filter(str.isdigit, value))
-        if 9 >= len(phone) <= 15 : #псевдо проверка номера
-            raise ValueError(f"Phone number {value} isn't correct")
-        return phone
+        return normalize_phone(value)
 
     @Field.value.setter # переопределяем сеттер родительского класса
     def value(self, value: str) -> None:
@@ -62,31 +130,33 @@ class Phone(Field):
 class Birthday(Field):
     """
     Class representing the birthday field in a record of the address book.
-    The date is stored in ISO 8601 format.
+    The date is given in ISO 8601 format and stored packed as a date ordinal.
     """
+    __slots__ = ()
 
-    def __valid_date(self, value: str) -> str:
+    def __valid_date(self, value: str) -> int:
         """
-        Input date string to a valid ISO-formatted date.
+        Input date string to a date ordinal.
         Args:
             value (str): The input date string.
         Raises:
             ValueError: If the input date string is not in a valid date format(ISO).
         Returns:
-            str: The valid ISO-formatted date string.    
+            int: The ordinal of the date.    
         """
-        try:
-            date.fromisoformat(value)
-        except ValueError: 
-            raise ValueError(f'Value {value} is not correct format! Also "2023-12-30"')
-        return value    
+        return birthday_ordinal(value)
     
-    @Field.value.setter
+    @property
+    def value(self) -> str:
+        return date.fromordinal(self._value).isoformat()
+
+    @value.setter
     def value(self, value: str) -> None:
         Field.value.fset(self, value, self.__valid_date)
         
     def get_date(self) -> date:
-        return date.fromisoformat(self.value)    
+        return date.fromordinal(self._value)    
+
 
 class Record:
     """
@@ -96,7 +166,9 @@ class Record:
         name (Name): The name of the contact.
         phones (list): A list of phone numbers associated with the contact.
         birthday (Birthday): The birthday of the contact.
+        book (AddressBook | None): The address book the record belongs to, if any.
     """
+    __slots__ = ('name', 'phones', 'birthday', 'book', '_rendered')
   
     def __init__(
             self, 
@@ -108,6 +180,22 @@ class Record:
         self.name = self._name(name)
         self.phones = [self._phone(phone) for phone in phones]
         self.birthday = None if birthday is None else self._birthday(birthday)
+        self.book = None # книга сама проставляет себя при добавлении записи
+        self._rendered: str | None = None # кэш render(), сбрасывается при изменении
+
+    @classmethod
+    def _trusted(cls, name: str, phones: list[str], birthday: int | None) -> 'Record':
+        """
+        Build a record from already valid values (normalized phones, birthday ordinal)
+        without the Field setters and isinstance checks.
+        """
+        record = cls.__new__(cls)
+        record.name = Name._trusted(name)
+        record.phones = [Phone._trusted(phone) for phone in phones]
+        record.birthday = None if birthday is None else Birthday._trusted(birthday)
+        record.book = None
+        record._rendered = None
+        return record
         
 
     def _name(self, name: str | Name) -> Name:
@@ -124,20 +212,42 @@ class Record:
         if not isinstance(birthday, Birthday):
             birthday = Birthday(birthday)
         return birthday    
+
+    @contextmanager
+    def _changing(self) -> t.Iterator[None]:
+        """
+        Wrap a mutation of the record (with its checks), so the address book that owns it 
+        can lock it and update its indexes. The phones list is replaced, never changed in place,
+        so a reader holding the old list never sees a half-done change.
+        """
+        book = self.book
+        if book is None:
+            yield
+            self._rendered = None
+            return
+        with book._writing():
+            yield
+            self._rendered = None
+            book._record_changed(self)
   
     def add_phone(self, phone: Phone | str) -> None:
         """
         Add a new phone number to the list of phone numbers for the contact.
         Args:
             phone (Phone) or try valid Str: The phone number to be added to the contact.
+        Raises:
+            ValueError: If the phone number is already in the record 
+                or (with unique phones in the book) belongs to another contact.
         Returns:
             None: This method does not return any value.
         """
-        if phone in self.phones:
-            raise ValueError("this phone number has already been added")
-        
         phone = self._phone(phone)
-        self.phones.append(phone)
+        with self._changing():
+            if phone in self.phones:
+                raise ValueError("this phone number has already been added")
+            if self.book is not None:
+                self.book._check_phone(self.name.value, phone.value)
+            self.phones = [*self.phones, phone]
 
     def remove_phone(self, phone: Phone | str) -> None:
         """
@@ -151,9 +261,12 @@ class Record:
             None: This method does not return any value.
         """
         phone = self._phone(phone) # єту строку может после райза?
-        if phone not in self.phones:
-            raise ValueError(f"The phone '{phone}' is not in this record.")
-        self.phones.remove(phone)
+        with self._changing():
+            if phone not in self.phones:
+                raise ValueError(f"The phone '{phone}' is not in this record.")
+            phones = list(self.phones)
+            phones.remove(phone)
+            self.phones = phones
         
     def change_phone(self, old_phone: Phone | str, new_phone: Phone | str) -> None:
         """
@@ -164,18 +277,24 @@ class Record:
             new_phone (Phone)  or try valid Str: The new phone number to replace the existing one.
         Raises:
             ValueError: If the old phone number is not found in the contact's list of phone numbers.
-            ValueError: If the new phone number is already in contact's list of phone numbers.
+            ValueError: If the new phone number is already in contact's list of phone numbers
+                or (with unique phones in the book) belongs to another contact.
         """
-        
-        if (old_phone := self._phone(old_phone)) not in self.phones: 
-            raise ValueError(f"The phone '{old_phone}' is not in this record '{self.name}'.")
-        if (new_phone := self._phone(new_phone)) in self.phones:
-            raise ValueError(f"The phone '{new_phone}' already in record '{self.name}'.")
-        inx = self.phones.index(old_phone)
-        self.phones[inx] = new_phone
+        with self._changing():
+            if (old_phone := self._phone(old_phone)) not in self.phones: 
+                raise ValueError(f"The phone '{old_phone}' is not in this record '{self.name}'.")
+            if (new_phone := self._phone(new_phone)) in self.phones:
+                raise ValueError(f"The phone '{new_phone}' already in record '{self.name}'.")
+            if self.book is not None:
+                self.book._check_phone(self.name.value, new_phone.value)
+            phones = list(self.phones)
+            phones[phones.index(old_phone)] = new_phone
+            self.phones = phones
         
     def change_birthday(self, birthday):
-        self.birthday = self._birthday(birthday)   
+        birthday = self._birthday(birthday)
+        with self._changing():
+            self.birthday = birthday
 
     def days_to_birthday(self) -> int :
         """
@@ -189,26 +308,29 @@ class Record:
         if self.birthday == None:
             raise KeyError(f"No birthday set for the contact {self.name}.")
         
-        today = date.today()
-        try:
-            bday = self.birthday.get_date().replace(year=today.year) # дата др в этом году 
-            if today > bday : # если др уже прошло берем дату следующего(в следующем году)
-                bday= bday.replace(year=today.year+1)
-            return (bday - today).days
-        except ValueError: # исключение для високосной дати 1го дня уууу-02-29
-            exept_temp = Record(self.name, [] , today.replace(month=2, day=28).isoformat()) 
-            return exept_temp.days_to_birthday() + 1
+        bday = self.birthday.get_date()
+        return days_until(bday.month, bday.day, date.today())
         
     
+    def render(self) -> str:
+        """
+        The record as the bot shows it (str without the "<Record>:" prefix), 
+        built once and kept until the record is changed.
+        """
+        rendered = self._rendered
+        if rendered is None:
+            # вывод телефонов с новой строки и табуляцией
+            birthday_str = f'birthday: {self.birthday or "Empty"}'
+            phones_str = ", ".join([str(ph) for ph in self.phones])
+            rendered = self._rendered = (
+                f'\n\tname: {self.name}'
+                f'\n\tphones: {phones_str or "Empty"}\n\t'
+                f'{birthday_str}\n'
+            )
+        return rendered
+
     def __str__(self) -> str:
-        # вывод телефонов с новой строки и табуляцией
-        birthday_str = f'birthday: {self.birthday or "Empty"}'
-        phones_str = ", ".join([str(ph) for ph in self.phones])
-        return (
-            f'<Record>:\n\tname: {self.name}'
-            f'\n\tphones: {phones_str or "Empty"}\n\t'
-            f'{birthday_str}\n'
-        )
+        return '<Record>:' + self.render()
 
     def __repr__(self) -> str:
         # __repr__ используется для того что бы показать как создается екземпляр
@@ -222,6 +344,16 @@ class Record:
             f'birthday={self.birthday!r})'
         )
 
+    def search_text(self) -> str:
+        """
+        Return the text of the record that AddressBook.search looks into.
+        """
+        return record_text(
+            self.name.value, 
+            [phone.value for phone in self.phones], 
+            None if self.birthday is None else self.birthday.value,
+        )
+
     def to_dict(self) -> dict[str, dict[str, list[str] | str | None]]:
         phones = [str(phone) for phone in self.phones]
         birthday = None if self.birthday is None else str(self.birthday)
@@ -232,11 +364,118 @@ class Record:
             },
         }
           
+class BulkReport(t.NamedTuple):
+    """
+    Result of AddressBook.bulk_add: number of added contacts and (line, error message) pairs.
+    """
+    added: int
+    errors: list[tuple[int, str]]
+
+
+class FrozenContacts(t.Mapping[str, tuple[list[str], str | None]]):
+    """
+    Contacts taken to be saved later while the book goes on changing: name -> raw 
+    (phones, ISO birthday) as they were when taken, in the same order.
+
+    Only references are taken: lazily loaded raw data is never changed and a record
+    replaces its phones list and birthday instead of changing them. No object is made
+    per contact (millions of them would wake up the garbage collector), a record
+    is converted to raw data when it is read.
+
+    Args:
+        data (dict): Name -> Record or raw (phones, birthday) of a lazily loaded contact.
+    """
+
+    def __init__(self, data: dict) -> None:
+        self._data = data.copy()
+        self._phones: dict[str, list] = {}
+        self._birthdays: dict[str, Birthday | None] = {}
+        for name, value in self._data.items():
+            if type(value) is not tuple:
+                self._phones[name] = value.phones
+                self._birthdays[name] = value.birthday
+
+    def __getitem__(self, name: str) -> tuple[list[str], str | None]:
+        phones = self._phones.get(name)
+        if phones is None:
+            return self._data[name]
+        birthday = self._birthdays[name]
+        return [phone.value for phone in phones], None if birthday is None else birthday.value
+
+    def __iter__(self) -> t.Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _BackgroundBuild:
+    """
+    An index built by a daemon thread from a copy of the book taken by the caller,
+    with the log of the contacts changed meanwhile (see AddressBook._log_changes).
+    """
+
+    def __init__(self, build: t.Callable[[], t.Any], changes: dict[str, bool], name: str) -> None:
+        self.changes = changes
+        self._built: list = []
+        self._thread = threading.Thread(target=lambda: self._built.append(build()), name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def done(self) -> bool:
+        return not self._thread.is_alive()
+
+    def result(self) -> t.Any | None:
+        """
+        Wait for the index, None if the thread failed.
+        """
+        self._thread.join()
+        return self._built[0] if self._built else None
+
+
 class AddressBook(UserDict):
     """
     A class representing an address book, which is a dictionary 
     with record names as keys and record objects as values.
+
+    The book keeps its search, phone and birthday indexes in sync with the records:
+    records report their changes back through Record.book.
+
+    Args:
+        unique_phones (bool): Reject phone numbers that already belong to another contact.
     """
+
+    def __init__(self, *args, unique_phones: bool = False, **kwargs) -> None:
+        self.unique_phones = unique_phones
+        self._text_index: NgramIndex | None = None # строится при первом поиске
+        self._phone_index: PhoneIndex | None = None
+        self._birthday_index: BirthdayIndex | None = None
+        self._name_index: NameIndex | None = None
+        self._fuzzy_index: FuzzyNameIndex | None = None
+        self._text_build: _BackgroundBuild | None = None # индекс поиска, строящийся в фоне
+        self._fuzzy_build: _BackgroundBuild | None = None
+        self._change_logs: list[dict[str, bool]] = [] # см. _log_changes
+        self.search_cache = SearchCache() # результаты поиска до следующего изменения книги
+        self.generation = 0 # растет при каждом изменении книги, по нему видно устаревшие копии
+        self._saved_generation = 0
+        self.journal_seq = 0 # последняя запись журнала, которая уже есть в книге (см. Journal)
+        super().__init__(*args, **kwargs)
+
+    @property
+    def dirty(self) -> bool:
+        """
+        Whether the book (or one of its records) was changed since mark_saved().
+        """
+        return self.generation != self._saved_generation
+
+    def mark_saved(self, generation: int | None = None) -> None:
+        """
+        Remember that the book is saved as it was at the generation (by default the current one).
+
+        A save that started before later changes passes the generation it saw,
+        so those changes still make the book dirty.
+        """
+        self._saved_generation = self.generation if generation is None else generation
     
     def add_record(self, record: Record) -> None:
         """
@@ -258,11 +497,14 @@ class AddressBook(UserDict):
         Returns:
             Record: The record object corresponding to the given name.
         Raises:
-            KeyError: If the provided name is not found in the address book.
+            NameNotFoundError: If the provided name is not found in the address book.
+            ValueError: If the record was loaded lazily and its data isn't valid.
         """
         record = self.data.get(key)
         if record is None:
-            raise KeyError(f"This name {key} isn't in Address Book")
+            raise NameNotFoundError(key)
+        if type(record) is tuple: # загружена лениво - создаем Record при первом обращении
+            record = self._materialize(key, record)
         return record
     
     def __setitem__(self, key: str, val: Record) -> None:
@@ -274,28 +516,338 @@ class AddressBook(UserDict):
             val (Record): The record object to be added or updated.
         Raises:
             TypeError: If the given value is not an instance of the Record class.
+            ValueError: If the key doesn't match the name of the record.
             KeyError: If the provided name is already present in the address book.
         """
         if not isinstance(val, Record):
             raise TypeError("Record must be an instance of the Record class.")
-        if key in self.data:
+        if key != val.name.value:
+            raise ValueError(f"Key '{key}' doesn't match the record name '{val.name}'")
+        if key in self:
             raise KeyError(f"This name '{key}' is already in contacts")
+        for phone in val.phones:
+            self._check_phone(key, phone.value)
         self.data[key] = val
+        val.book = self
+        self._index(val)
+        self.generation += 1
 
-    def __delaitem__(self, key: str) -> None:
+    def __delitem__(self, key: str) -> None:
         """
         Delete a record from the address book by its name.
 
         Args:
             key (str): The name of the record to delete.
         Raises:
-            KeyError: If the provided name is not found in the address book.
+            KeyError: If the key isn't a string.
+            NameNotFoundError: If the provided name is not found in the address book.
         """
         if not isinstance(key, str):
             raise KeyError("Value must be string")
-        if key not in self.data:
-            raise KeyError(f"Can't delete contact {key} isn't in Address Book")
-        del self.data[key]
+        if key not in self:
+            raise NameNotFoundError(key, f"Can't delete contact {key} isn't in Address Book")
+        record = self.data.pop(key, None)
+        if isinstance(record, Record):
+            record.book = None
+        self._unindex(key)
+        self.generation += 1
+
+    def _index(self, record: Record) -> None:
+        """
+        Put a record into (or refresh it in) the indexes that are already built.
+        """
+        name, phones, birthday = self._row(record)
+        if self._text_index is not None:
+            self._text_index.add(name, record.search_text())
+            if self._text_index.stale: # много лишних id в postings - построим заново
+                self._text_index = None
+        if self._phone_index is not None:
+            self._phone_index.set(name, phones)
+        if self._birthday_index is not None:
+            self._birthday_index.set(name, birthday)
+        if self._name_index is not None:
+            self._name_index.add(name)
+        self._name_changed(name)
+
+    def _unindex(self, key: str) -> None:
+        """
+        Remove a record name from the indexes that are already built.
+        """
+        if self._text_index is not None:
+            self._text_index.discard(key)
+            if self._text_index.stale:
+                self._text_index = None
+        if self._phone_index is not None:
+            self._phone_index.discard(key)
+        if self._birthday_index is not None:
+            self._birthday_index.discard(key)
+        if self._name_index is not None:
+            self._name_index.discard(key)
+        self._name_deleted(key)
+
+    def _name_changed(self, name: str) -> None:
+        """
+        A contact was added or changed: update the fuzzy index and the change logs.
+        """
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.add(name)
+        for log in self._change_logs:
+            log.setdefault(name, False)
+
+    def _name_deleted(self, name: str) -> None:
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.discard(name)
+        for log in self._change_logs:
+            log[name] = True
+
+    def _log_changes(self) -> dict[str, bool]:
+        """
+        Start logging the names of the contacts added, changed or deleted from now on, 
+        for copies of the book kept elsewhere (a background index, search workers).
+
+        Returns:
+            dict[str, bool]: Filled by the book: name -> whether the contact was deleted meanwhile
+                (then it lost its place in the order of the book even if it was added again).
+        """
+        log: dict[str, bool] = {}
+        self._change_logs.append(log)
+        return log
+
+    def _stop_logging(self, log: dict[str, bool]) -> None:
+        self._change_logs = [other for other in self._change_logs if other is not log]
+
+    def _writing(self) -> t.ContextManager:
+        """
+        Context of a change of a record of this book (ThreadSafeAddressBook takes its write lock).
+        """
+        return nullcontext()
+
+    def _record_changed(self, record: Record) -> None:
+        """
+        Called by a record of this book after any of its fields was changed.
+        """
+        self._index(record)
+        self.generation += 1
+
+    @staticmethod
+    def _row(record: Record) -> tuple[str, list[str], date | None]:
+        return (
+            record.name.value, 
+            [phone.value for phone in record.phones],
+            None if record.birthday is None else record.birthday.get_date(),
+        )
+
+    def _rows(self) -> t.Iterator[tuple[str, list[str], date | None]]:
+        """
+        Name, phones and birthday of every contact in insertion order, 
+        the indexes are built from them (storage backends override it to skip building records).
+        """
+        for name, record in self.data.items():
+            if type(record) is tuple:
+                phones, birthday = record
+                phones = [''.join(filter(str.isdigit, phone)) for phone in phones]
+                yield name, phones, birthday and date.fromisoformat(birthday)
+            else:
+                yield self._row(record)
+
+    def _search_text(self, name: str) -> str:
+        """
+        The current search text of a contact, the search index checks its candidates 
+        against it (storage backends override it to skip building records).
+        """
+        record = self.data[name]
+        if type(record) is tuple:
+            phones, birthday = record
+            phones = [''.join(filter(str.isdigit, phone)) for phone in phones]
+            return record_text(name, phones, birthday and date.fromisoformat(birthday).isoformat())
+        return record.search_text()
+
+    def _search_index(self, wait: bool = True) -> NgramIndex | None:
+        """
+        The search index. If it isn't built yet and wait is false, a background thread 
+        builds it from a copy of the book (see _capture) and None is returned until the index is ready.
+        """
+        if self._text_index is None:
+            build = self._text_build
+            if build is not None and (wait or build.done):
+                self._text_build = None
+                self._stop_logging(build.changes)
+                index = build.result()
+                if index is None: # поток упал - строим здесь
+                    index = self._new_search_index(self)
+                for name, deleted in build.changes.items():
+                    if deleted: # удаленный и добавленный снова контакт - в конце
+                        index.discard(name)
+                    if name in self:
+                        index.add(name, self._search_text(name))
+                self._text_index = index
+            elif wait:
+                self._text_index = self._new_search_index(self)
+            elif build is None:
+                copy = self._capture()
+                self._text_build = _BackgroundBuild(
+                    lambda: self._new_search_index(copy()), self._log_changes(), "search-index"
+                )
+        return self._text_index
+
+    def _new_search_index(self, book: 'AddressBook') -> NgramIndex:
+        """
+        A search index of this book built from the contacts of the book (this one or a copy).
+        """
+        index = NgramIndex(self._search_text)
+        for name, phones, birthday in book._rows():
+            index.add(name, record_text(name, phones, birthday and birthday.isoformat()))
+        return index
+
+    def _phone_owners(self) -> PhoneIndex:
+        if self._phone_index is None:
+            index = PhoneIndex()
+            for name, phones, _ in self._rows():
+                index.set(name, phones)
+            self._phone_index = index
+        return self._phone_index
+
+    def _birthdays(self) -> BirthdayIndex:
+        if self._birthday_index is None:
+            index = BirthdayIndex()
+            for name, _, birthday in self._rows():
+                index.set(name, birthday)
+            self._birthday_index = index
+        return self._birthday_index
+
+    def _names(self) -> NameIndex:
+        if self._name_index is None:
+            self._name_index = NameIndex(self)
+        return self._name_index
+
+    def _fuzzy_names(self, wait: bool = True) -> FuzzyNameIndex | None:
+        """
+        The fuzzy name index. If it isn't built yet and wait is false, a background thread 
+        builds it from a copy of the names and None is returned until the index is ready.
+        """
+        if self._fuzzy_index is None:
+            build = self._fuzzy_build
+            if build is not None and (wait or build.done):
+                self._fuzzy_build = None
+                self._stop_logging(build.changes)
+                index = build.result()
+                if index is None: # поток упал - строим здесь
+                    index = FuzzyNameIndex(self)
+                for name in build.changes:
+                    if name in self:
+                        index.add(name)
+                    else:
+                        index.discard(name)
+                self._fuzzy_index = index
+            elif wait:
+                self._fuzzy_index = FuzzyNameIndex(self)
+            elif build is None:
+                names = list(self)
+                self._fuzzy_build = _BackgroundBuild(
+                    lambda: FuzzyNameIndex(names), self._log_changes(), "fuzzy-index"
+                )
+        return self._fuzzy_index
+
+    def _name_range(self, start: str, stop: str | None, limit: int | None) -> list[str]:
+        """
+        Sorted names from start (inclusive) to stop (exclusive) (storage backends override it).
+        """
+        return self._names().between(start, stop, limit)
+
+    def _records(self) -> t.Iterator[Record]:
+        """
+        Iterate over all the records in insertion order (storage backends override it).
+        """
+        for name, record in self.data.items():
+            if type(record) is tuple:
+                record = self._materialize(name, record)
+            yield record
+
+    def _materialize(self, name: str, raw: tuple[list[str], str | None]) -> Record:
+        """
+        Turn the raw (phones, birthday) of a lazily loaded contact into a Record in place.
+        """
+        phones, birthday = raw
+        record = Record(name=name, phones=phones, birthday=birthday)
+        record.book = self
+        self.data[name] = record # значение по тому же ключу - порядок не меняется
+        return record
+
+    def _dict_items(self) -> t.Iterator[tuple[str, dict]]:
+        """
+        (name, record data) pairs in the format of Record.to_dict, in insertion order.
+        Lazily loaded contacts that were never touched are returned as they were loaded.
+        """
+        for name, record in self.data.items():
+            if type(record) is tuple:
+                yield name, {"phones": record[0], "birthday": record[1]}
+            else:
+                yield from record.to_dict().items()
+
+    def _saved_seq(self, name: str) -> int:
+        """
+        Number of the last journal entry saved together with the contact, Journal.replay 
+        skips the entries up to it (storage backends saving parts of the book override it).
+        """
+        return self.journal_seq
+
+    def _capture(self) -> t.Callable[[], 'AddressBook']:
+        """
+        Take the contacts to save them in another thread (storage backends override it).
+
+        Only references are taken now (see FrozenContacts), the returned function builds 
+        from them a copy of the book as it was (raw data, without records and indexes),
+        even if the book was changed meanwhile.
+        """
+        frozen = FrozenContacts(self.data)
+
+        def copy() -> AddressBook:
+            book = AddressBook()
+            book.data = dict(frozen.items())
+            return book
+        return copy
+
+    def _birthday_range(self, low: int, high: int) -> t.Iterator[tuple[str, date]]:
+        """
+        Names and birthdays of the contacts born from day of year low to high (leap calendar).
+        """
+        index = self._birthdays()
+        for name in index.between(low, high):
+            yield name, index.get(name)
+
+    def _packed_birthdays(self) -> tuple[list[str], array]:
+        """
+        Names of the contacts with a birthday and their birthdays as an array of date ordinals.
+        """
+        return self._birthdays().packed()
+
+    def _check_phone(self, key: str, phone: str) -> None:
+        """
+        Check that a normalized phone number may be given to the record with this name.
+
+        Raises:
+            ValueError: If the book has unique phones and another contact owns the number.
+        """
+        if not self.unique_phones:
+            return
+        for owner in self._phone_owners().owners(phone):
+            if owner != key:
+                raise ValueError(f"The phone '{phone}' already belongs to contact '{owner}'")
+
+    def find_by_phone(self, phone: Phone | str) -> list[Record]:
+        """
+        Find the records that own a phone number.
+
+        Args:
+            phone (Phone) or try valid Str: The phone number to look up.
+        Raises:
+            ValueError: If the phone number isn't valid.
+        Returns:
+            list[Record] or []: list with the owners of the number.
+        """
+        if not isinstance(phone, Phone):
+            phone = Phone(phone)
+        return [self[name] for name in self._phone_owners().owners(phone.value)]
 
     def to_dict(self) -> dict:
         """
@@ -304,47 +856,316 @@ class AddressBook(UserDict):
         Returns:
             dict: A dictionary representing the address book.
         """
-        res_dict = {}
-        for record in self.data.values():
-            res_dict.update(record.to_dict())
-        return res_dict
+        return dict(self._dict_items())
 
-    def from_dict(self, data_json: dict) -> None:
+    def from_dict(self, data_json: dict, lazy: bool = False) -> None:
         """
         Load data from a dictionary into the address book.
 
         Args:
             data_json (dict): A dictionary containing data for the address book.
+            lazy (bool): Keep the raw data and build a Record only on the first access.
         Raises:
             TypeError: If the provided data is not a dictionary.
         """
         if not isinstance(data_json, dict):
             raise TypeError("this is not dict")
-        
-        for name, record in data_json.items():
-            self.add_record(
-                Record(name=name, phones=record['phones'], birthday=record['birthday'])
+        self.from_items(data_json.items(), lazy)
+
+    def from_items(self, items: t.Iterable[tuple[str, dict]], lazy: bool = False) -> None:
+        """
+        Load (name, record data) pairs into the address book one by one.
+
+        In lazy mode the raw phones and birthday are kept as they were loaded and validated 
+        only when the contact is first reached by __getitem__, search, iterator or values(). 
+        Contacts that are never touched go back out through to_dict unchanged.
+
+        Args:
+            items (Iterable[tuple[str, dict]]): Pairs in the format of Record.to_dict, 
+                e.g. a stream of contacts read from a file.
+            lazy (bool): Keep the raw data and build a Record only on the first access.
+        Raises:
+            TypeError: If lazy data of a contact isn't a dictionary.
+            KeyError: If a name is already present in the address book.
+        """
+        if not lazy or self.unique_phones: # уникальность телефонов проверяем сразу
+            for name, record in items:
+                self.add_record(
+                    Record(name=name, phones=record['phones'], birthday=record['birthday'])
+                )
+            return
+
+        for name, record in items:
+            if not isinstance(record, dict):
+                raise TypeError(f"Data of contact {name} is not dict")
+            if name in self:
+                raise KeyError(f"This name '{name}' is already in contacts")
+            self.data[name] = (record['phones'], record['birthday']) # меньше памяти, чем dict
+            self.generation += 1
+            indexes = (
+                self._text_index, self._phone_index, self._birthday_index, 
+                self._name_index, self._fuzzy_index,
             )
+            if any(index is not None for index in indexes):
+                self._index(self[name]) # индексы уже построены - без Record не обойтись
+            else:
+                self._name_changed(name)
+
+    def bulk_add(self, lines: t.Iterable[str], fmt: str = "csv", trusted: bool = False) -> BulkReport:
+        """
+        Add many contacts from CSV or JSON-lines input, collecting the errors instead of stopping.
+
+        CSV rows are "name,phones,birthday" with phones separated by ";" 
+        (a "name,phones,birthday" header is skipped), JSON lines are objects 
+        in the format of AddressBookEncoder. Phones and dates are checked with the same
+        precompiled checks as the fields, and records are built without the Field setters.
+
+        Args:
+            lines (Iterable[str]): Lines of the input, e.g. an opened file.
+            fmt (str): "csv" or "jsonl".
+            trusted (bool): The data was written by the book itself - skip the phone checks 
+                and only parse the dates.
+        Raises:
+            ValueError: If the format is unknown.
+        Returns:
+            BulkReport: The number of added contacts and the errors by input line.
+        """
+        if fmt == "csv":
+            rows = self._csv_rows(lines)
+        elif fmt == "jsonl":
+            rows = self._jsonl_rows(lines)
+        else:
+            raise ValueError(f"Unknown import format '{fmt}', use csv or jsonl")
+        
+        added, errors = 0, []
+        for line_no, row in rows:
+            try:
+                if isinstance(row, Exception):
+                    raise row
+                name, phones, birthday = row
+                if not trusted:
+                    phones = [normalize_phone(phone) for phone in phones]
+                    birthday = None if birthday is None else birthday_ordinal(birthday)
+                elif birthday is not None:
+                    birthday = date.fromisoformat(birthday).toordinal()
+                self[name] = Record._trusted(name, phones, birthday)
+            except (ValueError, KeyError, TypeError, AttributeError) as err:
+                errors.append((line_no, str(err.args[0]) if err.args else repr(err)))
+            else:
+                added += 1
+        return BulkReport(added, errors)
+
+    @staticmethod
+    def _csv_rows(lines: t.Iterable[str]) -> t.Iterator[tuple[int, tuple | Exception]]:
+        reader = csv.reader(lines)
+        for row in reader:
+            if not row or reader.line_num == 1 and [c.strip().lower() for c in row] == ["name", "phones", "birthday"]:
+                continue
+            if not 2 <= len(row) <= 3:
+                yield reader.line_num, ValueError(f"Expected name,phones,birthday but got {row}")
+                continue
+            name, phones, birthday = (row + [""])[:3]
+            phones = [phone.strip() for phone in phones.split(";") if phone.strip()]
+            yield reader.line_num, (name.strip(), phones, birthday.strip() or None)
+
+    @staticmethod
+    def _jsonl_rows(lines: t.Iterable[str]) -> t.Iterator[tuple[int, tuple | Exception]]:
+        for line_no, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                contacts = json.loads(line)
+                if not isinstance(contacts, dict):
+                    raise TypeError(f"Line isn't a JSON object: {line.strip()}")
+            except (ValueError, TypeError) as err:
+                yield line_no, err
+                continue
+            for name, data in contacts.items():
+                if not isinstance(data, dict) or not isinstance(data.get('phones', []), list):
+                    yield line_no, TypeError(f"Contact {name} isn't in the address book format")
+                    continue
+                yield line_no, (name, data.get('phones', []), data.get('birthday'))
+
+    def prefix_names(self, prefix: str, limit: int | None = None) -> list[str]:
+        """
+        Names starting with the prefix in sorted order (e.g. for autocompletion).
+
+        The names are kept in a sorted index, so it takes a binary search 
+        and a slice whatever the size of the book.
+
+        Args:
+            prefix (str): The beginning of the name ("" - all the names).
+            limit (int | None): The maximal number of names.
+        Returns:
+            list[str]: Sorted names.
+        """
+        return self._name_range(prefix, prefix_stop(prefix), limit)
+
+    def prefix(self, prefix: str, limit: int | None = None) -> list[Record]:
+        """
+        Records whose name starts with the prefix, sorted by name.
+
+        Args:
+            prefix (str): The beginning of the name.
+            limit (int | None): The maximal number of records.
+        Returns:
+            list[Record]: Found records.
+        """
+        return [self[name] for name in self.prefix_names(prefix, limit)]
+
+    def closest_names(self, name: str, max_distance: int = 2, limit: int = 5,
+                      wait: bool = True) -> list[tuple[int, str]]:
+        """
+        Names closest to a (mistyped) name by edit distance, ignoring case ("did you mean").
+
+        The names are kept in a trigram index, so only the names sharing enough
+        trigrams with the given one are compared with it. The index is built by the first call.
+
+        Args:
+            name (str): The name to look for.
+            max_distance (int): The maximal number of typos (lower for names shorter than 6 letters).
+            limit (int): The maximal number of names.
+            wait (bool): Build the index now if there is none. If false, a book of BACKGROUND_INDEX
+                names or more starts building it in the background and gets [] until it is ready.
+        Returns:
+            list[tuple[int, str]]: (distance, name) pairs, the closest first.
+        """
+        index = self._fuzzy_names(wait or len(self) < BACKGROUND_INDEX)
+        if index is None:
+            return []
+        return index.closest(name, max_distance, limit)
+
+    def find(self, query: Query, limit: int | None = None, offset: int = 0) -> list[Record]:
+        """
+        Find the contacts matching a structured query, sorted by name.
+
+        Conditions check single fields (see package.query), the planner takes the candidates
+        from the indexes of the book and scans all the contacts only when no index helps.
+
+        Args:
+            query (Query): Conditions, e.g. BirthdayMonth(6) & PhoneStartsWith("38066").
+            limit (int | None): The maximal number of records.
+            offset (int): How many of the first matching records to skip.
+        Returns:
+            list[Record]: Found records.
+        """
+        return self._run_query(query, limit, offset)[0]
+
+    def explain(self, query: Query, limit: int | None = None, offset: int = 0) -> list[str]:
+        """
+        Run a query like find() and describe its plan: the indexes used and the candidates found.
+        """
+        return self._run_query(query, limit, offset)[1]
+
+    def _run_query(self, query: Query, limit: int | None, offset: int) -> tuple[list[Record], list[str]]:
+        return run_query(self, query, limit, offset)
+
+    def name_range(self, start: str, stop: str | None = None, limit: int | None = None) -> list[Record]:
+        """
+        Records with names from start (inclusive) to stop (exclusive), sorted by name.
+
+        Args:
+            start (str): The first name, e.g. "A".
+            stop (str | None): The name to stop before, e.g. "G" for "A" to "F", None - to the end.
+            limit (int | None): The maximal number of records.
+        Returns:
+            list[Record]: Found records.
+        """
+        return [self[name] for name in self._name_range(start, stop, limit)]
+
+    def upcoming(self, days: int, today: date | None = None) -> list[tuple[Record, int]]:
+        """
+        Find the contacts whose birthday is within the given number of days.
+
+        Args:
+            days (int) >= 0: How many days ahead to look (0 - only today).
+            today (date | None): The date to count from, today by default.
+        Raises:
+            ValueError: If days is negative.
+        Returns:
+            list[tuple[Record, int]]: (record, days to birthday) pairs, nearest first.
+        """
+        if days < 0:
+            raise ValueError("Number of days must not be negative")
+        today = today or date.today()
+        
+        if days >= 365:
+            ranges = [(1, 366)]
+        else:
+            end = today + timedelta(days=days)
+            start_key, end_key = day_of_year(today.month, today.day), day_of_year(end.month, end.day)
+            if end.year == today.year:
+                ranges = [(start_key, end_key)]
+            else: # окно переходит через новый год
+                ranges = [(start_key, 366), (1, end_key)]
+        
+        res = []
+        for low, high in ranges:
+            for name, bday in self._birthday_range(low, high):
+                # кандидаты по дню года, точное число дней (02-29) считаем отдельно
+                days_left = days_until(bday.month, bday.day, today)
+                if days_left <= days:
+                    res.append((self[name], days_left))
+        res.sort(key=lambda pair: pair[1])
+        return res
+
+    def birthday_stats(self, today: date | None = None, use_numpy: bool | None = None) -> BirthdayStats:
+        """
+        Compute days to birthday, age and the next birthday for every contact at once.
+
+        The birth dates are taken from the birthday index as a packed array of ordinals,
+        so no record is parsed. Contacts without a birthday are skipped.
+
+        Args:
+            today (date | None): The date to count from, today by default.
+            use_numpy (bool | None): Force (or forbid) the NumPy path, by default used if installed.
+        Returns:
+            BirthdayStats: names with their days, ages and next birthdays in the same order.
+        """
+        names, ordinals = self._packed_birthdays()
+        return birthday_stats(names, ordinals, today or date.today(), use_numpy)
 
     def __str__(self) -> str:
-        return '\n'.join([str(r) for r in self.values()])
+        return '\n'.join([str(r) for r in self._records()])
     
     def search(self, search_word: str) -> list[Record]:
         """
         Search for records containing the given search word.
 
+        The word is matched as a substring of "name phones birthday" of every record,
+        the candidates are taken from the trigram index of the book. Results are cached
+        until the book or any of its records is changed.
+
         Args:
             search_word (str): The word to search in the adress book.
         
         Returns:
             list[Record] or []: list whith found records.
         """
-        search_list = []
-        for record in self.data.values():
-            str_val_record = f"{record.name} {' '.join([str(ph)for ph in record.phones])} {record.birthday}"
-            if search_word in str_val_record:
-                search_list.append(record)
-        return search_list 
+        generation = self.generation
+        found = self.search_cache.get(search_word, generation)
+        if found is None:
+            found = self._search(search_word)
+            self.search_cache.put(search_word, generation, found)
+        return found
+
+    def _search(self, search_word: str) -> list[Record]:
+        """
+        Search without the cache (storage backends override it).
+
+        While the index of a book of BACKGROUND_INDEX contacts or more is built 
+        in the background, the texts of all the contacts are checked one by one.
+        """
+        wait = len(self) < BACKGROUND_INDEX
+        index = self._search_index(wait) if wait or self._text_build is not None else None
+        if index is None:
+            found = [
+                self[name] for name, phones, birthday in self._rows()
+                if search_word in record_text(name, phones, birthday and birthday.isoformat())
+            ]
+            self._search_index(wait=False) # поток стартует после перебора, а не наперегонки с ним
+            return found
+        return [self[name] for name in index.search(search_word)]
               
 
     def iterator(self, item_number: int) -> t.Generator[Record, int, None]:
@@ -364,15 +1185,15 @@ class AddressBook(UserDict):
         """
         if item_number <= 0:
             raise ValueError("Item number must be greater than 0.")
-        elif item_number > len(self.data): # если количство виводов(за раз) больше чем количество записей
-            item_number = len(self.data) # виводим все
         
         list_records = []
-        for counter, record in enumerate(self.data.values(), 1):
+        for record in self._records():
             list_records.append(record)
-            if (not counter % item_number) or counter == len(self.data): 
+            if len(list_records) == item_number: 
                 yield list_records
                 list_records = []
+        if list_records: # остаток (или все, если записей меньше чем за раз)
+            yield list_records
 
 class AddressBookEncoder(json.JSONEncoder):
     def default(self, obj: AddressBook | Record) -> dict[str, str | list[str]] | t.Any:
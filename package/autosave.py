@@ -0,0 +1,106 @@
+import threading
+import time
+import typing as t
+
+from .address_book import AddressBook
+
+
+class AutoSaver:
+    """
+    Background thread that saves an address book some time after it was changed.
+
+    Changes are coalesced: the thread wakes up on notify(), waits delay seconds for more
+    changes (and until interval seconds have passed since the previous write) and saves
+    the book once for all the changes made meanwhile, only if it is still dirty
+    (see AddressBook.dirty).
+
+    A save has two steps: capture() runs under the lock of the commands and takes
+    what has to be written (without disk I/O), the function it returns writes it after
+    the lock is released, so commands wait only for the capture, never for the disk.
+
+    Args:
+        book (AddressBook): The book to save.
+        capture (Callable): Called under the lock, returns the function writing the captured data.
+        lock (ContextManager): The lock held by the commands that change the book.
+        interval (float): The minimal number of seconds between two writes.
+        delay (float): How long to wait after a change before writing it.
+    """
+
+    def __init__(self, book: AddressBook, capture: t.Callable[[], t.Callable[[], None]],
+                 lock: t.ContextManager, interval: float = 5.0, delay: float = 0.5) -> None:
+        self.book = book
+        self.capture = capture
+        self.lock = lock
+        self.interval = interval
+        self.delay = delay
+        self.saves = 0
+        self.last_error: Exception | None = None # ошибка последней попытки, повторим позже
+        self._changed = threading.Event()
+        self._stopping = threading.Event()
+        self._writing = threading.Lock() # поток и flush() из exit не пишут одновременно
+        self._last_write = 0.0
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+            self._thread.start()
+
+    def notify(self) -> None:
+        """
+        Tell the saver the book was changed (cheap, called after every change).
+        """
+        self._changed.set()
+
+    def _run(self) -> None:
+        while True:
+            self._changed.wait()
+            if self._stopping.is_set():
+                return
+            now = time.monotonic()
+            delay = max(self.delay, self._last_write + self.interval - now)
+            if self._stopping.wait(delay):
+                return
+            self._changed.clear()
+            try:
+                self.flush()
+            except Exception as err:
+                self.last_error = err
+                self._changed.set() # попробуем снова через interval
+
+    def flush(self) -> bool:
+        """
+        Save the book now if it has unsaved changes (in the calling thread).
+
+        Returns:
+            bool: Whether the book was written.
+        Raises:
+            Exception: Whatever the capture or the write raised, the book stays dirty.
+        """
+        with self._writing:
+            with self.lock:
+                if not self.book.dirty:
+                    return False
+                generation = self.book.generation
+                write = self.capture()
+            self._last_write = time.monotonic()
+            write()
+            self.book.mark_saved(generation)
+            self.saves += 1
+            self.last_error = None
+            return True
+
+    def stop(self, flush: bool = True) -> None:
+        """
+        Stop the thread and (by default) write the changes that are still pending.
+
+        Raises:
+            Exception: Whatever the last write raised.
+        """
+        self._stopping.set()
+        self._changed.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if flush:
+            self.flush()
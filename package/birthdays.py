@@ -0,0 +1,124 @@
+from array import array
+import calendar
+from datetime import date, timedelta
+import typing as t
+
+try:
+    import numpy as np
+except ImportError: # numpy не обязателен, есть путь на чистом python
+    np = None
+
+
+# date(1970, 1, 1).toordinal() - для перевода ординалов в datetime64
+_EPOCH_ORDINAL = 719163
+
+
+def days_until(month: int, day: int, today: date) -> int:
+    """
+    Count the days from today to the next birthday on the given month and day.
+
+    A 02-29 birthday is celebrated on the day after 02-28 when the year of the
+    next birthday is not a leap one.
+
+    Args:
+        month (int): The month of the birthday.
+        day (int): The day of the birthday.
+        today (date): The date to count from.
+    Returns:
+        int: The number of days until the next birthday (0 if it is today).
+    """
+    year = today.year
+    if (month, day) != (2, 29):
+        bday = date(year, month, day)
+        if today > bday:
+            bday = date(year + 1, month, day)
+        return (bday - today).days
+    
+    if calendar.isleap(year) and today <= date(year, 2, 29):
+        return (date(year, 2, 29) - today).days
+    feb_28 = date(year, 2, 28)
+    if today > feb_28:
+        feb_28 = date(year + 1, 2, 28)
+    return (feb_28 - today).days + 1
+
+
+class BirthdayStats(t.NamedTuple):
+    """
+    Birthday data for many contacts, all the sequences are in the order of names.
+
+    With NumPy the sequences are numpy arrays (next_dates of datetime64[D]),
+    without it - array('l') for days and ages and a list of dates.
+    """
+    names: list[str]
+    days: t.Sequence[int]
+    ages: t.Sequence[int]
+    next_dates: t.Sequence[date]
+
+
+def birthday_stats(
+        names: list[str], 
+        ordinals: array, 
+        today: date, 
+        use_numpy: bool | None = None,
+    ) -> BirthdayStats:
+    """
+    Compute days to the next birthday, age and the next birthday date for many birth dates.
+
+    The results match Record.days_to_birthday, the age is the number of full years today.
+
+    Args:
+        names (list[str]): Names of the contacts.
+        ordinals (array): Birth dates of the contacts as date ordinals.
+        today (date): The date to count from.
+        use_numpy (bool | None): Force (or forbid) the NumPy path, by default used if installed.
+    Raises:
+        ImportError: If the NumPy path is forced but NumPy isn't installed.
+    Returns:
+        BirthdayStats: The computed data.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy:
+        if np is None:
+            raise ImportError("NumPy is not installed")
+        return _numpy_stats(names, ordinals, today)
+    return _python_stats(names, ordinals, today)
+
+
+def _python_stats(names: list[str], ordinals: array, today: date) -> BirthdayStats:
+    days, ages, next_dates = array('l'), array('l'), []
+    for ordinal in ordinals:
+        born = date.fromordinal(ordinal)
+        left = days_until(born.month, born.day, today)
+        next_date = today + timedelta(days=left)
+        days.append(left)
+        ages.append(next_date.year - born.year - (left > 0))
+        next_dates.append(next_date)
+    return BirthdayStats(names, days, ages, next_dates)
+
+
+def _numpy_stats(names: list[str], ordinals: array, today: date) -> BirthdayStats:
+    born = (np.frombuffer(ordinals, dtype=ordinals.typecode) - _EPOCH_ORDINAL).astype('M8[D]')
+    born_years = born.astype('M8[Y]')
+    born_months = born.astype('M8[M]')
+    months = (born_months - born_years.astype('M8[M]')).astype(np.int64) # 0..11
+    days = (born - born_months.astype('M8[D]')).astype(np.int64) # 0..30
+
+    today_64 = np.datetime64(today, 'D')
+    this_year = np.datetime64(f'{today.year:04d}-01', 'M')
+    next_dates = (this_year + months).astype('M8[D]') + days
+    passed = next_dates < today_64
+    next_dates[passed] = ((this_year + 12 + months[passed]).astype('M8[D]') + days[passed])
+
+    # у всех 02-29 один и тот же следующий день рождения - считаем его один раз
+    leap_day = (months == 1) & (days == 28)
+    if leap_day.any():
+        next_dates[leap_day] = np.datetime64(today + timedelta(days=days_until(2, 29, today)), 'D')
+
+    left = (next_dates - today_64).astype(np.int64)
+    ages = (
+        next_dates.astype('M8[Y]').astype(np.int64) 
+        - born_years.astype(np.int64) 
+        - (left > 0)
+    )
+    return BirthdayStats(names, left, ages, next_dates)
@@ -0,0 +1,88 @@
+from collections import OrderedDict
+import threading
+import typing as t
+
+
+class SearchCache:
+    """
+    LRU cache of search results of an address book.
+
+    The cache is stamped with the generation of the book it was filled at
+    (AddressBook.generation grows on every change of the book or of its records),
+    the first lookup at another generation drops all the entries at once.
+    The least recently used entries are dropped when there are more than max_entries
+    of them or more than max_results results in all of them together.
+
+    Args:
+        max_entries (int): The maximal number of cached search words.
+        max_results (int): The maximal total length of the cached results
+            (a result keeps references to records, 8 bytes each), a bigger result isn't cached.
+    """
+
+    def __init__(self, max_entries: int = 256, max_results: int = 1_000_000) -> None:
+        self.max_entries = max_entries
+        self.max_results = max_results
+        self.hits = 0
+        self.misses = 0
+        self.results = 0 # сумма длин закэшированных результатов
+        self._entries: OrderedDict[str, list] = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock() # поиск под read lock идет из многих потоков
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, generation: int) -> list | None:
+        """
+        The cached result for the key (a new list), None if there is none for this generation.
+        """
+        with self._lock:
+            if generation != self._generation:
+                if generation < self._generation: # книгу уже изменили
+                    self.misses += 1
+                    return None
+                self._clear(generation)
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(result)
+
+    def put(self, key: str, generation: int, result: t.Sequence) -> None:
+        """
+        Cache the result of the key found at the generation of the book.
+        """
+        if len(result) > self.max_results:
+            return
+        with self._lock:
+            if generation != self._generation:
+                if generation < self._generation: # книгу уже изменили
+                    return
+                self._clear(generation)
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.results -= len(old)
+            self._entries[key] = list(result)
+            self.results += len(result)
+            while len(self._entries) > self.max_entries or self.results > self.max_results:
+                _, dropped = self._entries.popitem(last=False)
+                self.results -= len(dropped)
+
+    def _clear(self, generation: int) -> None:
+        self._entries.clear()
+        self.results = 0
+        self._generation = generation
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear(self._generation)
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        ratio = f"{self.hits / total:.0%}" if total else "-"
+        return (
+            f"search cache: {self.hits} hits, {self.misses} misses ({ratio} hits), "
+            f"{len(self._entries)} entries, {self.results} results"
+        )
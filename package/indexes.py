@@ -0,0 +1,508 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+import typing as t
+
+
+def record_text(name: str, phones: list[str], birthday: str | None) -> str:
+    """
+    Build the string that AddressBook.search matches a search word against.
+
+    Args:
+        name (str): The name of the contact.
+        phones (list[str]): Normalized phone numbers of the contact.
+        birthday (str | None): ISO birthday or None (rendered as "None", like before).
+    Returns:
+        str: "name phone phone ... birthday"
+    """
+    return f"{name} {' '.join(phones)} {birthday}"
+
+
+class NgramIndex:
+    """
+    Inverted index from n-grams of a record text to the keys of the records containing them.
+
+    Postings are sorted arrays of integer ids (4 bytes an entry) and the texts aren't kept:
+    candidates are checked against the current text of the record given by text_of.
+    Postings of changed and deleted records aren't cleaned, they only add candidates
+    that fail the check; when there are more such changes than keys the index is stale
+    and the book builds a new one.
+
+    Every key gets an integer id in the order it was first added, so results can be
+    returned in the insertion order of the address book.
+
+    Args:
+        text_of (Callable[[str], str]): The current searchable text of a key.
+        n (int): The length of the n-grams.
+    """
+
+    def __init__(self, text_of: t.Callable[[str], str], n: int = 3) -> None:
+        self.n = n
+        self.text_of = text_of
+        self._ids: dict[str, int] = {}
+        self._keys: list[str | None] = [] # id -> key, None - удален
+        self._postings: dict[str, array] = {}
+        self._short: set[int] = set() # тексты короче n - без n-грамм
+        self._garbage = 0 # изменения, после которых в postings остались лишние id
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def stale(self) -> bool:
+        return self._garbage > max(len(self._ids), 1024)
+
+    def _grams(self, text: str) -> set[str]:
+        n = self.n
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+    def add(self, key: str, text: str) -> None:
+        """
+        Add a key to the index or add the n-grams of its new text (the key keeps its position).
+
+        Args:
+            key (str): The key of the record (name).
+            text (str): The searchable text of the record.
+        """
+        postings = self._postings
+        doc_id = self._ids.get(key)
+        if doc_id is None:
+            doc_id = self._ids[key] = len(self._keys)
+            self._keys.append(key)
+            if len(text) < self.n:
+                self._short.add(doc_id)
+            for gram in self._grams(text):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array('I')
+                posting.append(doc_id) # id растут - массив остается отсортированным
+            return
+
+        self._garbage += 1 # старые n-граммы остаются, их отсеет проверка текста
+        if len(text) < self.n:
+            self._short.add(doc_id)
+        for gram in self._grams(text):
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = array('I', (doc_id,))
+                continue
+            inx = bisect_left(posting, doc_id)
+            if inx == len(posting) or posting[inx] != doc_id:
+                posting.insert(inx, doc_id)
+
+    def discard(self, key: str) -> None:
+        """
+        Remove a key from the index, if present.
+
+        Args:
+            key (str): The key of the record (name).
+        """
+        doc_id = self._ids.pop(key, None)
+        if doc_id is None:
+            return
+        self._keys[doc_id] = None
+        self._garbage += 1
+
+    def search(self, word: str) -> list[str]:
+        """
+        Find keys whose text contains the word as a substring.
+
+        Args:
+            word (str): The word to search.
+        Returns:
+            list[str]: Matching keys in the order they were added.
+        """
+        keys, text_of, n = self._keys, self.text_of, self.n
+        if len(word) < n:
+            # у короткого слова нет n-грамм - его содержат n-граммы, в которых оно есть
+            found = {
+                doc_id for doc_id in self._short
+                if (key := keys[doc_id]) is not None and word in text_of(key)
+            }
+            for gram, posting in self._postings.items():
+                if word in gram:
+                    found.update(posting)
+            candidates: t.Iterable[int] = sorted(found)
+        else:
+            postings = []
+            for gram in self._grams(word):
+                posting = self._postings.get(gram)
+                if not posting:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+
+            candidates = postings[0]
+            for posting in postings[1:]:
+                size = len(posting)
+                candidates = [
+                    doc_id for doc_id in candidates
+                    if (inx := bisect_left(posting, doc_id)) < size and posting[inx] == doc_id
+                ]
+                if not candidates:
+                    return []
+        if len(word) <= n and not self._garbage: # слово внутри n-граммы - проверять нечего
+            return [keys[doc_id] for doc_id in candidates]
+        # n-граммы не гарантируют подстроку, а postings могут быть устаревшими - проверяем
+        return [
+            key for doc_id in candidates
+            if (key := keys[doc_id]) is not None and word in text_of(key)
+        ]
+
+
+class PhoneIndex:
+    """
+    Hash index from a normalized phone number to the names of the records that own it.
+    """
+
+    def __init__(self) -> None:
+        self._owners: dict[str, list[str]] = {}
+        self._phones: dict[str, tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._owners)
+
+    def set(self, key: str, phones: list[str]) -> None:
+        """
+        Set (or replace) the phone numbers owned by a key.
+
+        Args:
+            key (str): The key of the record (name).
+            phones (list[str]): Normalized phone numbers of the record.
+        """
+        old = self._phones.get(key, ())
+        new = tuple(phones)
+        if old == new:
+            return
+        for phone in set(old) - set(new):
+            self._drop_owner(phone, key)
+        for phone in set(new) - set(old):
+            self._owners.setdefault(phone, []).append(key)
+        if new:
+            self._phones[key] = new
+        else:
+            self._phones.pop(key, None)
+
+    def discard(self, key: str) -> None:
+        """
+        Remove all the phone numbers of a key, if present.
+
+        Args:
+            key (str): The key of the record (name).
+        """
+        for phone in set(self._phones.pop(key, ())):
+            self._drop_owner(phone, key)
+
+    def _drop_owner(self, phone: str, key: str) -> None:
+        owners = self._owners[phone]
+        owners.remove(key)
+        if not owners:
+            del self._owners[phone]
+
+    def owners(self, phone: str) -> list[str]:
+        """
+        Get the keys that own a phone number.
+
+        Args:
+            phone (str): Normalized phone number.
+        Returns:
+            list[str]: Keys in the order they got the number.
+        """
+        return list(self._owners.get(phone, ()))
+
+
+def prefix_stop(prefix: str) -> str | None:
+    """
+    The smallest string greater than every string starting with the prefix 
+    (None if there is no such string), so a prefix is the range [prefix, prefix_stop(prefix)).
+    """
+    while prefix and prefix[-1] == "\U0010ffff":
+        prefix = prefix[:-1]
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class NameIndex:
+    """
+    Names of records kept sorted (with bisect) for prefix and range queries.
+
+    Added and removed names are collected and merged into the sorted list by the next query:
+    a few of them with bisect, many at once with a sort of the two sorted runs,
+    so adding many names costs one pass instead of a list insert each.
+    """
+
+    # столько изменений вставляем по одному, больше - одной сортировкой
+    FEW_CHANGES = 32
+
+    def __init__(self, names: t.Iterable[str] = ()) -> None:
+        self._names = sorted(names)
+        self._added: set[str] = set()
+        self._removed: set[str] = set()
+
+    def __len__(self) -> int:
+        self._merge()
+        return len(self._names)
+
+    def add(self, key: str) -> None:
+        self._removed.discard(key)
+        self._added.add(key)
+
+    def discard(self, key: str) -> None:
+        self._added.discard(key)
+        self._removed.add(key)
+
+    def _has(self, key: str) -> bool:
+        names = self._names
+        inx = bisect_left(names, key)
+        return inx < len(names) and names[inx] == key
+
+    def _merge(self) -> None:
+        if self._removed:
+            names = self._names
+            if len(self._removed) <= self.FEW_CHANGES:
+                for key in self._removed:
+                    inx = bisect_left(names, key)
+                    if inx < len(names) and names[inx] == key:
+                        del names[inx]
+            else:
+                removed = self._removed
+                self._names = [name for name in names if name not in removed]
+            self._removed = set()
+        if self._added:
+            # add() зовут и при изменении записи - имя может уже быть в списке
+            added = sorted(key for key in self._added if not self._has(key))
+            self._added = set()
+            names = self._names
+            if len(added) <= self.FEW_CHANGES:
+                for key in added:
+                    names.insert(bisect_left(names, key), key)
+            else:
+                names += added
+                names.sort() # два отсортированных куска - timsort сливает их за один проход
+
+    def between(self, start: str, stop: str | None = None, limit: int | None = None) -> list[str]:
+        """
+        Get the names from start (inclusive) to stop (exclusive, None - to the end).
+
+        Args:
+            start (str): The first name.
+            stop (str | None): The name to stop before.
+            limit (int | None): The maximal number of names.
+        Returns:
+            list[str]: Names in sorted order.
+        """
+        self._merge()
+        names = self._names
+        low = bisect_left(names, start)
+        high = len(names) if stop is None else bisect_left(names, stop, low)
+        if limit is not None:
+            high = min(high, low + limit)
+        return names[low:high]
+
+
+def levenshtein(a: str, b: str) -> int:
+    """
+    Edit distance (insertions, deletions, substitutions) of two strings,
+    computed with the bit-parallel algorithm of Myers: one pass over a with int bit masks.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    m = len(b)
+    if not m:
+        return len(a)
+    peq: dict[str, int] = {}
+    for inx, char in enumerate(b):
+        peq[char] = peq.get(char, 0) | (1 << inx)
+    mask, last = (1 << m) - 1, 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for char in a:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return score
+
+
+class FuzzyNameIndex:
+    """
+    Index of names for typo-tolerant lookup: trigrams of the padded lowercase name -> name ids.
+
+    A name within edit distance k of the query keeps all but at most 3k of the query trigrams,
+    so it has to contain one of the 3k + 1 rarest of them: only the names from these
+    postings are compared with the query by Levenshtein distance.
+    Postings are compact arrays, deleted names are skipped and dropped by a rebuild.
+    """
+
+    def __init__(self, names: t.Iterable[str] = ()) -> None:
+        self._ids: dict[str, int] = {}
+        self._names: list[str | None] = [] # id -> name, None - удалено
+        self._keys: list[str] = [] # id -> имя в нижнем регистре
+        self._postings: dict[str, array] = {}
+        for name in names:
+            self.add(name)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @staticmethod
+    def _grams(key: str) -> set[str]:
+        padded = f"\0\0{key}\0\0"
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def add(self, name: str) -> None:
+        if name in self._ids:
+            return
+        name_id = len(self._names)
+        key = name.casefold()
+        self._ids[name] = name_id
+        self._names.append(name)
+        self._keys.append(key)
+        for gram in self._grams(key):
+            posting = self._postings.get(gram)
+            if posting is None:
+                posting = self._postings[gram] = array('I')
+            posting.append(name_id)
+
+    def discard(self, name: str) -> None:
+        name_id = self._ids.pop(name, None)
+        if name_id is None:
+            return
+        self._names[name_id] = None
+        if len(self._names) > 2 * len(self._ids) + 1024: # удаленных больше, чем живых
+            names = [name for name in self._names if name is not None]
+            self.__init__(names)
+
+    def closest(self, word: str, max_distance: int = 2, limit: int = 5) -> list[tuple[int, str]]:
+        """
+        Find the names closest to a word by edit distance (case-insensitive).
+
+        Args:
+            word (str): The (mistyped) name.
+            max_distance (int): The maximal distance, lowered to len(word) // 3 (at least 1)
+                for short words, where more edits match almost anything.
+            limit (int): The maximal number of names.
+        Returns:
+            list[tuple[int, str]]: (distance, name) pairs, the closest first.
+        """
+        key = word.casefold()
+        if not key:
+            return []
+        bound = min(max_distance, max(1, len(key) // 3))
+        grams = self._grams(key)
+        if len(grams) > 3 * bound:
+            postings = sorted(
+                (self._postings.get(gram, ()) for gram in grams), key=len
+            )[:3 * bound + 1]
+            candidates = set().union(*postings)
+        else: # слишком короткое слово - сравниваем со всеми
+            candidates = self._ids.values()
+
+        found = []
+        names, keys = self._names, self._keys
+        for name_id in candidates:
+            name = names[name_id]
+            if name is None or abs(len(keys[name_id]) - len(key)) > bound:
+                continue
+            distance = levenshtein(key, keys[name_id])
+            if distance <= bound:
+                found.append((distance, name))
+        found.sort()
+        return found[:limit]
+
+
+# первый день каждого месяца в високосном году, чтобы у 02-29 был свой день
+_MONTH_STARTS = (0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335)
+
+
+def day_of_year(month: int, day: int) -> int:
+    """
+    Day of year (1-366) of a month and day in a leap year.
+    """
+    return _MONTH_STARTS[month - 1] + day
+
+
+class BirthdayIndex:
+    """
+    Birthdays of records sorted by day of year (in a leap year calendar) for range queries.
+
+    The dates themselves are kept as ordinals, packed into an array on demand.
+    """
+
+    def __init__(self) -> None:
+        self._days: list[int] = []
+        self._keys: list[str] = []
+        self._ordinals: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+    def get(self, key: str) -> date | None:
+        ordinal = self._ordinals.get(key)
+        return None if ordinal is None else date.fromordinal(ordinal)
+
+    def set(self, key: str, birthday: date | None) -> None:
+        """
+        Set (or replace) the birthday of a key, None removes it.
+
+        Args:
+            key (str): The key of the record (name).
+            birthday (date | None): The birthday of the record.
+        """
+        ordinal = None if birthday is None else birthday.toordinal()
+        if self._ordinals.get(key) == ordinal:
+            return
+        self.discard(key)
+        if birthday is None:
+            return
+        day = day_of_year(birthday.month, birthday.day)
+        inx = bisect_right(self._days, day)
+        self._days.insert(inx, day)
+        self._keys.insert(inx, key)
+        self._ordinals[key] = ordinal
+
+    def discard(self, key: str) -> None:
+        """
+        Remove the birthday of a key, if present.
+
+        Args:
+            key (str): The key of the record (name).
+        """
+        ordinal = self._ordinals.pop(key, None)
+        if ordinal is None:
+            return
+        birthday = date.fromordinal(ordinal)
+        day = day_of_year(birthday.month, birthday.day)
+        inx = self._keys.index(key, bisect_left(self._days, day))
+        del self._days[inx]
+        del self._keys[inx]
+
+    def between(self, low: int, high: int) -> list[str]:
+        """
+        Get the keys with a birthday from day low to day high (inclusive).
+
+        Args:
+            low (int): The first day of year.
+            high (int): The last day of year.
+        Returns:
+            list[str]: Keys sorted by day of year.
+        """
+        return self._keys[bisect_left(self._days, low):bisect_right(self._days, high)]
+
+    def packed(self) -> tuple[list[str], array]:
+        """
+        Get all the keys with their birthdays packed as date ordinals.
+
+        Returns:
+            tuple[list[str], array]: keys and an array('l') of ordinals in the same order.
+        """
+        return list(self._ordinals), array('l', self._ordinals.values())
@@ -0,0 +1,167 @@
+import json
+import os
+import typing as t
+
+from .address_book import AddressBook, Record
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as file:
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) == b"\n"
+
+
+class Journal:
+    """
+    Append-only journal of address book changes, written next to a JSON snapshot.
+
+    Every change is one compact JSON list per line: [sequence number, operation, *arguments],
+    a new contact is written in the same form as Record.to_dict: [7, "add", name, {...}].
+    On startup the journal is replayed on top of the last snapshot, and
+    compaction writes a fresh snapshot and truncates the journal.
+
+    Numbers grow across compactions. A snapshot keeps the number of the last entry
+    it contains (AddressBook.journal_seq) and replay skips the entries up to it, so a crash
+    after the snapshot was written but before the journal was truncated doesn't apply
+    the same changes twice. Lines of old journals without numbers are always applied.
+
+    A snapshot written in the background uses rotation instead: when the book is captured
+    the entries are moved aside to "<path>.old" and new changes go to a fresh journal,
+    after the snapshot is written the old part is dropped.
+
+    Args:
+        path (str): The path of the journal file.
+        threshold (int): Number of entries after which compaction is needed.
+        fsync (bool): Sync every entry to disk, not only flush it to the OS.
+    """
+
+    OPERATIONS: dict[str, t.Callable[..., None]] = {
+        "add": lambda book, name, data: book.add_record(Record(name, data["phones"], data["birthday"])),
+        "add_phone": lambda book, name, phone: book[name].add_phone(phone),
+        "change_phone": lambda book, name, old, new: book[name].change_phone(old, new),
+        "remove_phone": lambda book, name, phone: book[name].remove_phone(phone),
+        "birthday": lambda book, name, birthday: book[name].change_birthday(birthday),
+        "delete": lambda book, name: book.__delitem__(name),
+    }
+
+    def __init__(self, path: str, threshold: int = 1000, fsync: bool = False) -> None:
+        self.path = path
+        self.threshold = threshold
+        self.fsync = fsync
+        self._entries = 0
+        self.seq = 0 # номер последней записи, продолжается с replay()
+        self._file = open(path, "a", encoding="utf-8")
+        if self._file.tell() and not _ends_with_newline(path):
+            self._file.write("\n") # строку оборвал сбой - новые записи не должны к ней прилипнуть
+
+    @property
+    def rotated_path(self) -> str:
+        return f"{self.path}.old"
+
+    def __len__(self) -> int:
+        return self._entries
+
+    @property
+    def needs_compaction(self) -> bool:
+        return self._entries >= self.threshold
+
+    def append(self, operation: str, *args: t.Any) -> None:
+        """
+        Write a change to the journal.
+
+        Args:
+            operation (str): One of Journal.OPERATIONS.
+            *args: Arguments of the operation (JSON serializable).
+        Raises:
+            ValueError: If the operation is unknown.
+        """
+        if operation not in self.OPERATIONS:
+            raise ValueError(f"Unknown journal operation '{operation}'")
+        line = json.dumps([self.seq + 1, operation, *args], ensure_ascii=False, separators=(",", ":"))
+        self._file.write(line + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.seq += 1
+        self._entries += 1
+
+    def replay(self, book: AddressBook) -> int:
+        """
+        Apply the changes from the journal file to the address book, call it before append().
+
+        Entries that are already in the book (up to its journal_seq, see AddressBook._saved_seq), 
+        can't be read (a line cut by a crash) or applied are skipped.
+        New entries are numbered after the last one seen.
+
+        Args:
+            book (AddressBook): The address book loaded from the last snapshot.
+        Returns:
+            int: The number of applied entries.
+        """
+        applied = 0
+        self.seq = max(self.seq, book.journal_seq)
+        for path in (self.rotated_path, self.path): # старая часть - если снимок не успел записаться
+            try:
+                file = open(path, "r", encoding="utf-8")
+            except FileNotFoundError:
+                continue
+            with file:
+                for line in file:
+                    self._entries += 1
+                    try:
+                        entry = json.loads(line)
+                        if type(entry[0]) is int:
+                            seq, operation, *args = entry
+                            self.seq = max(self.seq, seq)
+                            if seq <= book._saved_seq(args[0]): # уже в снимке
+                                continue
+                        else: # журнал без номеров
+                            operation, *args = entry
+                        self.OPERATIONS[operation](book, *args)
+                    except (ValueError, KeyError, TypeError, IndexError):
+                        continue
+                    applied += 1
+        return applied
+
+    def compact(self, save: t.Callable[[int], None]) -> None:
+        """
+        Write a fresh snapshot of the address book and truncate the journal.
+
+        Args:
+            save (Callable): Writes the snapshot of the book with journal_seq set 
+                to the number it gets (the last entry written).
+        """
+        save(self.seq)
+        self._file.close()
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._entries = 0
+        self.drop_rotated()
+
+    def rotate(self) -> None:
+        """
+        Move the entries written so far to rotated_path and start an empty journal,
+        the snapshot written after it gets journal_seq = seq taken before the rotation.
+
+        If the rotated part of a failed snapshot is still there, the entries are appended to it.
+        """
+        self._file.close()
+        if os.path.exists(self.rotated_path):
+            with open(self.path, "r", encoding="utf-8") as src:
+                with open(self.rotated_path, "a", encoding="utf-8") as dst:
+                    dst.writelines(src)
+        else:
+            os.replace(self.path, self.rotated_path)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._entries = 0
+
+    def drop_rotated(self) -> None:
+        """
+        Delete the rotated entries once a snapshot containing them is written.
+        """
+        try:
+            os.remove(self.rotated_path)
+        except FileNotFoundError:
+            pass
+
+    def close(self) -> None:
+        self._file.close()
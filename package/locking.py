@@ -0,0 +1,216 @@
+from contextlib import contextmanager
+import threading
+import typing as t
+
+from .address_book import AddressBook, BulkReport, Phone, Record
+from .birthdays import BirthdayStats
+from .indexes import BirthdayIndex, FuzzyNameIndex, NameIndex, NgramIndex, PhoneIndex
+
+
+class RWLock:
+    """
+    Readers-writer lock: many threads may read at once, a writer holds it alone.
+
+    Waiting writers go first, so a stream of readers can't starve them.
+    The thread holding the write lock may take it again and may read,
+    a thread holding the read lock may read again but can't start writing.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._waiting_writers = 0
+        self._writer: int | None = None
+        self._local = threading.local() # глубина вложенного чтения в каждом потоке
+
+    @contextmanager
+    def read(self) -> t.Iterator[None]:
+        depth = getattr(self._local, "depth", 0)
+        if depth or self._writer == threading.get_ident():
+            self._local.depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.depth = depth
+            return
+
+        with self._cond:
+            while self._writer is not None or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        self._local.depth = 1
+        try:
+            yield
+        finally:
+            self._local.depth = 0
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self) -> t.Iterator[None]:
+        """
+        Raises:
+            RuntimeError: If the thread holds the read lock.
+        """
+        me = threading.get_ident()
+        if self._writer == me:
+            yield
+            return
+        if getattr(self._local, "depth", 0):
+            raise RuntimeError("Can't take the write lock while holding the read lock")
+
+        with self._cond:
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = None
+                self._cond.notify_all()
+
+
+class ThreadSafeAddressBook(AddressBook):
+    """
+    In-memory address book that may be shared by many threads.
+
+    Lookups, search, closest_names, find_by_phone, upcoming, iteration and to_dict
+    take the read lock and run at the same time; adding and deleting records and changes
+    of the records of the book take the write lock. Iteration goes over a copy made under the lock
+    and records replace their phone lists instead of changing them, so readers
+    never see a half-done change.
+
+    Args:
+        unique_phones (bool): Reject phone numbers that already belong to another contact.
+    """
+
+    def __init__(self, *args, unique_phones: bool = False, **kwargs) -> None:
+        self._lock = RWLock()
+        self._build_lock = threading.Lock() # ленивые индексы и записи строятся под чтением
+        super().__init__(*args, unique_phones=unique_phones, **kwargs)
+
+    def _writing(self) -> t.ContextManager:
+        return self._lock.write()
+
+    def __getitem__(self, key: str) -> Record:
+        with self._lock.read():
+            return super().__getitem__(key)
+
+    def __setitem__(self, key: str, val: Record) -> None:
+        with self._lock.write():
+            super().__setitem__(key, val)
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock.write():
+            super().__delitem__(key)
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock.read():
+            return super().__contains__(key)
+
+    def __len__(self) -> int:
+        with self._lock.read():
+            return super().__len__()
+
+    def __iter__(self) -> t.Iterator[str]:
+        with self._lock.read():
+            names = list(self.data)
+        return iter(names)
+
+    def values(self) -> list[Record]:
+        """
+        The records taken at once under the read lock (a view would look up every name
+        later and miss the contacts deleted meanwhile).
+        """
+        return list(self._records())
+
+    def items(self) -> list[tuple[str, Record]]:
+        """
+        (name, record) pairs taken at once under the read lock.
+        """
+        return [(record.name.value, record) for record in self._records()]
+
+    def _records(self) -> t.Iterator[Record]:
+        with self._lock.read():
+            return iter(list(super()._records()))
+
+    def _rows(self) -> t.Iterator[tuple]:
+        with self._lock.read():
+            return iter(list(super()._rows()))
+
+    def _dict_items(self) -> t.Iterator[tuple[str, dict]]:
+        with self._lock.read():
+            return iter(list(super()._dict_items()))
+
+    def _materialize(self, name: str, raw: tuple[list[str], str | None]) -> Record:
+        with self._build_lock:
+            record = self.data[name]
+            if type(record) is tuple: # другой поток мог успеть раньше
+                record = super()._materialize(name, record)
+            return record
+
+    def _search_index(self, wait: bool = True) -> NgramIndex | None:
+        with self._build_lock:
+            return super()._search_index(wait)
+
+    def _phone_owners(self) -> PhoneIndex:
+        with self._build_lock:
+            return super()._phone_owners()
+
+    def _birthdays(self) -> BirthdayIndex:
+        with self._build_lock:
+            return super()._birthdays()
+
+    def _names(self) -> NameIndex:
+        with self._build_lock:
+            return super()._names()
+
+    def _fuzzy_names(self, wait: bool = True) -> FuzzyNameIndex | None:
+        with self._build_lock:
+            return super()._fuzzy_names(wait)
+
+    def _name_range(self, start: str, stop: str | None, limit: int | None) -> list[str]:
+        with self._lock.read():
+            index = self._names()
+            with self._build_lock: # запрос вливает в индекс отложенные изменения
+                return index.between(start, stop, limit)
+
+    def closest_names(self, name: str, max_distance: int = 2, limit: int = 5,
+                      wait: bool = True) -> list[tuple[int, str]]:
+        with self._lock.read():
+            return super().closest_names(name, max_distance, limit, wait)
+
+    def _run_query(self, query, limit: int | None, offset: int) -> tuple[list[Record], list[str]]:
+        with self._lock.read():
+            return super()._run_query(query, limit, offset)
+
+    def search(self, search_word: str) -> list[Record]:
+        with self._lock.read():
+            return super().search(search_word)
+
+    def find_by_phone(self, phone: Phone | str) -> list[Record]:
+        with self._lock.read():
+            return super().find_by_phone(phone)
+
+    def upcoming(self, days: int, today=None) -> list[tuple[Record, int]]:
+        with self._lock.read():
+            return super().upcoming(days, today)
+
+    def birthday_stats(self, today=None, use_numpy: bool | None = None) -> BirthdayStats:
+        with self._lock.read():
+            return super().birthday_stats(today, use_numpy)
+
+    def from_items(self, items: t.Iterable[tuple[str, dict]], lazy: bool = False) -> None:
+        with self._lock.write():
+            super().from_items(items, lazy)
+
+    def bulk_add(self, lines: t.Iterable[str], fmt: str = "csv", trusted: bool = False) -> BulkReport:
+        with self._lock.write():
+            return super().bulk_add(lines, fmt, trusted)
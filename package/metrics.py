@@ -0,0 +1,180 @@
+from bisect import bisect_left
+from functools import wraps
+import time
+import typing as t
+
+
+# верхние границы корзин в наносекундах: 1 мкс ... 10 с, шаг 1-2-5
+BUCKETS_NS = tuple(
+    step * 10 ** power for power in range(3, 10) for step in (1, 2, 5)
+) + (10 ** 10,)
+
+
+class Histogram:
+    """
+    Latency histogram with fixed buckets (BUCKETS_NS and one for everything slower).
+
+    Percentiles are the upper bound of the bucket they fall in
+    (but not more than the slowest value seen).
+    """
+
+    __slots__ = ('counts', 'count', 'total_ns', 'max_ns')
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_NS) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def observe(self, ns: int) -> None:
+        self.counts[bisect_left(BUCKETS_NS, ns)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, q: float) -> int:
+        """
+        Approximate q-th percentile (0 < q <= 100) in nanoseconds, 0 for an empty histogram.
+        """
+        rank = self.count * q / 100
+        seen = 0
+        for inx, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(BUCKETS_NS[inx], self.max_ns) if inx < len(BUCKETS_NS) else self.max_ns
+        return 0
+
+
+class CommandStats:
+    __slots__ = ('calls', 'errors', 'latency')
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors: dict[str, int] = {}
+        self.latency = Histogram()
+
+
+class Metrics:
+    """
+    Call counts, errors by exception type and latency histograms of the bot commands.
+    """
+
+    def __init__(self) -> None:
+        self.commands: dict[str, CommandStats] = {}
+
+    def observe(self, name: str, ns: int, error: BaseException | None = None) -> None:
+        """
+        Record one call of a command.
+
+        Args:
+            name (str): The name of the command (handler).
+            ns (int): How long it took, in nanoseconds (time.perf_counter_ns).
+            error (BaseException | None): The exception the command failed with.
+        """
+        stats = self.commands.get(name)
+        if stats is None:
+            stats = self.commands[name] = CommandStats()
+        stats.calls += 1
+        stats.latency.observe(ns)
+        if error is not None:
+            kind = type(error).__name__
+            stats.errors[kind] = stats.errors.get(kind, 0) + 1
+
+    def timed(self, func: t.Callable) -> t.Callable:
+        """
+        Decorator recording the calls of a function (an exception is recorded and raised again).
+        A returned iterator (chunks of a reply) is recorded when it is exhausted, see timed_iter.
+        """
+        name = func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as err:
+                self.observe(name, time.perf_counter_ns() - start, err)
+                raise
+            spent = time.perf_counter_ns() - start
+            if isinstance(result, t.Iterator):
+                return self.timed_iter(name, result, spent)
+            self.observe(name, spent)
+            return result
+        return wrapper
+
+    def timed_iter(self, name: str, items: t.Iterable, spent: int = 0) -> t.Iterator:
+        """
+        Pass the items through, recording one call of the command when they end.
+
+        Only the time spent producing the items is counted, not the time the consumer
+        holds them (printing, waiting for a key between pages).
+
+        Args:
+            name (str): The name of the command (handler).
+            items (Iterable): The lazily produced output of the command.
+            spent (int): Nanoseconds the call itself took before returning the items.
+        """
+        error = None
+        iterator = iter(items)
+        try:
+            while True:
+                start = time.perf_counter_ns()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                except Exception as err:
+                    error = err
+                    raise
+                finally:
+                    spent += time.perf_counter_ns() - start
+                yield item
+        finally:
+            self.observe(name, spent, error)
+
+    def reset(self) -> None:
+        self.commands.clear()
+
+    def report(self) -> str:
+        """
+        Table of the commands, the slowest (by p99) first, times in milliseconds.
+        """
+        if not self.commands:
+            return "no commands yet"
+        lines = [
+            f"{'command':<28}{'calls':>8}{'errors':>8}{'p50':>11}{'p95':>11}{'p99':>11}{'max':>11}"
+        ]
+        rows = sorted(
+            self.commands.items(), key=lambda item: item[1].latency.percentile(99), reverse=True
+        )
+        for name, stats in rows:
+            latency = stats.latency
+            times = [latency.percentile(50), latency.percentile(95), latency.percentile(99), latency.max_ns]
+            lines.append(
+                f"{name:<28}{stats.calls:>8}{sum(stats.errors.values()):>8}"
+                + "".join(f" {ns / 1e6:>10.3f}" for ns in times)
+            )
+        return "\n".join(lines)
+
+    def dump(self) -> dict:
+        """
+        All the data as a JSON-ready dict: buckets (upper bounds in ns, the last one is open)
+        and for every command its calls, errors by type, histogram counts and percentiles.
+        """
+        return {
+            "buckets_ns": list(BUCKETS_NS),
+            "commands": {
+                name: {
+                    "calls": stats.calls,
+                    "errors": dict(stats.errors),
+                    "total_ns": stats.latency.total_ns,
+                    "max_ns": stats.latency.max_ns,
+                    "histogram": list(stats.latency.counts),
+                    "p50_ns": stats.latency.percentile(50),
+                    "p95_ns": stats.latency.percentile(95),
+                    "p99_ns": stats.latency.percentile(99),
+                }
+                for name, stats in self.commands.items()
+            },
+        }
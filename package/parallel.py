@@ -0,0 +1,176 @@
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+import os
+import re
+import typing as t
+
+from .address_book import AddressBook, Record
+from .indexes import record_text
+
+
+# данные процесса-исполнителя: копируются в него один раз, при запуске пула
+_chunks: list[tuple[str, list[int]]] = []
+
+
+def _init_worker(chunks: list[list[str]]) -> None:
+    """
+    Keep the chunks of search texts in the worker as one string per chunk (one text per line)
+    with the offsets of the lines, a substring is found with str.find over the whole chunk.
+    """
+    _chunks.clear()
+    for texts in chunks:
+        starts, offset = [], 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+        _chunks.append(("\n".join(texts), starts))
+
+
+def _scan(chunk_no: int, pattern: str, regex: bool) -> list[int]:
+    """
+    Positions (inside the chunk) of the texts that contain the substring or match the regex.
+    """
+    blob, starts = _chunks[chunk_no]
+    if regex:
+        compiled = re.compile(pattern)
+        return [inx for inx, text in enumerate(blob.split("\n")) if compiled.search(text)]
+
+    found, pos = [], blob.find(pattern)
+    while pos != -1:
+        inx = bisect_right(starts, pos) - 1
+        found.append(inx)
+        if inx + 1 == len(starts):
+            break
+        pos = blob.find(pattern, starts[inx + 1]) # следующее совпадение - в следующей строке
+    return found
+
+
+class ParallelSearch:
+    """
+    Substring and regex search of an address book over a pool of processes.
+
+    The search texts of the book ("name phones birthday", as in AddressBook.search)
+    are split into chunks and sent to every worker once, when the pool starts,
+    queries only send the pattern and get back the positions of the matches.
+    The contacts changed since then (see AddressBook._log_changes) are checked 
+    in this process, their stale matches from the workers are dropped, so writes 
+    don't restart the pool until there are more than max_changes of them.
+    Books smaller than the threshold are searched in this process.
+
+    Args:
+        book (AddressBook): The address book to search, any storage.
+        processes (int | None): Number of worker processes, by default - number of CPUs.
+        threshold (int): Minimal number of contacts to search in parallel.
+        chunk_size (int): Number of contacts in one task.
+        max_changes (int): Number of changed contacts to check here before the texts are taken again.
+    """
+
+    def __init__(
+            self, book: AddressBook, processes: int | None = None,
+            threshold: int = 200_000, chunk_size: int = 50_000, max_changes: int = 10_000
+        ) -> None:
+        self.book = book
+        self.processes = processes or os.cpu_count() or 1
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+        self.max_changes = max_changes
+        self._pool: ProcessPoolExecutor | None = None
+        self._names: list[str] = []
+        self._texts: list[str] = []
+        self._changes: dict[str, bool] | None = None # изменения книги с тех пор, как взяты тексты
+        self._positions: dict[str, int | None] = {} # места измененных имен в self._names
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        if self._changes is not None:
+            self.book._stop_logging(self._changes)
+            self._changes = None
+
+    def __enter__(self) -> 'ParallelSearch':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _refresh(self) -> None:
+        if self._changes is not None and len(self._changes) <= self.max_changes:
+            return
+        self.close()
+        self._names, self._texts, self._positions = [], [], {}
+        for name, phones, birthday in self.book._rows():
+            self._names.append(name)
+            self._texts.append(record_text(name, phones, birthday and birthday.isoformat()))
+        self._changes = self.book._log_changes()
+        if len(self._texts) >= self.threshold:
+            size = self.chunk_size
+            chunks = [self._texts[i:i + size] for i in range(0, len(self._texts), size)]
+            self._pool = ProcessPoolExecutor(
+                self.processes, initializer=_init_worker, initargs=(chunks,)
+            )
+
+    def search(self, pattern: str, regex: bool = False) -> list[Record]:
+        """
+        Find the records whose search text contains the pattern (or matches it as a regex).
+
+        Args:
+            pattern (str): Substring or regular expression.
+            regex (bool): Treat the pattern as a regular expression (re.search).
+        Raises:
+            ValueError: If the regular expression isn't valid.
+        Returns:
+            list[Record]: Found records in the order of AddressBook.search.
+        """
+        if regex:
+            try:
+                match = re.compile(pattern).search
+            except re.error as err:
+                raise ValueError(f"Bad regular expression {pattern}: {err}")
+        elif len(self.book) < self.threshold:
+            return self.book.search(pattern) # маленькая книга - хватает индекса
+        else:
+            match = lambda text: pattern in text
+
+        self._refresh()
+        if self._pool is None:
+            found = [inx for inx, text in enumerate(self._texts) if match(text)]
+        else:
+            count = len(self._texts)
+            futures = [
+                (start, self._pool.submit(_scan, chunk_no, pattern, regex))
+                for chunk_no, start in enumerate(range(0, count, self.chunk_size))
+            ]
+            # результаты склеиваем по порядку частей - получается порядок книги
+            found = [start + inx for start, future in futures for inx in future.result()]
+        return [self.book[name] for name in self._with_changes(found, match)]
+
+    def _with_changes(self, found: list[int], match: t.Callable[[str], t.Any]) -> list[str]:
+        """
+        Names of the found texts with the changes of the book since they were taken: 
+        changed contacts are checked again and keep their places, new ones and the ones 
+        deleted meanwhile (and added again) go at the end, as in the book.
+        """
+        names, changes = self._names, self._changes
+        if not changes:
+            return [names[inx] for inx in found]
+        unplaced = {name for name in changes if name not in self._positions}
+        if unplaced:
+            for inx, name in enumerate(names):
+                if name in unplaced:
+                    self._positions[name] = inx
+            for name in unplaced:
+                self._positions.setdefault(name, None) # новое имя
+
+        hits = [(inx, names[inx]) for inx in found if names[inx] not in changes]
+        moved = []
+        for name, deleted in changes.items():
+            if name not in self.book or not match(self.book._search_text(name)):
+                continue
+            inx = self._positions[name]
+            if deleted or inx is None:
+                moved.append(name)
+            else:
+                hits.append((inx, name))
+        hits.sort()
+        return [name for _, name in hits] + moved
@@ -0,0 +1,369 @@
+"""
+Structured queries of an address book: conditions on single fields combined with & and |.
+
+    from package.query import BirthdayMonth, NameContains, PhoneStartsWith
+    book.find(BirthdayMonth(6) & PhoneStartsWith("38066") & NameContains("an"), limit=10)
+
+Every condition checks one field, so unlike AddressBook.search "Serg 380" can't match
+across the name and the phones. The planner takes candidates from the indexes of the book
+(sorted names, phone owners, birthdays by day of year, the search index), the most selective
+ones first, and checks the whole query only on them; a query no index can answer
+is checked on every contact.
+"""
+import calendar
+from datetime import date
+import re
+import typing as t
+
+from .indexes import day_of_year, prefix_stop
+
+if t.TYPE_CHECKING:
+    from .address_book import AddressBook, Record
+
+# (name, normalized phones, birthday) - как AddressBook._rows
+Row = tuple[str, list[str], date | None]
+
+# ранги индексов: чем меньше, тем меньше кандидатов
+EXACT, PREFIX, MONTH, TEXT = range(4)
+# столько кандидатов проверить проще, чем спрашивать следующий индекс
+FEW_CANDIDATES = 100
+
+
+class Query:
+    """
+    A condition on a contact. rank is how selective the index answering it is
+    (EXACT < PREFIX < MONTH < TEXT), None if there is no index for it.
+    """
+
+    rank: int | None = None
+
+    def match(self, row: Row) -> bool:
+        raise NotImplementedError
+
+    def candidates(self, book: 'AddressBook') -> set[str]:
+        """
+        Names of the contacts that may match (at least all that match), from an index.
+        """
+        raise NotImplementedError
+
+    def plan(self, book: 'AddressBook', steps: list[str], depth: int = 0) -> set[str] | None:
+        """
+        Candidates of the condition, None if the whole book has to be checked.
+        The steps of the plan are appended to steps.
+        """
+        if self.rank is None:
+            steps.append(f"{'  ' * depth}no index for {self}")
+            return None
+        names = self.candidates(book)
+        steps.append(f"{'  ' * depth}index {self}: {len(names)} candidates")
+        return names
+
+    def __and__(self, other: 'Query') -> 'And':
+        return And(self, other)
+
+    def __or__(self, other: 'Query') -> 'Or':
+        return Or(self, other)
+
+
+class _Condition(Query):
+    field = ""
+    op = ""
+
+    def __init__(self, value: t.Any) -> None:
+        self.value = value
+
+    def __str__(self) -> str:
+        return f"{self.field}{self.op}{self.value}"
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.value!r})"
+
+
+class NameIs(_Condition):
+    field, op, rank = "name", "=", EXACT
+
+    def match(self, row: Row) -> bool:
+        return row[0] == self.value
+
+    def candidates(self, book: 'AddressBook') -> set[str]:
+        return {self.value} if self.value in book else set()
+
+
+class NameStartsWith(_Condition):
+    field, op, rank = "name", "^", PREFIX
+
+    def match(self, row: Row) -> bool:
+        return row[0].startswith(self.value)
+
+    def candidates(self, book: 'AddressBook') -> set[str]:
+        return set(book._name_range(self.value, prefix_stop(self.value), None))
+
+
+class NameContains(_Condition):
+    """
+    The name contains the text (case-sensitive, like AddressBook.search).
+    """
+
+    field, op = "name", "~"
+
+    def __init__(self, value: str) -> None:
+        super().__init__(value)
+        # у коротких слов нет триграмм - поиск по индексу перебрал бы всю книгу
+        self.rank = TEXT if len(value) >= 3 else None
+
+    def match(self, row: Row) -> bool:
+        return self.value in row[0]
+
+    def candidates(self, book: 'AddressBook') -> set[str]:
+        return {record.name.value for record in book.search(self.value)}
+
+
+def _digits(value: str) -> str:
+    digits = ''.join(filter(str.isdigit, value))
+    if not digits:
+        raise ValueError(f"Phone condition {value} has no digits")
+    return digits
+
+
+class PhoneIs(_Condition):
+    field, op, rank = "phone", "=", EXACT
+
+    def __init__(self, value: str) -> None:
+        super().__init__(_digits(value))
+
+    def match(self, row: Row) -> bool:
+        return self.value in row[1]
+
+    def candidates(self, book: 'AddressBook') -> set[str]:
+        try:
+            return {record.name.value for record in book.find_by_phone(self.value)}
+        except ValueError: # не номер телефона - такого ни у кого нет
+            return set()
+
+
+class PhoneStartsWith(_Condition):
+    """
+    One of the phones (digits only, as they are kept) starts with the digits.
+    """
+
+    field, op = "phone", "^"
+
+    def __init__(self, value: str) -> None:
+        super().__init__(_digits(value))
+        self.rank = TEXT if len(self.value) >= 3 else None
+
+    def match(self, row: Row) -> bool:
+        return any(phone.startswith(self.value) for phone in row[1])
+
+    def candidates(self, book: 'AddressBook') -> set[str]:
+        return {record.name.value for record in book.search(self.value)}
+
+
+class PhoneContains(PhoneStartsWith):
+    field, op = "phone", "~"
+
+    def match(self, row: Row) -> bool:
+        return any(self.value in phone for phone in row[1])
+
+
+class BirthdayIs(_Condition):
+    field, op, rank = "birthday", "=", EXACT
+
+    def __init__(self, value: date | str) -> None:
+        if isinstance(value, str):
+            try:
+                value = date.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f'Value {value} is not correct format! Also "2023-12-30"')
+        super().__init__(value)
+
+    def match(self, row: Row) -> bool:
+        return row[2] == self.value
+
+    def candidates(self, book: 'AddressBook') -> set[str]:
+        day = day_of_year(self.value.month, self.value.day)
+        return {name for name, birthday in book._birthday_range(day, day) if birthday == self.value}
+
+
+class BirthdayMonth(_Condition):
+    field, op, rank = "month", "=", MONTH
+
+    def __init__(self, value: int | str) -> None:
+        if isinstance(value, str):
+            value = _month(value)
+        if not 1 <= value <= 12:
+            raise ValueError(f"Month {value} isn't from 1 to 12")
+        super().__init__(value)
+
+    def match(self, row: Row) -> bool:
+        return row[2] is not None and row[2].month == self.value
+
+    def candidates(self, book: 'AddressBook') -> set[str]:
+        last = calendar.monthrange(2000, self.value)[1] # високосный год - с 29 февраля
+        low, high = day_of_year(self.value, 1), day_of_year(self.value, last)
+        return {name for name, _ in book._birthday_range(low, high)}
+
+
+def _month(value: str) -> int:
+    if value.isdigit():
+        return int(value)
+    names = [name.lower() for name in calendar.month_name]
+    abbrs = [abbr.lower() for abbr in calendar.month_abbr]
+    value = value.lower()
+    if value in names:
+        return names.index(value)
+    if value in abbrs:
+        return abbrs.index(value)
+    raise ValueError(f"Month {value} isn't a number or a month name")
+
+
+class And(Query):
+    """
+    All the parts match. Candidates come from the most selective indexed part,
+    the next parts only narrow them down while there are many of them.
+    """
+
+    def __init__(self, *parts: Query) -> None:
+        self.parts: list[Query] = []
+        for part in parts:
+            self.parts += part.parts if isinstance(part, And) else [part]
+        ranks = [part.rank for part in self.parts if part.rank is not None]
+        self.rank = min(ranks) if ranks else None
+
+    def __str__(self) -> str:
+        return " and ".join(f"({part})" if isinstance(part, Or) else str(part) for part in self.parts)
+
+    def __repr__(self) -> str:
+        return f"And({', '.join(map(repr, self.parts))})"
+
+    def match(self, row: Row) -> bool:
+        return all(part.match(row) for part in self.parts)
+
+    def plan(self, book: 'AddressBook', steps: list[str], depth: int = 0) -> set[str] | None:
+        indexed = sorted((part for part in self.parts if part.rank is not None), key=lambda part: part.rank)
+        if not indexed:
+            steps.append(f"{'  ' * depth}no index for {self}")
+            return None
+        steps.append(f"{'  ' * depth}and:")
+        names = None
+        for part in indexed:
+            if names is not None and len(names) <= FEW_CANDIDATES:
+                steps.append(f"{'  ' * (depth + 1)}{len(names)} candidates are few, the rest is only checked")
+                break
+            found = part.plan(book, steps, depth + 1)
+            names = found if names is None else names & found
+        steps.append(f"{'  ' * depth}intersection: {len(names)} candidates")
+        return names
+
+
+class Or(Query):
+    """
+    Any of the parts matches. Needs an index for every part, otherwise the book is scanned.
+    """
+
+    def __init__(self, *parts: Query) -> None:
+        self.parts: list[Query] = []
+        for part in parts:
+            self.parts += part.parts if isinstance(part, Or) else [part]
+        ranks = [part.rank for part in self.parts]
+        self.rank = None if None in ranks else max(ranks)
+
+    def __str__(self) -> str:
+        return " or ".join(map(str, self.parts))
+
+    def __repr__(self) -> str:
+        return f"Or({', '.join(map(repr, self.parts))})"
+
+    def match(self, row: Row) -> bool:
+        return any(part.match(row) for part in self.parts)
+
+    def plan(self, book: 'AddressBook', steps: list[str], depth: int = 0) -> set[str] | None:
+        if self.rank is None:
+            missing = next(part for part in self.parts if part.rank is None)
+            steps.append(f"{'  ' * depth}no index for {missing} in {self}")
+            return None
+        steps.append(f"{'  ' * depth}or:")
+        names = set()
+        for part in self.parts:
+            names |= part.plan(book, steps, depth + 1)
+        steps.append(f"{'  ' * depth}union: {len(names)} candidates")
+        return names
+
+
+def run_query(book: 'AddressBook', query: Query, limit: int | None = None,
+              offset: int = 0) -> tuple[list['Record'], list[str]]:
+    """
+    Find the contacts matching the query, sorted by name.
+
+    Args:
+        book (AddressBook): The address book, any storage.
+        query (Query): The conditions.
+        limit (int | None): The maximal number of records.
+        offset (int): How many of the first matching records to skip.
+    Returns:
+        tuple[list[Record], list[str]]: The records and the steps of the plan.
+    """
+    steps: list[str] = []
+    names = query.plan(book, steps)
+    if names is None:
+        steps.append(f"scan {len(book)} contacts")
+        found = [row[0] for row in book._rows() if query.match(row)]
+    else:
+        steps.append(f"check the query on {len(names)} candidates")
+        found = [name for name in names if query.match(book._row(book[name]))]
+    found.sort()
+    stop = None if limit is None else offset + limit
+    steps.append(f"{len(found)} found, sorted by name, showing [{offset}:{'' if stop is None else stop}]")
+    return [book[name] for name in found[offset:stop]], steps
+
+
+_CONDITIONS: dict[tuple[str, str], t.Callable[[str], Query]] = {
+    ("name", "="): NameIs, ("name", "^"): NameStartsWith, ("name", "~"): NameContains,
+    ("phone", "="): PhoneIs, ("phone", "^"): PhoneStartsWith, ("phone", "~"): PhoneContains,
+    ("birthday", "="): BirthdayIs, ("month", "="): BirthdayMonth,
+}
+_CONDITION = re.compile(r"(\w+)([=^~])(.+)")
+
+
+def parse_query(words: list[str]) -> tuple[Query, int | None, int]:
+    """
+    Parse the words of a query: conditions "field=value" (equals), "field^value" (starts with),
+    "field~value" (contains) for name and phone, "birthday=ISO date", "month=6" (or "june"),
+    joined by "and" (or just spaces) and "or" ("and" binds tighter), "limit N" and "offset N".
+
+    Raises:
+        ValueError: If a word or a value isn't valid.
+    Returns:
+        tuple[Query, int | None, int]: The query, the limit and the offset.
+    """
+    groups: list[list[Query]] = [[]]
+    limit, offset = None, 0
+    words = iter(words)
+    for word in words:
+        lower = word.lower()
+        if lower in ("limit", "offset"):
+            value = next(words, "")
+            if not value.isdigit():
+                raise ValueError(f"{lower} needs a number, not '{value}'")
+            if lower == "limit":
+                limit = int(value)
+            else:
+                offset = int(value)
+        elif lower == "and":
+            continue
+        elif lower == "or":
+            groups.append([])
+        else:
+            found = _CONDITION.fullmatch(word)
+            make = found and _CONDITIONS.get((found[1].lower(), found[2]))
+            if not make:
+                raise ValueError(
+                    f"Unknown condition '{word}', use name=, name^, name~, phone=, phone^, phone~, "
+                    "birthday= or month="
+                )
+            groups[-1].append(make(found[3]))
+
+    if not all(groups):
+        raise ValueError("Empty condition around 'or'")
+    parts = [group[0] if len(group) == 1 else And(*group) for group in groups]
+    return (parts[0] if len(parts) == 1 else Or(*parts)), limit, offset
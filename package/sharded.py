@@ -0,0 +1,235 @@
+"""
+Address book split by a hash of the name into several files.
+
+Layout of the directory:
+    manifest.json   - {"version": 1, "shards": N, "counts": [...], "next_order": K, "journal_seq": J}
+    shard-NNN.jsonl - one contact per line: {"name": {"phones": [...], "birthday": ..., "order": 7}},
+                      the first line {"__journal_seq__": J} - the last journal entry in the shard
+
+The shard of a name is crc32(name) % N. "order" keeps the insertion order of the whole book,
+so iteration and to_dict go in the same order as with one file.
+
+Shards are replaced one by one after the manifest, so each of them keeps the number of 
+the last journal entry it was written with: after a crash in the middle of a save the journal
+is replayed only on the shards that don't have the entries yet, and the counts of the manifest
+are corrected from the shards as they are read.
+"""
+import json
+import os
+import typing as t
+import zlib
+from datetime import date
+
+from .address_book import AddressBook, FrozenContacts, Record
+from .storage import JOURNAL_SEQ, iter_jsonl_contacts
+
+
+VERSION = 1
+MANIFEST = "manifest.json"
+
+
+def shard_of(name: str, shards: int) -> int:
+    return zlib.crc32(name.encode("utf-8")) % shards
+
+
+def _write_atomic(path: str, lines: t.Iterable[str]) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        file.writelines(lines)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+class ShardedAddressBook(AddressBook):
+    """
+    Address book kept in N shard files, a shard is read on the first access to one of its names.
+
+    Lookups, adding and deleting a name read only its shard, iteration, search and
+    the other whole-book operations read all of them. save() rewrites only the shards
+    changed since the last save and the manifest.
+
+    Args:
+        path (str): The directory of the book, created by the first save().
+        shards (int): Number of shards of a new book (an existing one keeps its own).
+        unique_phones (bool): Reject phone numbers that already belong to another contact.
+    Raises:
+        ValueError: If the manifest isn't of a sharded address book.
+    """
+
+    def __init__(self, path: str, shards: int = 16, unique_phones: bool = False) -> None:
+        self.path = path
+        manifest = {"version": VERSION, "shards": shards, "counts": [0] * shards, "next_order": 0}
+        try:
+            with open(os.path.join(path, MANIFEST), encoding="utf-8") as file:
+                manifest = json.load(file)
+        except FileNotFoundError:
+            pass
+        if manifest.get("version") != VERSION:
+            raise ValueError(f"{path} isn't a sharded address book of version {VERSION}")
+        self.shards: int = manifest["shards"]
+        self._counts: list[int] = manifest["counts"]
+        self._next_order: int = manifest["next_order"]
+        self._shard_seqs: dict[int, int] = {} # journal_seq прочитанных шардов
+        self._order: dict[str, int] = {}
+        self._members: dict[int, dict[str, None]] = {} # имена прочитанных шардов
+        self._dirty: set[int] = set()
+        self._sorted = True # self.data идет в порядке order
+        super().__init__(unique_phones=unique_phones)
+        self.journal_seq = manifest.get("journal_seq", 0)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path!r})"
+
+    def _shard_path(self, shard: int) -> str:
+        return os.path.join(self.path, f"shard-{shard:03d}.jsonl")
+
+    def _load_shard(self, shard: int) -> dict[str, None]:
+        members = self._members.get(shard)
+        if members is not None:
+            return members
+        members = self._members[shard] = {}
+        try:
+            with open(self._shard_path(shard), encoding="utf-8") as file:
+                for name, data in iter_jsonl_contacts(file):
+                    if name == JOURNAL_SEQ:
+                        self._shard_seqs[shard] = data
+                        continue
+                    self.data[name] = (data["phones"], data["birthday"]) # Record - при обращении
+                    self._order[name] = data["order"]
+                    self._next_order = max(self._next_order, data["order"] + 1)
+                    members[name] = None
+        except FileNotFoundError:
+            pass
+        self._counts[shard] = len(members) # манифест отстает, если сбой был посреди save()
+        if members:
+            self._sorted = False
+        return members
+
+    def _saved_seq(self, name: str) -> int:
+        shard = shard_of(name, self.shards)
+        self._load_shard(shard)
+        return self._shard_seqs.get(shard, 0)
+
+    def _load_all(self) -> None:
+        """
+        Read all the shards and put the records in the insertion order of the book.
+        """
+        for shard in range(self.shards):
+            self._load_shard(shard)
+        if not self._sorted:
+            order = self._order
+            self.data = dict(sorted(self.data.items(), key=lambda item: order[item[0]]))
+            self._sorted = True
+
+    def _added(self, key: str) -> None:
+        if key in self._order:
+            return
+        shard = shard_of(key, self.shards)
+        self._order[key] = self._next_order
+        self._next_order += 1
+        self._members[shard][key] = None
+        self._counts[shard] += 1
+        self._dirty.add(shard)
+
+    def __getitem__(self, key: str) -> Record:
+        self._load_shard(shard_of(key, self.shards))
+        return super().__getitem__(key)
+
+    def __setitem__(self, key: str, val: Record) -> None:
+        if isinstance(key, str):
+            self._load_shard(shard_of(key, self.shards))
+        super().__setitem__(key, val)
+        self._added(key)
+
+    def __delitem__(self, key: str) -> None:
+        if isinstance(key, str):
+            self._load_shard(shard_of(key, self.shards))
+        super().__delitem__(key)
+        shard = shard_of(key, self.shards)
+        del self._order[key]
+        del self._members[shard][key]
+        self._counts[shard] -= 1
+        self._dirty.add(shard)
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        return key in self._load_shard(shard_of(key, self.shards))
+
+    def __iter__(self) -> t.Iterator[str]:
+        self._load_all()
+        return super().__iter__()
+
+    def __len__(self) -> int:
+        return sum(self._counts)
+
+    def _record_changed(self, record: Record) -> None:
+        super()._record_changed(record)
+        self._dirty.add(shard_of(record.name.value, self.shards))
+
+    def _records(self) -> t.Iterator[Record]:
+        self._load_all()
+        return super()._records()
+
+    def _rows(self) -> t.Iterator[tuple[str, list[str], date | None]]:
+        self._load_all()
+        return super()._rows()
+
+    def _dict_items(self) -> t.Iterator[tuple[str, dict]]:
+        self._load_all()
+        return super()._dict_items()
+
+    def _capture(self) -> t.Callable[[], AddressBook]:
+        self._load_all() # копия берется из self.data
+        return super()._capture()
+
+    def from_items(self, items: t.Iterable[tuple[str, dict]], lazy: bool = False) -> None:
+        for name, record in items:
+            super().from_items(((name, record),), lazy)
+            self._added(name) # ленивая загрузка пишет в self.data мимо __setitem__
+
+    def save(self) -> None:
+        """
+        Write the shards changed since the last save and the manifest (each file atomically).
+        """
+        self.prepare_save()()
+
+    def prepare_save(self) -> t.Callable[[], None]:
+        """
+        Take the contacts of the changed shards (only references, see FrozenContacts) 
+        and the manifest now, write them later.
+
+        The returned function builds the lines, does the disk I/O and doesn't touch the book, 
+        so it may run in another thread while the book is changed (if it fails, the shards stay dirty).
+        """
+        data, order = self.data, self._order
+        shards = [] # только ссылки, строки JSON собирает write()
+        for shard in sorted(self._dirty):
+            members = self._members[shard]
+            shards.append((
+                shard, FrozenContacts({name: data[name] for name in members}),
+                {name: order[name] for name in members},
+            ))
+        manifest = {
+            "version": VERSION, "shards": self.shards,
+            "counts": list(self._counts), "next_order": self._next_order,
+            "journal_seq": self.journal_seq,
+        }
+        written, self._dirty = self._dirty, set()
+
+        def write() -> None:
+            try:
+                os.makedirs(self.path, exist_ok=True)
+                # манифест первым: после сбоя next_order не меньше номеров в шардах
+                _write_atomic(os.path.join(self.path, MANIFEST), [json.dumps(manifest)])
+                for shard, contacts, orders in shards:
+                    lines = [json.dumps({JOURNAL_SEQ: manifest["journal_seq"]}) + "\n"]
+                    for name, (phones, birthday) in contacts.items():
+                        data = {"phones": phones, "birthday": birthday, "order": orders[name]}
+                        lines.append(json.dumps({name: data}, ensure_ascii=False) + "\n")
+                    _write_atomic(self._shard_path(shard), lines)
+            except BaseException:
+                self._dirty |= written
+                raise
+        return write
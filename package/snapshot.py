@@ -0,0 +1,341 @@
+"""
+Binary snapshot of an address book, opened with mmap.
+
+Layout (little endian):
+    header   - magic, version, number of records, offset of the index,
+               number of the last journal entry in the snapshot (AddressBook.journal_seq)
+    payloads - records in insertion order:
+               name (u16 length + utf-8), phones (u8 count, u16 length + utf-8 each),
+               birthday (i32 date ordinal, 0 - no birthday)
+    index    - u64 offsets of the payloads sorted by the utf-8 name
+
+Version 1 had no journal number in the header and wrote phones with u8 length in ascii,
+such files are still read.
+
+Convert the existing JSON files:
+    python -m package from-json test.json test.snapshot
+    python -m package to-json test.snapshot test.json
+"""
+from datetime import date
+import heapq
+from itertools import islice
+import mmap
+import os
+import struct
+import typing as t
+
+from .address_book import AddressBook, FrozenContacts, NameNotFoundError, Record
+from .indexes import record_text
+from .storage import load_json, save_json
+
+
+MAGIC = b"ABOOKSNP"
+VERSION = 2
+VERSIONS = (1, 2) # читаем и старый формат
+# magic, version, reserved, count, index offset (+ journal seq с версии 2)
+HEADERS = {1: struct.Struct("<8sHHIQ"), 2: struct.Struct("<8sHHIQQ")}
+HEADER = HEADERS[VERSION]
+OFFSET = struct.Struct("<Q")
+NAME_LEN = struct.Struct("<H")
+PHONE_LEN = {1: struct.Struct("<B"), 2: struct.Struct("<H")} # по версии файла
+BIRTHDAY = struct.Struct("<i")
+
+
+def _encode(name: str, phones: list[str], birthday: date | None) -> bytes:
+    name_bytes = name.encode("utf-8")
+    if len(name_bytes) > 0xFFFF or len(phones) > 0xFF:
+        raise ValueError(f"Contact {name} is too big for the snapshot format")
+    parts = [NAME_LEN.pack(len(name_bytes)), name_bytes, bytes([len(phones)])]
+    phone_len = PHONE_LEN[VERSION]
+    for phone in phones:
+        phone_bytes = phone.encode("utf-8") # str.isdigit пропускает и не ASCII цифры
+        if len(phone_bytes) > 0xFFFF:
+            raise ValueError(f"Phone of contact {name} is too long for the snapshot format")
+        parts += [phone_len.pack(len(phone_bytes)), phone_bytes]
+    parts.append(BIRTHDAY.pack(0 if birthday is None else birthday.toordinal()))
+    return b"".join(parts)
+
+
+def write_snapshot(book: AddressBook, path: str) -> None:
+    """
+    Write the address book to a binary snapshot file atomically (temporary file and rename),
+    if writing fails the temporary file is removed and the old snapshot is left as it was.
+
+    Args:
+        book (AddressBook): The address book to save.
+        path (str): The path of the snapshot file.
+    Raises:
+        ValueError: If a contact doesn't fit the format (too long name or phone, too many phones).
+    """
+    tmp_path = f"{path}.tmp"
+    try:
+        _write_file(book, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _write_file(book: AddressBook, path: str) -> None:
+    index = []
+    with open(path, "wb") as file:
+        file.write(bytes(HEADER.size)) # заголовок пишем в конце, когда все известно
+        offset = HEADER.size
+        for name, phones, birthday in book._rows():
+            payload = _encode(name, phones, birthday)
+            index.append((name.encode("utf-8"), offset))
+            file.write(payload)
+            offset += len(payload)
+
+        index.sort()
+        file.write(b"".join(OFFSET.pack(record_offset) for _, record_offset in index))
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, VERSION, 0, len(index), offset, book.journal_seq))
+        file.flush()
+        os.fsync(file.fileno())
+
+
+class SnapshotAddressBook(AddressBook):
+    """
+    Address book opened from a binary snapshot without reading it.
+
+    A record is decoded from the memory-mapped file only when it is touched for the first time,
+    so opening takes the same time for any size of the book. Touched, new and deleted records
+    are kept in memory until the book is saved with save().
+
+    Args:
+        path (str): The path of the snapshot file.
+        unique_phones (bool): Reject phone numbers that already belong to another contact.
+    Raises:
+        ValueError: If the file isn't an address book snapshot.
+    """
+
+    def __init__(self, path: str, unique_phones: bool = False) -> None:
+        super().__init__(unique_phones=unique_phones)
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADERS[1].size:
+            raise ValueError(f"{path} isn't an address book snapshot")
+        magic, version, *_ = HEADERS[1].unpack_from(self._map, 0)
+        if magic != MAGIC or version not in VERSIONS or len(self._map) < HEADERS[version].size:
+            raise ValueError(f"{path} isn't an address book snapshot of version {VERSION}")
+        _, _, _, self._count, self._index_offset, *journal_seq = HEADERS[version].unpack_from(self._map, 0)
+        self.journal_seq = journal_seq[0] if journal_seq else 0
+        self._start = HEADERS[version].size # первая запись
+        self._phone_len = PHONE_LEN[version]
+        self._deleted: set[str] = set() # удаленные записи из файла
+        self._new: dict[str, None] = {} # добавленные после открытия, по порядку
+
+    def close(self) -> None:
+        self._map.close()
+
+    def save(self, path: str | None = None) -> None:
+        """
+        Write the book (with all the changes) to a snapshot file, by default to the opened one.
+        """
+        write_snapshot(self, path or self.path)
+
+    def _name_at(self, offset: int) -> tuple[bytes, int]:
+        length, = NAME_LEN.unpack_from(self._map, offset)
+        start = offset + NAME_LEN.size
+        return self._map[start:start + length], start + length
+
+    def _decode(self, offset: int) -> tuple[tuple[str, list[str], date | None], int]:
+        name, pos = self._name_at(offset)
+        phones = []
+        phone_len = self._phone_len
+        count = self._map[pos]
+        pos += 1
+        for _ in range(count):
+            length, = phone_len.unpack_from(self._map, pos)
+            pos += phone_len.size
+            phones.append(self._map[pos:pos + length].decode("utf-8"))
+            pos += length
+        ordinal, = BIRTHDAY.unpack_from(self._map, pos)
+        birthday = date.fromordinal(ordinal) if ordinal else None
+        return (name.decode("utf-8"), phones, birthday), pos + BIRTHDAY.size
+
+    def _offset_at(self, inx: int) -> int:
+        offset, = OFFSET.unpack_from(self._map, self._index_offset + inx * OFFSET.size)
+        return offset
+
+    def _bisect(self, key_bytes: bytes) -> int:
+        """
+        Binary search in the index of the file: the position of the first name not less than key_bytes.
+        """
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            if self._name_at(self._offset_at(mid))[0] < key_bytes:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _lookup(self, key: str) -> int | None:
+        """
+        Find a name in the index of the file, returns the offset of its payload.
+        """
+        key_bytes = key.encode("utf-8")
+        inx = self._bisect(key_bytes)
+        if inx < self._count:
+            offset = self._offset_at(inx)
+            if self._name_at(offset)[0] == key_bytes:
+                return offset
+        return None
+
+    def _in_file(self, key: str) -> bool:
+        return key not in self._deleted and self._lookup(key) is not None
+
+    def _raw(self, offset: int) -> tuple[list[str], str | None]:
+        """
+        (phones, birthday) of the contact at offset, as AddressBook._materialize takes them.
+        """
+        _, phones, birthday = self._decode(offset)[0]
+        return phones, birthday and birthday.isoformat()
+
+    def __getitem__(self, key: str) -> Record:
+        record = self.data.get(key)
+        if record is not None:
+            return record
+        offset = None if key in self._deleted else self._lookup(key)
+        if offset is None:
+            raise NameNotFoundError(key)
+        return self._materialize(key, self._raw(offset))
+
+    def __setitem__(self, key: str, val: Record) -> None:
+        super().__setitem__(key, val)
+        self._new[key] = None
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        if key in self._new:
+            del self._new[key]
+        else:
+            self._deleted.add(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.data or (isinstance(key, str) and self._in_file(key))
+
+    def __iter__(self) -> t.Iterator[str]:
+        for name, _ in self._iter_entries():
+            yield name
+
+    def __len__(self) -> int:
+        return self._count - len(self._deleted) + len(self._new)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path!r})"
+
+    def _iter_entries(
+            self, deleted: t.Container[str] | None = None, new: t.Iterable[str] | None = None,
+        ) -> t.Iterator[tuple[str, int | None]]:
+        """
+        Names in insertion order with the offset of the payload (None for records only in memory),
+        deleted and new are the current ones by default.
+        """
+        deleted = self._deleted if deleted is None else deleted
+        phone_len = self._phone_len
+        offset = self._start
+        while offset < self._index_offset:
+            name, end = self._name_at(offset)
+            name = name.decode("utf-8")
+            if name not in deleted:
+                yield name, offset
+            offset = end + 1 # дальше телефоны, их пропускаем по длинам
+            for _ in range(self._map[end]):
+                offset += phone_len.size + phone_len.unpack_from(self._map, offset)[0]
+            offset += BIRTHDAY.size
+        for name in self._new if new is None else new:
+            yield name, None
+
+    def _capture(self) -> t.Callable[[], AddressBook]:
+        """
+        Take only the records in memory and the lists of deleted and new names,
+        the file is read by the returned function (the mapping stays valid after a new save).
+        """
+        frozen = FrozenContacts(self.data)
+        deleted, new = set(self._deleted), list(self._new)
+
+        def copy() -> AddressBook:
+            book = AddressBook()
+            for name, offset in self._iter_entries(deleted, new):
+                if name in frozen:
+                    book.data[name] = frozen[name]
+                else:
+                    book.data[name] = self._raw(offset)
+            return book
+        return copy
+
+    def _records(self) -> t.Iterator[Record]:
+        for name, offset in self._iter_entries():
+            record = self.data.get(name)
+            if record is None:
+                record = self._materialize(name, self._raw(offset))
+            yield record
+
+    def _dict_items(self) -> t.Iterator[tuple[str, dict]]:
+        for name, phones, birthday in self._rows():
+            yield name, {"phones": phones, "birthday": birthday and birthday.isoformat()}
+
+    def from_items(self, items: t.Iterable[tuple[str, dict]], lazy: bool = False) -> None:
+        """
+        Add (name, record data) pairs to the book, 
+        lazy is ignored: new records are kept in memory until save().
+        """
+        super().from_items(items)
+
+    def _search_text(self, name: str) -> str:
+        record = self.data.get(name)
+        if record is not None:
+            return record.search_text()
+        _, phones, birthday = self._decode(self._lookup(name))[0]
+        return record_text(name, phones, birthday and birthday.isoformat())
+
+    def _file_names(self, start: str, stop: str | None) -> t.Iterator[str]:
+        stop_bytes = None if stop is None else stop.encode("utf-8")
+        for inx in range(self._bisect(start.encode("utf-8")), self._count):
+            name, _ = self._name_at(self._offset_at(inx))
+            if stop_bytes is not None and name >= stop_bytes:
+                return
+            name = name.decode("utf-8")
+            if name not in self._deleted:
+                yield name
+
+    def _name_range(self, start: str, stop: str | None, limit: int | None) -> list[str]:
+        """
+        Names from the sorted index of the file (utf-8 keeps the order of str) merged 
+        with the new ones, only the names in the range are read.
+        """
+        new = sorted(name for name in self._new if name >= start and (stop is None or name < stop))
+        return list(islice(heapq.merge(self._file_names(start, stop), new), limit))
+
+    def _rows(self) -> t.Iterator[tuple[str, list[str], date | None]]:
+        for name, offset in self._iter_entries():
+            record = self.data.get(name)
+            yield self._row(record) if record is not None else self._decode(offset)[0]
+
+
+def json_to_snapshot(json_path: str, snapshot_path: str) -> None:
+    """
+    Convert an address book JSON file (AddressBookEncoder format) to a binary snapshot.
+    """
+    book = AddressBook()
+    load_json(book, json_path)
+    write_snapshot(book, snapshot_path)
+
+
+def snapshot_to_json(snapshot_path: str, json_path: str) -> None:
+    """
+    Convert a binary snapshot to an address book JSON file (AddressBookEncoder format).
+    """
+    book = SnapshotAddressBook(snapshot_path)
+    try:
+        save_json(book, json_path)
+    finally:
+        book.close()
+
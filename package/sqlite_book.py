@@ -0,0 +1,283 @@
+from array import array
+from contextlib import contextmanager
+from datetime import date
+import sqlite3
+import typing as t
+
+from .address_book import AddressBook, BulkReport, NameNotFoundError, Phone, Record
+from .indexes import day_of_year
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    birthday INTEGER,
+    birthday_day INTEGER,
+    search_text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contacts_birthday_day ON contacts (birthday_day);
+CREATE TABLE IF NOT EXISTS phones (
+    contact_id INTEGER NOT NULL REFERENCES contacts (id),
+    position INTEGER NOT NULL,
+    phone TEXT NOT NULL,
+    PRIMARY KEY (contact_id, position)
+);
+CREATE INDEX IF NOT EXISTS phones_phone ON phones (phone);
+"""
+
+# телефоны - только цифры, поэтому их можно склеить через пробел
+SELECT_RECORDS = """
+SELECT name, birthday, (
+    SELECT group_concat(phone, ' ') FROM (
+        SELECT phone FROM phones WHERE contact_id = contacts.id ORDER BY position
+    )
+)
+FROM contacts
+"""
+
+
+class SQLiteAddressBook(AddressBook):
+    """
+    Address book stored in an SQLite database instead of memory.
+
+    It has the same mapping API as AddressBook. Records are built only when they are read,
+    and every change (a new or deleted record, a change of a record field) is written
+    at once in its own transaction. Name, phone and birthday columns are indexed.
+
+    Args:
+        path (str): The path of the database file (":memory:" for a temporary one).
+        unique_phones (bool): Reject phone numbers that already belong to another contact.
+    """
+
+    def __init__(self, path: str, unique_phones: bool = False) -> None:
+        super().__init__(unique_phones=unique_phones)
+        self.path = path
+        self.connection = sqlite3.connect(path, isolation_level=None) # транзакции открываем сами
+        self.connection.executescript(SCHEMA)
+        self._transaction_depth = 0
+
+    @contextmanager
+    def transaction(self) -> t.Iterator[sqlite3.Connection]:
+        """
+        Group the writes inside the block into one transaction (nested blocks join the outer one).
+        """
+        if self._transaction_depth:
+            self._transaction_depth += 1
+            try:
+                yield self.connection
+            finally:
+                self._transaction_depth -= 1
+            return
+
+        self._transaction_depth = 1
+        self.connection.execute("BEGIN")
+        try:
+            yield self.connection
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        else:
+            self.connection.execute("COMMIT")
+        finally:
+            self._transaction_depth = 0
+
+    def close(self) -> None:
+        self.connection.close()
+
+    @staticmethod
+    def _row_of(name: str, birthday: int | None, phones: str | None) -> tuple[str, list[str], date | None]:
+        return (
+            name, 
+            phones.split(" ") if phones else [], 
+            None if birthday is None else date.fromordinal(birthday),
+        )
+
+    def _record(self, name: str, birthday: int | None, phones: str | None) -> Record:
+        name, phones, birthday = self._row_of(name, birthday, phones)
+        record = Record(name, phones, birthday and birthday.isoformat())
+        record.book = self
+        return record
+
+    def _select(self, where: str = "", params: tuple = ()) -> t.Iterator[Record]:
+        for row in self.connection.execute(f"{SELECT_RECORDS} {where} ORDER BY id", params):
+            yield self._record(*row)
+
+    def __getitem__(self, key: str) -> Record:
+        """
+        Read a record from the database by its name.
+
+        Raises:
+            NameNotFoundError: If the provided name is not found in the address book.
+        """
+        for record in self._select("WHERE name = ?", (key,)):
+            return record
+        raise NameNotFoundError(key)
+
+    def __setitem__(self, key: str, val: Record) -> None:
+        """
+        Insert a new record into the database.
+
+        Raises:
+            TypeError: If the given value is not an instance of the Record class.
+            ValueError: If the key doesn't match the name of the record.
+            KeyError: If the provided name is already present in the address book.
+        """
+        if not isinstance(val, Record):
+            raise TypeError("Record must be an instance of the Record class.")
+        if key != val.name.value:
+            raise ValueError(f"Key '{key}' doesn't match the record name '{val.name}'")
+        if key in self:
+            raise KeyError(f"This name '{key}' is already in contacts")
+        for phone in val.phones:
+            self._check_phone(key, phone.value)
+
+        with self.transaction() as connection:
+            connection.execute(
+                "INSERT INTO contacts (name, search_text) VALUES (?, ?)", (key, "")
+            )
+            self._write_fields(val)
+        val.book = self
+        self._name_changed(key)
+        self.generation += 1
+
+    def __delitem__(self, key: str) -> None:
+        """
+        Delete a record from the database by its name.
+
+        Raises:
+            KeyError: If the key isn't a string.
+            NameNotFoundError: If the provided name is not found in the address book.
+        """
+        if not isinstance(key, str):
+            raise KeyError("Value must be string")
+        with self.transaction() as connection:
+            row = connection.execute("SELECT id FROM contacts WHERE name = ?", (key,)).fetchone()
+            if row is None:
+                raise NameNotFoundError(key, f"Can't delete contact {key} isn't in Address Book")
+            connection.execute("DELETE FROM phones WHERE contact_id = ?", row)
+            connection.execute("DELETE FROM contacts WHERE id = ?", row)
+        self._name_deleted(key)
+        self.generation += 1
+
+    def __contains__(self, key: object) -> bool:
+        row = self.connection.execute("SELECT 1 FROM contacts WHERE name = ?", (key,)).fetchone()
+        return row is not None
+
+    def __iter__(self) -> t.Iterator[str]:
+        for name, in self.connection.execute("SELECT name FROM contacts ORDER BY id"):
+            yield name
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT count(*) FROM contacts").fetchone()[0]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path!r})"
+
+    def _search_text(self, name: str) -> str:
+        row = self.connection.execute("SELECT search_text FROM contacts WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise NameNotFoundError(name)
+        return row[0]
+
+    def _write_fields(self, record: Record) -> None:
+        """
+        Write the phones, the birthday and the search text of a record that is already in the table.
+        """
+        birthday = birthday_day = None
+        if record.birthday is not None:
+            bday = record.birthday.get_date()
+            birthday, birthday_day = bday.toordinal(), day_of_year(bday.month, bday.day)
+        contact_id, = self.connection.execute(
+            "SELECT id FROM contacts WHERE name = ?", (record.name.value,)
+        ).fetchone()
+        self.connection.execute(
+            "UPDATE contacts SET birthday = ?, birthday_day = ?, search_text = ? WHERE id = ?",
+            (birthday, birthday_day, record.search_text(), contact_id),
+        )
+        self.connection.execute("DELETE FROM phones WHERE contact_id = ?", (contact_id,))
+        self.connection.executemany(
+            "INSERT INTO phones (contact_id, position, phone) VALUES (?, ?, ?)",
+            [(contact_id, inx, phone.value) for inx, phone in enumerate(record.phones)],
+        )
+
+    def _record_changed(self, record: Record) -> None:
+        with self.transaction():
+            self._write_fields(record)
+        self._name_changed(record.name.value)
+        self.generation += 1
+
+    def _records(self) -> t.Iterator[Record]:
+        return self._select()
+
+    def _rows(self) -> t.Iterator[tuple[str, list[str], date | None]]:
+        for row in self.connection.execute(f"{SELECT_RECORDS} ORDER BY id"):
+            yield self._row_of(*row)
+
+    def _dict_items(self) -> t.Iterator[tuple[str, dict]]:
+        for name, phones, birthday in self._rows():
+            yield name, {"phones": phones, "birthday": birthday and birthday.isoformat()}
+
+    def _birthday_range(self, low: int, high: int) -> t.Iterator[tuple[str, date]]:
+        rows = self.connection.execute(
+            "SELECT name, birthday FROM contacts WHERE birthday_day BETWEEN ? AND ? "
+            "ORDER BY birthday_day, id",
+            (low, high),
+        )
+        for name, birthday in rows:
+            yield name, date.fromordinal(birthday)
+
+    def _packed_birthdays(self) -> tuple[list[str], array]:
+        names, ordinals = [], array('l')
+        rows = self.connection.execute(
+            "SELECT name, birthday FROM contacts WHERE birthday IS NOT NULL ORDER BY id"
+        )
+        for name, birthday in rows:
+            names.append(name)
+            ordinals.append(birthday)
+        return names, ordinals
+
+    def _name_range(self, start: str, stop: str | None, limit: int | None) -> list[str]:
+        # UNIQUE у name дает индекс, а BINARY сравнение utf-8 - тот же порядок, что у str
+        query, params = "SELECT name FROM contacts WHERE name >= ?", [start]
+        if stop is not None:
+            query += " AND name < ?"
+            params.append(stop)
+        query += " ORDER BY name"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [name for name, in self.connection.execute(query, params)]
+
+    def _check_phone(self, key: str, phone: str) -> None:
+        if not self.unique_phones:
+            return
+        row = self.connection.execute(
+            "SELECT name FROM contacts JOIN phones ON phones.contact_id = contacts.id "
+            "WHERE phone = ? AND name != ? LIMIT 1",
+            (phone, key),
+        ).fetchone()
+        if row is not None:
+            raise ValueError(f"The phone '{phone}' already belongs to contact '{row[0]}'")
+
+    def find_by_phone(self, phone: Phone | str) -> list[Record]:
+        if not isinstance(phone, Phone):
+            phone = Phone(phone)
+        return list(self._select(
+            "WHERE id IN (SELECT contact_id FROM phones WHERE phone = ?)", (phone.value,)
+        ))
+
+    def _search(self, search_word: str) -> list[Record]:
+        return list(self._select("WHERE instr(search_text, ?) > 0", (search_word,)))
+
+    def bulk_add(self, lines: t.Iterable[str], fmt: str = "csv", trusted: bool = False) -> BulkReport:
+        with self.transaction(): # весь импорт - одна транзакция
+            return super().bulk_add(lines, fmt, trusted)
+
+    def from_items(self, items: t.Iterable[tuple[str, dict]], lazy: bool = False) -> None:
+        """
+        Insert (name, record data) pairs in one transaction, 
+        lazy is ignored: records are always built only when they are read.
+        """
+        with self.transaction(): # весь импорт - одна транзакция
+            super().from_items(items)
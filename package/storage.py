@@ -0,0 +1,209 @@
+import json
+import os
+import re
+import typing as t
+
+from .address_book import AddressBook, AddressBookEncoder
+
+
+# номер последней записи журнала в файле книги: {JOURNAL_SEQ: J, CONTACTS: {...}}
+# в JSON, первая строка {JOURNAL_SEQ: J} в JSON lines
+JOURNAL_SEQ = "__journal_seq__"
+CONTACTS = "contacts"
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class _ChunkReader:
+    """
+    Reads JSON tokens from a text file through a small buffer instead of the whole file.
+    """
+
+    def __init__(self, file: t.TextIO, chunk_size: int) -> None:
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos:] + chunk # прочитанное выбрасываем
+        self.pos = 0
+        return True
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self._fill():
+                return
+
+    def peek(self) -> str:
+        self._skip_whitespace()
+        return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' at position {self.pos} of the JSON chunk")
+        self.pos += 1
+
+    def value(self) -> t.Any:
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill(): # значение целиком не поместилось - дочитываем
+                    raise
+                continue
+            # число на конце буфера могло оборваться и прочитаться короче
+            if end == len(self.buf) and isinstance(value, (int, float)) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def at_end(self) -> bool:
+        return self.peek() == ""
+
+
+def iter_json_contacts(file: t.TextIO, chunk_size: int = 1 << 16) -> t.Iterator[tuple[str, dict]]:
+    """
+    Parse the top-level JSON object of an address book file one contact at a time.
+
+    Args:
+        file (TextIO): The opened file in the format of AddressBookEncoder,
+            or {JOURNAL_SEQ: J, CONTACTS: {...}} with the contacts in this format (see save_json).
+        chunk_size (int): How many characters to read at once.
+    Raises:
+        ValueError: If the file isn't a valid address book JSON.
+    Yields:
+        tuple[str, dict]: The name and the data of a contact, 
+            the first one is (JOURNAL_SEQ, J) if the file has the number.
+    """
+    reader = _ChunkReader(file, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.expect("}")
+    else:
+        name = reader.value()
+        reader.expect(":")
+        data = reader.value()
+        if name == JOURNAL_SEQ and isinstance(data, int): # у контакта данные - всегда объект
+            yield name, data
+            reader.expect(",")
+            if reader.value() != CONTACTS:
+                raise ValueError(f"Expected '{CONTACTS}' after '{JOURNAL_SEQ}' in the address book JSON")
+            reader.expect(":")
+            reader.expect("{")
+            if reader.peek() != "}":
+                yield from _contacts(reader, reader.value())
+            reader.expect("}")
+        else:
+            yield from _contacts(reader, name, data)
+        reader.expect("}")
+    if not reader.at_end():
+        raise ValueError("Extra data after the address book JSON")
+
+
+def _contacts(reader: _ChunkReader, name: t.Any, data: t.Any = None) -> t.Iterator[tuple[str, dict]]:
+    """
+    The members of the object of contacts up to its closing brace (not read), 
+    starting with the name (and the data) already read.
+    """
+    while True:
+        if data is None:
+            reader.expect(":")
+            data = reader.value()
+        if not isinstance(name, str) or not isinstance(data, dict):
+            raise ValueError(f"Contact {name!r} isn't in the address book format")
+        yield name, data
+        if reader.peek() != ",":
+            return
+        reader.expect(",")
+        name, data = reader.value(), None
+
+
+def iter_jsonl_contacts(file: t.TextIO) -> t.Iterator[tuple[str, dict]]:
+    """
+    Parse a JSON-lines address book: every line is an object in the format of AddressBookEncoder.
+
+    Args:
+        file (TextIO): The opened JSON-lines file.
+    Raises:
+        ValueError: If a line isn't a valid address book JSON.
+    Yields:
+        tuple[str, dict]: The name and the data of a contact.
+    """
+    for line in file:
+        if not line.strip():
+            continue
+        contacts = json.loads(line)
+        if not isinstance(contacts, dict):
+            raise ValueError(f"Line {line!r} isn't in the address book format")
+        yield from contacts.items()
+
+
+def load_json(book: AddressBook, path: str, lazy: bool = False) -> None:
+    """
+    Stream contacts from a JSON (or JSON-lines for *.jsonl) file into the address book.
+
+    Only one contact is parsed at a time, so the memory needed is about the size of the book.
+
+    Args:
+        book (AddressBook): The address book to fill.
+        path (str): The path of the file.
+        lazy (bool): Keep the raw data of contacts, see AddressBook.from_items.
+    Raises:
+        FileNotFoundError: If there is no such file.
+        ValueError: If the file isn't a valid address book JSON.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        if path.endswith(".jsonl"):
+            items = iter_jsonl_contacts(file)
+        else:
+            items = iter_json_contacts(file)
+        book.from_items(_without_journal_seq(book, items), lazy)
+
+
+def _without_journal_seq(book: AddressBook, items: t.Iterable[tuple[str, t.Any]]) -> t.Iterator[tuple[str, dict]]:
+    """
+    Pass the contacts through, the journal number found among them goes to book.journal_seq.
+    """
+    for name, data in items:
+        if name == JOURNAL_SEQ and isinstance(data, int):
+            book.journal_seq = data
+        else:
+            yield name, data
+
+
+def save_json(book: AddressBook, path: str) -> None:
+    """
+    Save the address book to a JSON file atomically (through a temporary file and rename).
+
+    A *.jsonl path is written as JSON lines, one contact per line.
+    A non-zero book.journal_seq is written next to the contacts, not among them: 
+    {JOURNAL_SEQ: J, CONTACTS: {...}} or the first line {JOURNAL_SEQ: J} of JSON lines.
+
+    Args:
+        book (AddressBook): The address book to save.
+        path (str): The path of the JSON file.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        if path.endswith(".jsonl"):
+            if book.journal_seq:
+                file.write(json.dumps({JOURNAL_SEQ: book.journal_seq}) + "\n")
+            for name, record in book._dict_items():
+                file.write(json.dumps({name: record}, ensure_ascii=False) + "\n")
+        elif book.journal_seq:
+            # номер первым, чтобы потоковое чтение узнало его до контактов
+            file.write(f'{{"{JOURNAL_SEQ}": {book.journal_seq}, "{CONTACTS}": ')
+            json.dump(book, file, cls=AddressBookEncoder, sort_keys=True, indent=4)
+            file.write("}\n")
+        else:
+            json.dump(book, file, cls=AddressBookEncoder, sort_keys=True, indent=4)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path) # либо старый файл целиком, либо новый
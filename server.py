@@ -0,0 +1,147 @@
+"""
+Asyncio TCP front-end of the bot: many clients share one address book.
+
+Every line from a client is a bot command (the same grammar as in main.py).
+The reply is "<status> <number of lines>\\n" followed by the lines of the message,
+the status is the same as in the batch mode (0 - ok, 1 - error, 2 - unknown command).
+Clients may send several commands without waiting for the replies, they are answered in order.
+
+"show page N" starts a page cursor of the connection and shows the first page,
+"next" shows the following one. "exit" closes the connection, the book is saved
+when the server stops.
+
+    BOT_STORAGE=sqlite python server.py --port 8765
+"""
+import argparse
+import asyncio
+
+import main as bot
+
+
+class Session:
+    """
+    State of one client connection: the cursor of "show page".
+
+    The cursor walks a copy of the names taken by "show page",
+    contacts deleted since then are skipped.
+    """
+
+    def __init__(self) -> None:
+        self.names: list[str] | None = None
+        self.position = 0
+        self.page_size = 1
+        self.page = 0
+
+    def start_pages(self, data: list[str]) -> str:
+        try:
+            page_size = int(data[0]) if data else 1
+        except ValueError:
+            page_size = 0
+        if page_size < 1:
+            return bot.ErrorMessage("invalid input count page")
+        self.names = list(bot.a_book)
+        self.position, self.page_size, self.page = 0, page_size, 0
+        return self.next_page()
+
+    def next_page(self) -> str:
+        if self.names is None:
+            return bot.ErrorMessage("no pages to show, use [show page] first")
+        records = []
+        while self.position < len(self.names) and len(records) < self.page_size:
+            name = self.names[self.position]
+            self.position += 1
+            try:
+                records.append(bot.a_book[name])
+            except KeyError: # удалили после show page
+                continue
+        if not records:
+            self.names = None
+            return f'{"-" * 15} end {"-" * 15}'
+        self.page += 1
+        page = "\n".join([record.render() for record in records])
+        return f'{"-" * 15} Page {self.page} {"-" * 15}\n' + page
+
+    def run(self, line: str) -> tuple[str, bool]:
+        """
+        Run one command line of the client.
+
+        Returns:
+            tuple[str, bool]: The reply and whether to close the connection.
+        """
+        if line.strip().lower() == "next":
+            return self.next_page(), False
+        func_handler, data = bot.command_parser(line)
+        if func_handler == bot.exit_handler: # книгу сохраняет сервер при остановке
+            return "Good bye!", True
+        if func_handler == bot.show_page:
+            return self.start_pages(data), False
+        message = func_handler(data)
+        if not isinstance(message, str): # вывод частями склеиваем, чтобы посчитать строки
+            chunks, status = [], bot.STATUS_OK
+            for chunk in message: # последняя часть может быть ошибкой
+                chunks.append(chunk)
+                status = getattr(chunk, "status", status)
+            message = "\n".join(chunks)
+            if status != bot.STATUS_OK:
+                message = bot.ErrorMessage(message)
+                message.status = status
+        return message, False
+
+
+def frame(message: str) -> bytes:
+    """
+    Encode a reply: "<status> <number of lines>" and the lines of the message.
+    """
+    lines = message.split("\n")
+    status = getattr(message, "status", bot.STATUS_OK)
+    return f"{status} {len(lines)}\n{message}\n".encode("utf-8")
+
+
+async def serve_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """
+    Answer the commands of one client until it says exit or disconnects.
+
+    Handlers are called right in the event loop, so the commands of all the clients
+    change the book one at a time and none of them sees a half-done change.
+    """
+    session = Session()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            line = line.decode("utf-8", errors="replace")
+            if line.isspace():
+                continue
+            message, close = session.run(line)
+            writer.write(frame(message))
+            if close:
+                break
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def serve(host: str, port: int) -> None:
+    server = await asyncio.start_server(serve_client, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Address book bot server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(bot.exit_handler())
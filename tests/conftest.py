@@ -0,0 +1,21 @@
+import pytest
+
+from package import AddressBook, ParallelSearch
+
+
+@pytest.fixture
+def bot(tmp_path, monkeypatch):
+    """
+    main.py with a new empty book in tmp_path, without the journal.
+    """
+    monkeypatch.chdir(tmp_path) # main открывает книгу при импорте
+    monkeypatch.setenv("BOT_STORAGE", "json")
+    import main
+    book = AddressBook()
+    monkeypatch.setattr(main, "storage", "json")
+    monkeypatch.setattr(main, "file_json", str(tmp_path / "test.json"))
+    monkeypatch.setattr(main, "a_book", book)
+    monkeypatch.setattr(main, "journal", None)
+    monkeypatch.setattr(main, "searcher", ParallelSearch(book))
+    monkeypatch.setattr(main, "autosaver", None)
+    return main
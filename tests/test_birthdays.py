@@ -0,0 +1,90 @@
+from datetime import date, timedelta
+
+import pytest
+
+from package import AddressBook, Record
+from package import address_book
+from package.birthdays import days_until
+
+BIRTHDAYS = [
+    "2000-02-29", "1996-02-29", "1999-02-28", "2001-03-01", "1990-01-01",
+    "1985-12-31", "2004-06-15", "1970-10-18", "2023-02-28", "2024-02-29",
+]
+TODAYS = [
+    date(year, month, day)
+    for year in range(2023, 2029)
+    for month, day in [(1, 1), (2, 28), (2, 29), (3, 1), (10, 18), (12, 31)]
+    if month != 2 or day != 29 or year % 4 == 0
+]
+
+
+def book() -> AddressBook:
+    result = AddressBook()
+    for i, birthday in enumerate(BIRTHDAYS):
+        result.add_record(Record(f"Name{i}", [], birthday))
+    result.add_record(Record("Nobirthday", []))
+    return result
+
+
+@pytest.fixture(params=[False, True], ids=["python", "numpy"])
+def use_numpy(request) -> bool:
+    if request.param:
+        pytest.importorskip("numpy")
+    return request.param
+
+
+@pytest.mark.parametrize("today", TODAYS, ids=str)
+def test_stats_match_days_to_birthday(monkeypatch, use_numpy, today):
+    class Today(date):
+        @classmethod
+        def today(cls) -> date:
+            return today
+    contacts = book()
+    stats = contacts.birthday_stats(today, use_numpy)
+    monkeypatch.setattr(address_book, "date", Today)
+
+    assert list(stats.names) == [f"Name{i}" for i in range(len(BIRTHDAYS))]
+    for i, name in enumerate(stats.names):
+        born = date.fromisoformat(BIRTHDAYS[i])
+        days = contacts[name].days_to_birthday()
+        assert stats.days[i] == days
+        assert date.fromisoformat(str(stats.next_dates[i])) == today + timedelta(days=days)
+        # полных лет сегодня, 02-29 в невисокосный год празднуют 03-01
+        assert stats.ages[i] == today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+
+
+@pytest.mark.parametrize("days", [0, 1, 2, 30, 364, 365, 400])
+@pytest.mark.parametrize("today", TODAYS, ids=str)
+def test_upcoming_matches_days_until(today, days):
+    contacts = book()
+    expected = []
+    for i, birthday in enumerate(BIRTHDAYS):
+        born = date.fromisoformat(birthday)
+        left = days_until(born.month, born.day, today)
+        if left <= days:
+            expected.append((left, f"Name{i}"))
+    expected.sort()
+    found = contacts.upcoming(days, today)
+    assert [left for _, left in found] == sorted(left for left, _ in expected)
+    assert sorted((left, record.name.value) for record, left in found) == expected
+
+
+def test_upcoming_follows_changes_and_checks_days():
+    contacts = book()
+    today = date(2025, 2, 27)
+    contacts["Name0"].change_birthday("2001-03-10")
+    del contacts["Name2"]
+    contacts["Nobirthday"].change_birthday("1980-02-28")
+    found = sorted((left, record.name.value) for record, left in contacts.upcoming(2, today))
+    # 02-29 в 2025 - это 03-01
+    assert found == [(1, "Name8"), (1, "Nobirthday"), (2, "Name1"), (2, "Name3"), (2, "Name9")]
+    with pytest.raises(ValueError):
+        contacts.upcoming(-1, today)
+
+
+def test_upcoming_command(bot):
+    birthday = date.today().replace(year=2000).isoformat() # 2000 - високосный
+    bot.a_book.add_record(Record("Ann", [], birthday))
+    func_handler, data = bot.command_parser("upcoming 0")
+    assert func_handler(data) == f"Ann: 0 days ({birthday})"
+    assert bot.command_parser("upcoming 0")[0](["-1"]).status == bot.STATUS_ERROR
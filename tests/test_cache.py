@@ -0,0 +1,57 @@
+from package import AddressBook, Record, SearchCache
+
+
+def test_lru_by_entries_and_results():
+    cache = SearchCache(max_entries=2, max_results=5)
+    cache.put("a", 0, [1])
+    cache.put("b", 0, [2, 2])
+    assert cache.get("a", 0) == [1] # a - последний использованный
+    cache.put("c", 0, [3])
+    assert cache.get("b", 0) is None and cache.get("a", 0) == [1] and cache.get("c", 0) == [3]
+
+    cache.put("d", 0, [4, 4, 4, 4])
+    assert list(cache._entries) == ["c", "d"] and cache.results == 5 # не больше 2 записей и 5 результатов
+    cache.put("e", 0, [5] * 6)
+    assert cache.get("e", 0) is None # больше max_results не кэшируется
+    cache.put("d", 0, [])
+    assert cache.results == 1 and cache.get("d", 0) == []
+    assert (cache.hits, cache.misses) == (4, 2)
+
+
+def test_result_is_a_copy():
+    cache = SearchCache()
+    result = [1, 2]
+    cache.put("a", 0, result)
+    result.append(3)
+    cache.get("a", 0).append(4)
+    assert cache.get("a", 0) == [1, 2]
+
+
+def test_new_generation_drops_the_entries():
+    cache = SearchCache()
+    cache.put("a", 1, [1])
+    assert cache.get("a", 2) is None and len(cache) == 0
+    cache.put("b", 1, [1]) # найдено до изменения - не кэшируем
+    assert cache.get("b", 2) is None and cache.get("b", 1) is None
+    cache.put("b", 2, [2])
+    cache.clear()
+    assert len(cache) == 0 and cache.results == 0 and cache.get("b", 2) is None
+    assert cache.report() == "search cache: 0 hits, 4 misses (0% hits), 0 entries, 0 results"
+
+
+def test_book_changes_invalidate_the_cache():
+    book = AddressBook()
+    book.from_dict({"Ann": {"phones": ["0501234567"], "birthday": None}}, lazy=True)
+    assert [record.name.value for record in book.search("050")] == ["Ann"]
+    assert book.search("050")[0] is book["Ann"]
+    assert book.search_cache.hits == 1
+
+    book["Ann"].remove_phone("0501234567") # изменение записи, а не книги
+    assert book.search("050") == []
+    book.add_record(Record("Bob", ["0501234567"]))
+    assert [record.name.value for record in book.search("050")] == ["Bob"]
+    del book["Bob"]
+    assert book.search("050") == []
+    book["Ann"].change_birthday("2000-02-29")
+    assert [record.name.value for record in book.search("02-29")] == ["Ann"]
+    assert book.search_cache.hits == 1
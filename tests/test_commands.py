@@ -0,0 +1,101 @@
+import io
+
+import pytest
+
+from package import AddressBook, Record
+
+
+def reply(bot, line: str) -> str:
+    func_handler, data = bot.command_parser(line)
+    message = func_handler(data)
+    return message if isinstance(message, str) else "\n".join(message)
+
+
+def test_search_is_not_shadowed_by_regex_search(bot):
+    bot.a_book.add_record(Record("Andre", ["0501234567"]))
+    bot.a_book.add_record(Record("Oleh", ["0671234567"]))
+    assert bot.command_parser("search re")[0] is bot.search_handler
+    assert reply(bot, "search re") == bot.a_book["Andre"].render()
+    assert reply(bot, "search ^Ol") == "not found any contact"
+    for command in ("grep", "regex"):
+        assert bot.command_parser(f"{command} ^Ol")[0] is bot.regex_search_handler
+        assert reply(bot, f"{command} ^Ol") == bot.a_book["Oleh"].render()
+
+
+class Out(io.StringIO):
+    """
+    Remembers how many contacts the book had at every write.
+    """
+
+    def __init__(self, book) -> None:
+        super().__init__()
+        self.book = book
+        self.writes = []
+
+    def writelines(self, lines) -> None:
+        lines = list(lines)
+        self.writes.append((len(self.book), len(lines)))
+        super().writelines(lines)
+
+
+def test_batch_output_is_written_in_blocks(bot, monkeypatch):
+    lines = [f"add Name{i} 050{i:07d}" for i in range(10)] + ["bad command", "show all"]
+    whole = io.StringIO()
+    bot.run_batch(lines, whole)
+
+    bot.a_book = AddressBook()
+    monkeypatch.setattr(bot, "OUTPUT_BLOCK", 3)
+    out = Out(bot.a_book)
+    status = io.StringIO()
+    assert bot.run_batch(lines, out, status=status) == 1
+    assert out.getvalue() == whole.getvalue()
+    assert status.getvalue().splitlines()[10] == f"11\t{bot.STATUS_UNKNOWN}"
+    # без чекпоинтов ответы пишутся по ходу, а не в конце
+    assert [contacts for contacts, _ in out.writes[:3]] == [3, 6, 9]
+    assert max(size for _, size in out.writes) <= 2 * 3
+
+
+def test_pages_are_made_under_the_lock_and_waited_for_without_it(bot, capsys):
+    for i in range(5):
+        bot.a_book.add_record(Record(f"Name{i}", [f"050{i:07d}"]))
+    locked = []
+
+    def pages():
+        for page in bot.show_page(["2"]):
+            locked.append(bot.command_lock.locked())
+            yield page
+
+    def pause(prompt: str) -> None:
+        assert not bot.command_lock.locked() # автосохранение не ждет пользователя
+        locked.append("pause")
+    bot.print_pages(pages(), pause, bot.command_lock)
+    assert locked == [True, True, True, "pause", True, "pause", True, "pause"]
+    printed = capsys.readouterr().out
+    assert printed.startswith("input any for next page\n")
+    assert all(bot.a_book[f"Name{i}"].render() in printed for i in range(5))
+    assert printed.rstrip().endswith("end ---------------")
+
+
+def test_every_command_phrase_reaches_its_handler(bot):
+    for handler, (phrases, _) in bot.BOT_COMMANDS.items():
+        for phrase in phrases:
+            assert bot.command_parser(f"{phrase.upper()} Ann 0501234567") == (handler, ["Ann", "0501234567"])
+
+
+def test_longest_command_wins(bot):
+    assert bot.command_parser("add phone Ann 0501234567") == (bot.add_handler_phone, ["Ann", "0501234567"])
+    assert bot.command_parser("add Phone") == (bot.add_handler_phone, [])
+    assert bot.command_parser("add Phoebe 0501234567") == (bot.add_handler, ["Phoebe", "0501234567"])
+    assert bot.command_parser("  show   all  ") == (bot.show_all, [])
+    assert bot.command_parser("show") == (bot.unknown_command, None)
+    assert bot.unknown_command().status == bot.STATUS_UNKNOWN
+
+
+def test_compile_commands(bot):
+    def first(*args): ...
+    def second(*args): ...
+    table = bot.compile_commands({first: (["Go", "go  on"], ""), second: (["stop"], "")})
+    assert table == {("go",): first, ("go", "on"): first, ("stop",): second}
+    assert bot.compile_commands({first: (["go", "GO"], "")}) == {("go",): first}
+    with pytest.raises(ValueError, match="'go' is used by first and second"):
+        bot.compile_commands({first: (["GO"], ""), second: (["go"], "")})
@@ -0,0 +1,61 @@
+import threading
+
+from package import AddressBook, Record, ThreadSafeAddressBook
+from package import address_book
+from package.indexes import FuzzyNameIndex
+
+
+def filled(book: AddressBook) -> AddressBook:
+    for name in ["Oleksandr", "Oleksii", "Olena", "Serhii", "Sofiia"]:
+        book.add_record(Record(name, []))
+    return book
+
+
+def test_closest_names():
+    book = filled(AddressBook())
+    assert book.closest_names("Oleksndr") == [(1, "Oleksandr")]
+    assert book.closest_names("serhi") == [(1, "Serhii")]
+    assert book.closest_names("Zzzzzz") == []
+
+
+def test_index_follows_changes():
+    book = filled(AddressBook())
+    book.closest_names("Olena")
+    del book["Olena"]
+    book.add_record(Record("Olesia", []))
+    assert [name for _, name in book.closest_names("Olesya")] == ["Olesia"]
+
+
+def test_suggestions_wait_for_background_build(monkeypatch):
+    release = threading.Event()
+
+    class SlowIndex(FuzzyNameIndex):
+        def __init__(self, names=()) -> None:
+            release.wait(5)
+            super().__init__(names)
+    monkeypatch.setattr(address_book, "FuzzyNameIndex", SlowIndex)
+    monkeypatch.setattr(address_book, "BACKGROUND_INDEX", 3)
+    book = filled(AddressBook())
+
+    assert book.closest_names("Oleksndr", wait=False) == [] # индекс строится в фоне
+    # изменения во время постройки попадают в индекс
+    del book["Oleksandr"]
+    book.add_record(Record("Aleksandr", []))
+    assert book.closest_names("Oleksndr", wait=False) == []
+    release.set()
+    book._fuzzy_build.result()
+    assert book.closest_names("Oleksndr", wait=False) == [(2, "Aleksandr")]
+    assert book._fuzzy_build is None and book._change_logs == []
+
+
+def test_small_book_builds_at_once():
+    book = filled(AddressBook())
+    assert book.closest_names("Oleksndr", wait=False) == [(1, "Oleksandr")]
+    assert book._fuzzy_build is None
+
+
+def test_wait_finishes_background_build(monkeypatch):
+    monkeypatch.setattr(address_book, "BACKGROUND_INDEX", 3)
+    book = filled(ThreadSafeAddressBook())
+    book.closest_names("Oleksndr", wait=False)
+    assert book.closest_names("Oleksndr") == [(1, "Oleksandr")]
@@ -0,0 +1,71 @@
+import io
+import json
+
+import pytest
+
+from package import AddressBook, Record
+
+CSV = """name,phones,birthday
+Ann,050-123-45-67;0671234567,2000-02-29
+Bob,,
+Cid,12,
+Dan,0501234567,2001-02-29
+Eve
+Ann,0931234567,
+Fay, 0931234567 ,1990-01-01
+"""
+
+
+def test_csv_errors_are_collected_by_line():
+    book = AddressBook()
+    report = book.bulk_add(io.StringIO(CSV))
+    assert report.added == 3
+    assert [line_no for line_no, _ in report.errors] == [4, 5, 6, 7]
+    assert "12" in report.errors[0][1] and "2001-02-29" in report.errors[1][1]
+    assert list(book) == ["Ann", "Bob", "Fay"]
+    assert book["Ann"].to_dict() == {"Ann": {"phones": ["0501234567", "0671234567"], "birthday": "2000-02-29"}}
+    assert book["Bob"].to_dict() == {"Bob": {"phones": [], "birthday": None}}
+    # импортированные контакты попадают в индексы
+    assert [record.name.value for record in book.find_by_phone("0931234567")] == ["Fay"]
+    assert [record.name.value for record in book.search("02-29")] == ["Ann"]
+
+
+def test_jsonl_errors_are_collected_by_line():
+    lines = [
+        json.dumps({"Ann": {"phones": ["0501234567"], "birthday": "2000-02-29"}}),
+        "",
+        "not json",
+        json.dumps(["Bob"]),
+        json.dumps({"Bob": {"phones": "0501234567"}, "Cid": {"phones": [], "birthday": None}}),
+        json.dumps({"Dan": {"phones": ["1"], "birthday": None}}),
+    ]
+    book = AddressBook()
+    report = book.bulk_add(io.StringIO("\n".join(lines)), "jsonl")
+    assert report.added == 2
+    assert [line_no for line_no, _ in report.errors] == [3, 4, 5, 6]
+    assert list(book) == ["Ann", "Cid"]
+
+
+def test_trusted_import_skips_the_phone_checks():
+    line = json.dumps({"Ann": {"phones": ["12"], "birthday": "2000-02-29"}})
+    book = AddressBook()
+    assert book.bulk_add([line], "jsonl", trusted=True).added == 1
+    assert book["Ann"].to_dict() == {"Ann": {"phones": ["12"], "birthday": "2000-02-29"}}
+    report = AddressBook().bulk_add([json.dumps({"Ann": {"phones": [], "birthday": "2000-02-30"}})], "jsonl", trusted=True)
+    assert report.added == 0 and len(report.errors) == 1 # даты разбираются и так
+    with pytest.raises(ValueError):
+        book.bulk_add([], "xml")
+
+
+def test_import_command(bot, tmp_path):
+    bot.a_book.add_record(Record("Ann", []))
+    path = tmp_path / "contacts.csv"
+    path.write_text(CSV, encoding="utf-8")
+    func_handler, data = bot.command_parser(f"import {path}")
+    message = func_handler(data)
+    assert message.splitlines()[0] == f"2 contacts imported from {path}"
+    assert [line.split(":")[0] for line in message.splitlines()[1:]] == [f"line {i}" for i in (2, 4, 5, 6, 7)]
+    assert list(bot.a_book) == ["Ann", "Bob", "Fay"]
+
+    assert bot.import_handler([str(tmp_path / "contacts.txt")]).status == bot.STATUS_ERROR
+    assert bot.import_handler([str(tmp_path / "missing.csv")]).status == bot.STATUS_ERROR
@@ -0,0 +1,202 @@
+import json
+import os
+
+import pytest
+
+from package import AddressBook, Journal, Record, ShardedAddressBook, SnapshotAddressBook, load_json, save_json
+from package import sharded, write_snapshot
+
+
+class Storage:
+    """
+    A book on disk of one of the storages, as main.py opens and saves it.
+    """
+
+    def __init__(self, kind: str, directory) -> None:
+        self.kind = kind
+        self.path = os.path.join(directory, {"json": "book.json", "snapshot": "book.snapshot"}.get(kind, "shards"))
+        self.journal_path = os.path.join(directory, "book.journal")
+        if kind == "json":
+            save_json(AddressBook(), self.path)
+        elif kind == "snapshot":
+            write_snapshot(AddressBook(), self.path)
+
+    def open(self) -> AddressBook:
+        if self.kind == "json":
+            book = AddressBook()
+            load_json(book, self.path, lazy=True)
+            return book
+        if self.kind == "snapshot":
+            return SnapshotAddressBook(self.path)
+        return ShardedAddressBook(self.path, shards=4)
+
+    def save(self, book: AddressBook, journal_seq: int) -> None:
+        book.journal_seq = journal_seq
+        if self.kind == "json":
+            save_json(book, self.path)
+        elif self.kind == "snapshot":
+            write_snapshot(book, self.path)
+        else:
+            book.save()
+
+    def recover(self) -> AddressBook:
+        """
+        Start again after a crash: the book from disk with the journal replayed on it.
+        """
+        book = self.open()
+        journal = Journal(self.journal_path)
+        journal.replay(book)
+        journal.close()
+        return book
+
+
+def run(book: AddressBook, journal: Journal, operation: str, *args) -> None:
+    Journal.OPERATIONS[operation](book, *args)
+    journal.append(operation, *args)
+
+
+def phones(record: Record) -> list[str]:
+    return [phone.value for phone in record.phones]
+
+
+def changes(book: AddressBook, journal: Journal, first: int = 0) -> None:
+    # не идемпотентные изменения: повтор дал бы другие телефоны или ошибку
+    for i in range(first, first + 6):
+        run(book, journal, "add", f"Name{i}", {"phones": [f"050000000{i}"], "birthday": None})
+        run(book, journal, "add_phone", f"Name{i}", f"067000000{i}")
+        run(book, journal, "change_phone", f"Name{i}", f"050000000{i}", f"093000000{i}")
+    run(book, journal, "delete", f"Name{first}")
+    run(book, journal, "add", f"Name{first}", {"phones": ["0991112233"], "birthday": "2000-02-29"})
+
+
+STORAGES = ["json", "snapshot", "sharded"]
+
+
+@pytest.fixture(params=STORAGES)
+def storage(request, tmp_path) -> Storage:
+    return Storage(request.param, tmp_path)
+
+
+def test_replay_restores_changes(storage):
+    book, journal = storage.open(), Journal(storage.journal_path)
+    changes(book, journal)
+    journal.close()
+    assert storage.recover().to_dict() == book.to_dict()
+    assert phones(storage.recover()["Name1"]) == ["0930000001", "0670000001"]
+
+
+def test_replay_skips_line_cut_by_crash(storage):
+    book, journal = storage.open(), Journal(storage.journal_path)
+    changes(book, journal)
+    journal.close()
+    with open(storage.journal_path, "a", encoding="utf-8") as file:
+        file.write('[99,"add_phone","Name2","0631') # запись оборвалась
+
+    recovered = storage.open()
+    journal = Journal(storage.journal_path)
+    assert journal.replay(recovered) == 20
+    assert recovered.to_dict() == book.to_dict()
+    # новые записи не прилипают к оборванной строке
+    run(recovered, journal, "add_phone", "Name2", "0631234567")
+    journal.close()
+    assert "0631234567" in phones(storage.recover()["Name2"])
+
+
+def test_crash_between_save_and_truncate(storage):
+    book, journal = storage.open(), Journal(storage.journal_path)
+    changes(book, journal)
+    storage.save(book, journal.seq) # compact() упал бы здесь - журнал не обрезан
+    journal.close()
+
+    recovered = storage.recover()
+    assert recovered.to_dict() == book.to_dict()
+    assert phones(recovered["Name1"]) == ["0930000001", "0670000001"]
+
+
+def test_compact_keeps_numbering(storage):
+    book, journal = storage.open(), Journal(storage.journal_path)
+    changes(book, journal)
+    journal.compact(lambda journal_seq: storage.save(book, journal_seq))
+    assert len(journal) == 0 and journal.seq == 20
+    changes(book, journal, first=10)
+    journal.close()
+
+    with open(storage.journal_path, encoding="utf-8") as file:
+        assert json.loads(file.readline())[0] == 21
+    assert storage.recover().to_dict() == book.to_dict()
+
+
+def test_crash_between_background_save_and_drop_rotated(storage):
+    book, journal = storage.open(), Journal(storage.journal_path)
+    changes(book, journal)
+    journal_seq = journal.seq
+    journal.rotate()
+    changes(book, journal, first=10) # изменения во время записи снимка
+    # снимок того, что было до ротации
+    saved = ShardedAddressBook(storage.path, shards=4) if storage.kind == "sharded" else AddressBook()
+    saved.from_items(((name, data) for name, data in book.to_dict().items() if int(name[4:]) < 10), lazy=True)
+    storage.save(saved, journal_seq) # drop_rotated() не успел
+    journal.close()
+
+    assert os.path.exists(journal.rotated_path)
+    assert storage.recover().to_dict() == book.to_dict()
+
+
+def test_sharded_crash_in_the_middle_of_save(tmp_path, monkeypatch):
+    storage = Storage("sharded", tmp_path)
+    book, journal = storage.open(), Journal(storage.journal_path)
+    changes(book, journal)
+    assert len({sharded.shard_of(name, 4) for name in book}) > 1
+    write_atomic, written = sharded._write_atomic, []
+
+    def crash(path, lines):
+        if len(written) == 2: # манифест и один шард
+            raise OSError("power off")
+        written.append(path)
+        write_atomic(path, lines)
+    monkeypatch.setattr(sharded, "_write_atomic", crash)
+    with pytest.raises(OSError):
+        storage.save(book, journal.seq)
+    monkeypatch.undo()
+    journal.close()
+
+    recovered = storage.recover()
+    assert recovered.to_dict() == book.to_dict()
+    # контакты из незаписанных шардов добавлены заново - они идут после записанных
+    assert sorted(recovered) == sorted(book) and len(recovered) == len(book)
+
+
+def test_old_journal_without_numbers(tmp_path):
+    path = tmp_path / "old.journal"
+    path.write_text(
+        '["add","Ann",{"phones":["0501234567"],"birthday":null}]\n["add_phone","Ann","0671234567"]\n',
+        encoding="utf-8",
+    )
+    book = AddressBook()
+    book.journal_seq = 5 # номера из книги к старым строкам не относятся
+    journal = Journal(str(path))
+    assert journal.replay(book) == 2
+    run(book, journal, "delete", "Ann")
+    journal.close()
+    assert json.loads(path.read_text(encoding="utf-8").splitlines()[-1]) == [6, "delete", "Ann"]
+
+
+def test_unknown_operation(tmp_path):
+    journal = Journal(str(tmp_path / "book.journal"))
+    with pytest.raises(ValueError):
+        journal.append("rename", "Ann", "Anna")
+    journal.close()
+
+
+def test_record_operations_replay_on_records(tmp_path):
+    book = AddressBook()
+    book.add_record(Record("Ann", ["0501234567"]))
+    journal = Journal(str(tmp_path / "book.journal"))
+    run(book, journal, "birthday", "Ann", "2000-01-31")
+    run(book, journal, "remove_phone", "Ann", "0501234567")
+    journal.close()
+
+    recovered = AddressBook()
+    recovered.add_record(Record("Ann", ["0501234567"]))
+    Journal(str(tmp_path / "book.journal")).replay(recovered)
+    assert recovered.to_dict() == {"Ann": {"phones": [], "birthday": "2000-01-31"}}
@@ -0,0 +1,141 @@
+import threading
+import time
+
+import pytest
+
+from package import Record, RWLock, ThreadSafeAddressBook
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def test_readers_share_the_lock():
+    lock = RWLock()
+    inside, release = [], threading.Event()
+
+    def read():
+        with lock.read():
+            inside.append(1)
+            release.wait(5)
+    threads = [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: len(inside) == 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+
+def test_writer_excludes_readers():
+    lock = RWLock()
+    events = []
+    writing, release = threading.Event(), threading.Event()
+
+    def write():
+        with lock.write():
+            writing.set()
+            release.wait(5)
+            events.append("write")
+
+    def read():
+        with lock.read():
+            events.append("read")
+    writer = threading.Thread(target=write)
+    writer.start()
+    writing.wait(5)
+    reader = threading.Thread(target=read)
+    reader.start()
+    time.sleep(0.05)
+    assert events == []
+    release.set()
+    writer.join()
+    reader.join()
+    assert events == ["write", "read"]
+
+
+def test_waiting_writer_goes_before_new_readers():
+    lock = RWLock()
+    events = []
+    reading, release = threading.Event(), threading.Event()
+
+    def first_reader():
+        with lock.read():
+            reading.set()
+            release.wait(5)
+
+    def write():
+        with lock.write():
+            events.append("write")
+
+    def read():
+        with lock.read():
+            events.append("read")
+    threads = [threading.Thread(target=first_reader)]
+    threads[0].start()
+    reading.wait(5)
+    threads.append(threading.Thread(target=write))
+    threads[1].start()
+    wait_for(lambda: lock._waiting_writers == 1)
+    threads.append(threading.Thread(target=read))
+    threads[2].start()
+    time.sleep(0.05)
+    assert events == [] # читатель ждет за писателем
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert events == ["write", "read"]
+
+
+def test_reentrancy():
+    lock = RWLock()
+    with lock.write():
+        with lock.write():
+            with lock.read():
+                pass
+    with lock.read():
+        with lock.read():
+            pass
+    with lock.write(): # все отпущено
+        pass
+
+
+def test_write_inside_read_raises():
+    lock = RWLock()
+    with lock.read():
+        with pytest.raises(RuntimeError):
+            with lock.write():
+                pass
+    with lock.write():
+        pass
+
+
+def test_values_of_thread_safe_book_while_deleting():
+    book = ThreadSafeAddressBook()
+    for i in range(2000):
+        book.add_record(Record(f"Name{i}", [f"050{i:07d}"]))
+    errors = []
+
+    def delete():
+        for i in range(0, 2000, 2):
+            del book[f"Name{i}"]
+
+    def read():
+        try:
+            for _ in range(20):
+                for record in book.values():
+                    record.name.value
+                for name, record in book.items():
+                    assert record.name.value == name
+        except Exception as err:
+            errors.append(err)
+    threads = [threading.Thread(target=delete), threading.Thread(target=read)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(book.values()) == 1000
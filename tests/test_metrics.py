@@ -0,0 +1,91 @@
+import json
+import time
+
+import pytest
+
+from package import Metrics, Record
+from package.metrics import BUCKETS_NS, Histogram
+
+
+def test_percentiles_are_bucket_bounds():
+    histogram = Histogram()
+    assert histogram.percentile(50) == 0
+    for ns in [1_500] * 90 + [3_000_000] * 9 + [7_000_000_000]:
+        histogram.observe(ns)
+    assert histogram.count == 100 and histogram.max_ns == 7_000_000_000
+    assert histogram.percentile(50) == 2_000
+    assert histogram.percentile(95) == 5_000_000
+    assert histogram.percentile(99) == 5_000_000
+    assert histogram.percentile(100) == 7_000_000_000 # не больше самого медленного
+    histogram.observe(BUCKETS_NS[-1] * 3)
+    assert histogram.percentile(100) == BUCKETS_NS[-1] * 3
+
+
+def test_timed_counts_calls_and_errors():
+    metrics = Metrics()
+
+    @metrics.timed
+    def divide(a: int, b: int) -> float:
+        return a / b
+    assert divide(4, 2) == 2
+    with pytest.raises(ZeroDivisionError):
+        divide(1, 0)
+    stats = metrics.commands["divide"]
+    assert stats.calls == 2 and stats.errors == {"ZeroDivisionError": 1}
+
+
+def test_timed_iter_counts_only_producing():
+    metrics = Metrics()
+
+    @metrics.timed
+    def chunks():
+        yield from ("a", "b", "c")
+    result = chunks()
+    assert "chunks" not in metrics.commands # время пишется, когда части кончатся
+    for _ in result:
+        time.sleep(0.05)
+    stats = metrics.commands["chunks"]
+    assert stats.calls == 1 and stats.latency.max_ns < 50_000_000
+
+    def broken():
+        yield "a"
+        raise KeyError("b")
+    with pytest.raises(KeyError):
+        list(metrics.timed_iter("broken", broken()))
+    assert metrics.commands["broken"].errors == {"KeyError": 1}
+
+
+def test_report_and_dump():
+    metrics = Metrics()
+    assert metrics.report() == "no commands yet"
+    metrics.observe("fast", 1_000)
+    metrics.observe("slow", 20_000_000, ValueError())
+    lines = metrics.report().splitlines()
+    assert lines[1].split()[:3] == ["slow", "1", "1"] and lines[2].split()[:3] == ["fast", "1", "0"]
+    dump = json.loads(json.dumps(metrics.dump()))
+    assert dump["buckets_ns"] == list(BUCKETS_NS)
+    assert dump["commands"]["slow"]["errors"] == {"ValueError": 1}
+    assert dump["commands"]["slow"]["p99_ns"] == 20_000_000
+    assert sum(dump["commands"]["fast"]["histogram"]) == 1
+    metrics.reset()
+    assert metrics.commands == {}
+
+
+def test_stats_commands(bot, monkeypatch, tmp_path):
+    monkeypatch.setattr(bot, "metrics", Metrics())
+    bot.a_book.add_record(Record("Ann", []))
+    for line in ["show all", "days Ann", "days Bob"]:
+        func_handler, data = bot.command_parser(line)
+        message = func_handler(data)
+        if not isinstance(message, str):
+            list(message) # время частей вывода пишется, когда они кончатся
+    assert bot.metrics.commands["show_all"].calls == 1
+    assert bot.metrics.commands["handler_days_to_birthday"].calls == 2
+    assert sum(bot.metrics.commands["handler_days_to_birthday"].errors.values()) == 2
+    assert bot.stats_handler().startswith("command")
+
+    path = tmp_path / "stats.json"
+    assert bot.stats_dump_handler([str(path)]) == f"statistics of 2 commands saved to {path}"
+    dump = json.loads(path.read_text())
+    assert set(dump["commands"]) == {"show_all", "handler_days_to_birthday"}
+    assert set(dump["search_cache"]) == {"hits", "misses"}
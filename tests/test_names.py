@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from package import AddressBook, Record, ShardedAddressBook, SnapshotAddressBook, SQLiteAddressBook, write_snapshot
+from package.indexes import NameIndex
+
+NAMES = ["Anna", "Andrii", "Olena", "Oleh", "Serhii", "Sofiia", "Taras", "Iryna", "Їжак", "ann"]
+
+
+def filled(book: AddressBook, count: int = 200) -> AddressBook:
+    book.from_dict({f"{NAMES[i % len(NAMES)]}{i}": {"phones": [], "birthday": None} for i in range(count)})
+    return book
+
+
+@pytest.fixture(params=["memory", "snapshot", "sharded", "sqlite"])
+def book(request, tmp_path) -> AddressBook:
+    if request.param == "memory":
+        return filled(AddressBook())
+    if request.param == "snapshot":
+        write_snapshot(filled(AddressBook()), str(tmp_path / "book.snapshot"))
+        return SnapshotAddressBook(str(tmp_path / "book.snapshot"))
+    if request.param == "sharded":
+        sharded = filled(ShardedAddressBook(str(tmp_path / "shards"), shards=4))
+        sharded.save()
+        return ShardedAddressBook(str(tmp_path / "shards"))
+    return filled(SQLiteAddressBook(str(tmp_path / "book.db")))
+
+
+def brute_force(book: AddressBook, start: str, stop: str | None) -> list[str]:
+    return sorted(name for name in book if name >= start and (stop is None or name < stop))
+
+
+def test_prefix_and_range_follow_changes(book):
+    rand = random.Random(2)
+    for step in range(4):
+        for prefix in ["", "A", "An", "Anna1", "an", "O", "Ї", "Z", "Sofiia19"]:
+            assert book.prefix_names(prefix) == [name for name in brute_force(book, prefix, None) if name.startswith(prefix)]
+        assert book.prefix_names("A", limit=3) == brute_force(book, "A", "B")[:3]
+        assert [record.name.value for record in book.name_range("B", "P")] == brute_force(book, "B", "P")
+        assert book.prefix_names("Anna", limit=0) == []
+        # изменения - больше и меньше FEW_CHANGES за раз
+        for i in range(5 if step % 2 else NameIndex.FEW_CHANGES * 2):
+            name = rand.choice(list(book))
+            del book[name]
+            book.add_record(Record(f"{rand.choice(NAMES)}{step}_{i}", []))
+
+
+def test_completion_index_is_built_with_the_book(bot, monkeypatch):
+    class Readline:
+        __doc__ = "GNU readline"
+        line = ""
+
+        def set_completer(self, completer) -> None: ...
+        def parse_and_bind(self, text: str) -> None: ...
+        def get_line_buffer(self) -> str: return self.line
+        def get_begidx(self) -> int: return len(self.line)
+    readline = Readline()
+    monkeypatch.setattr(bot, "readline", readline)
+    filled(bot.a_book)
+    assert bot.a_book._name_index is None
+    bot.setup_completion()
+    assert bot.a_book._name_index is not None # не на первом Tab
+
+    completions = []
+    readline.line = "phone "
+    while (name := bot.complete("Ann", len(completions))) is not None:
+        completions.append(name)
+    assert completions == bot.a_book.prefix_names("Ann", bot.COMPLETION_LIMIT)
+    readline.line = ""
+    assert bot.complete("sh", 0) == "show" and bot.complete("sh", 1) is None
@@ -0,0 +1,64 @@
+import re
+
+import pytest
+
+from package import AddressBook, ParallelSearch, Record, ShardedAddressBook, SQLiteAddressBook
+
+
+def expected(book: AddressBook, pattern: str) -> list[str]:
+    compiled = re.compile(pattern)
+    return [name for name in book if compiled.search(book._search_text(name))]
+
+
+@pytest.fixture(params=["memory", "sharded", "sqlite"])
+def book(request, tmp_path) -> AddressBook:
+    book = {
+        "memory": lambda: AddressBook(),
+        "sharded": lambda: ShardedAddressBook(str(tmp_path / "shards"), shards=4),
+        "sqlite": lambda: SQLiteAddressBook(str(tmp_path / "book.db")),
+    }[request.param]()
+    for i in range(100):
+        book.add_record(Record(f"Name{i:03d}", [f"050{i:07d}"], "1990-06-15" if i % 2 else None))
+    return book
+
+
+def found(searcher: ParallelSearch, pattern: str, regex: bool = True) -> list[str]:
+    return [record.name.value for record in searcher.search(pattern, regex)]
+
+
+def test_changes_are_searched_without_restarting_the_pool(book):
+    with ParallelSearch(book, processes=2, threshold=50, chunk_size=30) as searcher:
+        assert found(searcher, r"Name0[0-4]\d") == expected(book, r"Name0[0-4]\d")
+        pool = searcher._pool
+        assert pool is not None
+
+        book["Name010"].add_phone("0671111111") # изменение на месте
+        del book["Name020"]
+        book.add_record(Record("Name020", ["0672222222"])) # удалено и добавлено снова - в конце
+        del book["Name030"]
+        book.add_record(Record("Extra", ["0673333333"]))
+        for pattern in [r"Name0[0-4]\d", r"067", r"^Extra", "1990-06"]:
+            assert found(searcher, pattern) == expected(book, pattern), pattern
+        assert found(searcher, "067", regex=False) == expected(book, "067")
+        assert searcher._pool is pool
+
+
+def test_many_changes_restart_the_pool(book):
+    with ParallelSearch(book, processes=2, threshold=50, chunk_size=30, max_changes=3) as searcher:
+        found(searcher, "Name")
+        pool = searcher._pool
+        for i in range(4):
+            book[f"Name{i:03d}"].add_phone(f"063{i:07d}")
+        assert found(searcher, "063") == expected(book, "063")
+        assert searcher._pool is not pool
+        assert searcher._changes == {}
+    assert book._change_logs == []
+
+
+def test_small_book_uses_the_index(book):
+    with ParallelSearch(book, threshold=1000) as searcher:
+        assert found(searcher, "Name05", regex=False) == [f"Name05{i}" for i in range(10)]
+        assert found(searcher, "Name05[0-2]") == ["Name050", "Name051", "Name052"]
+        assert searcher._pool is None
+        with pytest.raises(ValueError):
+            searcher.search("(", regex=True)
@@ -0,0 +1,54 @@
+import pytest
+
+from package import AddressBook, Record
+
+
+def names(records: list[Record]) -> list[str]:
+    return [record.name.value for record in records]
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_find_by_phone_follows_changes(lazy):
+    book = AddressBook()
+    book.from_dict({
+        "Ann": {"phones": ["0501234567", "0671234567"], "birthday": None},
+        "Bob": {"phones": ["0501234567"], "birthday": None},
+    }, lazy=lazy)
+    assert names(book.find_by_phone("050-123-45-67")) == ["Ann", "Bob"]
+    assert names(book.find_by_phone("+38 (067) 123 45 67")) == []
+
+    book["Ann"].change_phone("0671234567", "0931234567")
+    book["Bob"].remove_phone("0501234567")
+    book.add_record(Record("Cid", ["0671234567"]))
+    assert names(book.find_by_phone("0501234567")) == ["Ann"]
+    assert names(book.find_by_phone("0931234567")) == ["Ann"]
+    assert names(book.find_by_phone("0671234567")) == ["Cid"]
+
+    del book["Ann"]
+    assert book.find_by_phone("0501234567") == []
+    with pytest.raises(ValueError):
+        book.find_by_phone("123")
+
+
+def test_unique_phones():
+    book = AddressBook(unique_phones=True)
+    book.add_record(Record("Ann", ["0501234567"]))
+    with pytest.raises(ValueError, match="already belongs to contact 'Ann'"):
+        book.add_record(Record("Bob", ["050 123 45 67"]))
+    assert list(book) == ["Ann"]
+    book.add_record(Record("Bob", []))
+    with pytest.raises(ValueError):
+        book["Bob"].add_phone("0501234567")
+    assert book["Bob"].phones == []
+
+    del book["Ann"] # номер освободился
+    book["Bob"].add_phone("0501234567")
+    assert names(book.find_by_phone("0501234567")) == ["Bob"]
+
+
+def test_who_command(bot):
+    bot.a_book.add_record(Record("Ann", ["0501234567"]))
+    func_handler, data = bot.command_parser("who 050-123-45-67")
+    assert func_handler(data) == bot.a_book["Ann"].render()
+    assert bot.command_parser("who 0671234567")[0](["0671234567"]) == "nobody has phone 0671234567"
+    assert bot.find_by_phone_handler(["12"]).status == bot.STATUS_ERROR
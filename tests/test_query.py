@@ -0,0 +1,126 @@
+from datetime import date
+import random
+
+import pytest
+
+from package import AddressBook, Record, ShardedAddressBook, SnapshotAddressBook, SQLiteAddressBook, write_snapshot
+from package.query import (
+    And, BirthdayIs, BirthdayMonth, NameContains, NameIs, NameStartsWith, Or, PhoneContains, PhoneIs,
+    PhoneStartsWith, parse_query,
+)
+
+NAMES = ["Anna", "Andrii", "Olena", "Oleh", "Serhii", "Sofiia", "Taras", "Iryna"]
+
+
+def records(count: int = 300) -> list[Record]:
+    rand = random.Random(5)
+    result = []
+    for i in range(count):
+        birthday = None if i % 4 == 0 else date(1970 + i % 40, rand.randint(1, 12), rand.randint(1, 28)).isoformat()
+        phones = [f"38{rand.choice(['050', '066', '067'])}{rand.randint(0, 9999999):07d}" for _ in range(i % 3)]
+        result.append(Record(f"{NAMES[i % len(NAMES)]}{i}", phones, birthday))
+    return result
+
+
+@pytest.fixture(params=["memory", "snapshot", "sharded", "sqlite"])
+def book(request, tmp_path) -> AddressBook:
+    memory = AddressBook()
+    for record in records():
+        memory.add_record(record)
+    if request.param == "memory":
+        return memory
+    if request.param == "snapshot":
+        write_snapshot(memory, str(tmp_path / "book.snapshot"))
+        return SnapshotAddressBook(str(tmp_path / "book.snapshot"))
+    if request.param == "sharded":
+        sharded = ShardedAddressBook(str(tmp_path / "shards"), shards=4)
+        sharded.from_dict(memory.to_dict())
+        sharded.save()
+        return ShardedAddressBook(str(tmp_path / "shards"))
+    sqlite = SQLiteAddressBook(str(tmp_path / "book.db"))
+    sqlite.from_dict(memory.to_dict())
+    return sqlite
+
+
+def brute_force(book: AddressBook, query) -> list[str]:
+    return sorted(row[0] for row in book._rows() if query.match(row))
+
+
+QUERIES = [
+    NameIs("Anna0"),
+    NameStartsWith("Ole"),
+    NameContains("rii"),
+    NameContains("a"),
+    PhoneStartsWith("38066"),
+    PhoneContains("123"),
+    BirthdayMonth(6),
+    BirthdayMonth(6) & PhoneStartsWith("38066"),
+    BirthdayMonth(2) & NameContains("ii") & PhoneStartsWith("38"),
+    NameStartsWith("Tar") | BirthdayMonth(12),
+    NameStartsWith("Tar") | PhoneContains("12"),
+    (NameStartsWith("Ir") | NameStartsWith("Sof")) & BirthdayMonth(3),
+]
+
+
+@pytest.mark.parametrize("query", QUERIES, ids=str)
+def test_query_matches_brute_force(book, query):
+    expected = brute_force(book, query)
+    assert [record.name.value for record in book.find(query)] == expected
+
+
+def test_exact_phone_and_birthday(book):
+    record = next(record for record in book.values() if record.phones and record.birthday)
+    phone, birthday = record.phones[0].value, record.birthday.value
+    assert record.name.value in [found.name.value for found in book.find(PhoneIs(phone))]
+    assert record.name.value in [found.name.value for found in book.find(BirthdayIs(birthday))]
+    assert book.find(PhoneIs("0000000000")) == []
+
+
+def test_limit_and_offset(book):
+    query = BirthdayMonth(6) | BirthdayMonth(7)
+    everything = [record.name.value for record in book.find(query)]
+    assert len(everything) > 10
+    assert [record.name.value for record in book.find(query, limit=5, offset=3)] == everything[3:8]
+    assert book.find(query, offset=len(everything)) == []
+
+
+def test_plan_starts_with_the_most_selective_index():
+    book = AddressBook()
+    for record in records():
+        book.add_record(record)
+    steps = book.explain(BirthdayMonth(6) & NameIs("Anna0") & NameContains("nna"))
+    assert steps[0] == "and:"
+    assert steps[1].startswith("  index name=Anna0:")
+    assert "candidates are few" in steps[2]
+
+    steps = book.explain(NameContains("a") | NameIs("Anna0"))
+    assert steps[0].startswith("no index for name~a")
+    assert steps[1] == f"scan {len(book)} contacts"
+
+
+def test_and_or_are_flattened():
+    query = NameIs("a") & (NameIs("b") & NameIs("c"))
+    assert isinstance(query, And) and len(query.parts) == 3
+    query = NameIs("a") | NameIs("b") | NameIs("c")
+    assert isinstance(query, Or) and len(query.parts) == 3
+    assert str(BirthdayMonth(6) & (NameIs("a") | NameIs("b"))) == "month=6 and (name=a or name=b)"
+
+
+def test_parse_query():
+    query, limit, offset = parse_query(["name^An", "month=june", "or", "phone~067", "limit", "10", "offset", "5"])
+    assert isinstance(query, Or)
+    assert str(query) == "name^An and month=6 or phone~067"
+    assert (limit, offset) == (10, 5)
+
+    query, limit, offset = parse_query(["birthday=2000-02-29", "and", "phone=+38(050)123-45-67"])
+    assert repr(query) == "And(BirthdayIs(datetime.date(2000, 2, 29)), PhoneIs('380501234567'))"
+    assert (limit, offset) == (None, 0)
+
+
+@pytest.mark.parametrize("words", [
+    ["age=30"], ["name"], ["name^An", "or"], ["or", "name^An"], ["limit", "ten"],
+    ["month=13"], ["birthday=2000-13-01"], ["phone=abc"],
+])
+def test_parse_query_errors(words):
+    with pytest.raises(ValueError):
+        parse_query(words)
@@ -0,0 +1,114 @@
+import random
+import threading
+
+import pytest
+
+from package import AddressBook, Record, ShardedAddressBook, SnapshotAddressBook, ThreadSafeAddressBook, write_snapshot
+from package import address_book
+from package.indexes import NgramIndex
+
+NAMES = ["Anna", "Andrii", "Olena", "Oleh", "Serhii", "Sofiia", "Taras", "Iryna", "Ab", "Я"]
+
+
+def scan(book: AddressBook, word: str) -> list[str]:
+    """
+    The search as it was before the index: a substring of the text of every record, in book order.
+    """
+    return [record.name.value for record in book.values() if word in record.search_text()]
+
+
+def words(book: AddressBook, rand: random.Random) -> list[str]:
+    texts = [record.search_text() for record in book.values()]
+    found = []
+    for text in rand.sample(texts, min(20, len(texts))):
+        start = rand.randrange(len(text))
+        found.append(text[start:start + rand.randint(1, 6)])
+    return found + ["", " ", "0", "050", "-02-29", "nobody", "a 0", "Ab"]
+
+
+def change(book: AddressBook, rand: random.Random, count: int) -> None:
+    for i in range(count):
+        names = list(book)
+        name = rand.choice(names)
+        action = rand.randrange(5)
+        if action == 0:
+            del book[name]
+        elif action == 1:
+            book.add_record(Record(f"New{rand.choice(NAMES)}{i}", [f"063{rand.randrange(10 ** 7):07d}"]))
+        elif action == 2:
+            book[name].add_phone(f"067{rand.randrange(10 ** 7):07d}")
+        elif action == 3 and book[name].phones:
+            book[name].remove_phone(book[name].phones[0])
+        else:
+            book[name].change_birthday(f"19{rand.randint(50, 99)}-02-{rand.randint(1, 28):02d}")
+    # удаленный и добавленный снова контакт уходит в конец
+    name = next(iter(book))
+    data = book[name].to_dict()[name]
+    del book[name]
+    book.from_dict({name: data})
+
+
+def fill(book: AddressBook, count: int = 300) -> AddressBook:
+    rand = random.Random(1)
+    data = {}
+    for i in range(count):
+        phones = [f"{rand.choice(['050', '066', '380'])}{rand.randrange(10 ** 7):07d}" for _ in range(i % 3)]
+        birthday = None if i % 4 == 0 else f"{rand.randint(1950, 2005)}-{rand.randint(1, 12):02d}-{rand.randint(1, 28):02d}"
+        data[f"{NAMES[i % len(NAMES)]}{i}"] = {"phones": phones, "birthday": birthday}
+    book.from_dict(data, lazy=True)
+    return book
+
+
+@pytest.fixture(params=["memory", "thread_safe", "snapshot", "sharded"])
+def book(request, tmp_path) -> AddressBook:
+    if request.param == "memory":
+        return fill(AddressBook())
+    if request.param == "thread_safe":
+        return fill(ThreadSafeAddressBook())
+    if request.param == "snapshot":
+        write_snapshot(fill(AddressBook()), str(tmp_path / "book.snapshot"))
+        return SnapshotAddressBook(str(tmp_path / "book.snapshot"))
+    sharded = fill(ShardedAddressBook(str(tmp_path / "shards"), shards=4))
+    sharded.save()
+    return ShardedAddressBook(str(tmp_path / "shards"))
+
+
+def test_same_results_as_scan_after_changes(book):
+    rand = random.Random(7)
+    for _ in range(3):
+        for word in words(book, rand):
+            assert [record.name.value for record in book.search(word)] == scan(book, word), word
+        change(book, rand, 30)
+
+
+def test_background_index_gives_the_same_results(book, monkeypatch):
+    release = threading.Event()
+
+    class SlowIndex(NgramIndex):
+        def __init__(self, *args, **kwargs) -> None:
+            release.wait(5)
+            super().__init__(*args, **kwargs)
+    monkeypatch.setattr(address_book, "NgramIndex", SlowIndex)
+    monkeypatch.setattr(address_book, "BACKGROUND_INDEX", 10)
+    rand = random.Random(3)
+
+    for word in words(book, rand): # пока индекс строится - перебор
+        assert [record.name.value for record in book.search(word)] == scan(book, word), word
+    assert book._text_index is None and book._text_build is not None
+    change(book, rand, 30) # изменения во время постройки
+    release.set()
+    book._text_build.result()
+    for word in words(book, rand):
+        assert [record.name.value for record in book.search(word)] == scan(book, word), word
+    assert book._text_index is not None and book._change_logs == []
+
+
+def test_stale_index_is_rebuilt():
+    book = fill(AddressBook(), 20)
+    book.search("Anna")
+    index = book._text_index
+    for _ in range(1100): # postings засоряются старыми текстами
+        book["Anna0"].add_phone("0501234567")
+        book["Anna0"].remove_phone("0501234567")
+    assert book._text_index is not index
+    assert [record.name.value for record in book.search("Anna")] == scan(book, "Anna")
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+async def ask(port: int, *lines: str) -> list[tuple[int, list[str]]]:
+    """
+    Send the lines at once (pipelined) and read a framed reply for each of them.
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write("".join(f"{line}\n" for line in lines).encode("utf-8"))
+    await writer.drain()
+    replies = []
+    for _ in lines:
+        status, count = (await reader.readline()).decode("utf-8").split()
+        replies.append((int(status), [(await reader.readline()).decode("utf-8").rstrip("\n") for _ in range(int(count))]))
+    writer.close()
+    await writer.wait_closed()
+    return replies
+
+
+def talk(*clients: tuple[str, ...]) -> list[list[tuple[int, list[str]]]]:
+    """
+    Start the server on a free port of localhost and run the clients at the same time.
+    """
+    async def run():
+        tcp = await asyncio.start_server(server.serve_client, "127.0.0.1", 0)
+        port = tcp.sockets[0].getsockname()[1]
+        async with tcp:
+            return await asyncio.gather(*(ask(port, *lines) for lines in clients))
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def bot(bot, monkeypatch):
+    monkeypatch.setattr(server, "bot", bot)
+    return bot
+
+
+def test_error_in_chunked_reply_keeps_its_status(bot):
+    bot.a_book.from_dict({
+        "Ann": {"phones": ["0501234567"], "birthday": None},
+        "Bad": {"phones": ["12"], "birthday": None}, # проверится только при выводе
+    }, lazy=True)
+    [[(status, lines)]] = talk(("show all",))
+    assert status == bot.STATUS_ERROR
+    assert lines[-1] == "Input error: Phone number 12 isn't correct."
+
+
+def test_framing_and_pipelining(bot):
+    [replies] = talk((
+        "add Ann 0501234567", "add Ann 0501234567", "who 0501234567", "dance", "show all",
+    ))
+    assert [status for status, _ in replies] == [
+        bot.STATUS_OK, bot.STATUS_ERROR, bot.STATUS_OK, bot.STATUS_UNKNOWN, bot.STATUS_OK,
+    ]
+    assert replies[0][1][1:] == ["\tname: Ann", "\tphones: 0501234567", "\tbirthday: Empty", " has be added"]
+    assert replies[3][1] == ["Unknown command"]
+    assert replies[4][1] == bot.a_book["Ann"].render().split("\n")
+
+
+def test_page_cursor_of_each_connection(bot):
+    for i in range(5):
+        bot.a_book.from_dict({f"Name{i}": {"phones": [f"050000000{i}"], "birthday": None}})
+    first, second = talk(
+        ("next", "show page 2", "next", "next", "next"),
+        ("show page 3", "next", "next"),
+    )
+    assert first[0][0] == bot.STATUS_ERROR # курсора еще нет
+    assert [lines[0] for _, lines in first[1:]] == [
+        f'{"-" * 15} Page 1 {"-" * 15}', f'{"-" * 15} Page 2 {"-" * 15}',
+        f'{"-" * 15} Page 3 {"-" * 15}', f'{"-" * 15} end {"-" * 15}',
+    ]
+    assert first[3][1][1:] == bot.a_book["Name4"].render().split("\n")
+    assert [lines[0] for _, lines in second] == [
+        f'{"-" * 15} Page 1 {"-" * 15}', f'{"-" * 15} Page 2 {"-" * 15}', f'{"-" * 15} end {"-" * 15}',
+    ]
+
+
+def test_clients_share_the_book(bot):
+    talk(*((f"add Name{i} 050000000{i}", f"add phone Name{i} 067000000{i}") for i in range(10)))
+    assert len(bot.a_book) == 10
+    assert [phone.value for phone in bot.a_book["Name7"].phones] == ["0500000007", "0670000007"]
+    [[(status, lines)]] = talk(("exit",))
+    assert (status, lines) == (bot.STATUS_OK, ["Good bye!"])
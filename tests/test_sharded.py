@@ -0,0 +1,95 @@
+import json
+import os
+
+from package import AddressBook, Record, ShardedAddressBook
+from package import sharded
+
+
+def fill(book: AddressBook, count: int) -> None:
+    for i in range(count):
+        book.add_record(Record(f"Name{i:03d}", [f"050{i:07d}"], "1990-06-15" if i % 3 else None))
+
+
+def saved_book(path, count: int = 40) -> ShardedAddressBook:
+    book = ShardedAddressBook(str(path), shards=4)
+    fill(book, count)
+    book.save()
+    return book
+
+
+def test_roundtrip_keeps_insertion_order(tmp_path):
+    book = saved_book(tmp_path)
+    del book["Name005"]
+    book.add_record(Record("Aaron", ["0671234567"]))
+    book.save()
+
+    loaded = ShardedAddressBook(str(tmp_path))
+    assert loaded.shards == 4
+    assert len(loaded) == len(book) == 40
+    assert list(loaded) == list(book)
+    assert list(loaded)[-1] == "Aaron"
+    assert loaded.to_dict() == book.to_dict()
+
+
+def test_lookup_reads_only_its_shard(tmp_path):
+    saved_book(tmp_path)
+    book = ShardedAddressBook(str(tmp_path))
+    assert len(book) == 40 # из манифеста, шарды не прочитаны
+    assert not book._members
+
+    record = book["Name007"]
+    assert record.phones[0].value == "0500000007"
+    assert list(book._members) == [sharded.shard_of("Name007", 4)]
+    assert "Nobody" not in book
+
+
+def test_save_rewrites_only_changed_shards(tmp_path, monkeypatch):
+    saved_book(tmp_path)
+    book = ShardedAddressBook(str(tmp_path))
+    book["Name007"].add_phone("0670000007")
+    write_atomic, written = sharded._write_atomic, []
+
+    def counting(path, lines):
+        written.append(os.path.basename(path))
+        write_atomic(path, lines)
+    monkeypatch.setattr(sharded, "_write_atomic", counting)
+    book.save()
+
+    assert written == [sharded.MANIFEST, f"shard-{sharded.shard_of('Name007', 4):03d}.jsonl"]
+    assert ShardedAddressBook(str(tmp_path))["Name007"].phones[-1].value == "0670000007"
+
+
+def test_shards_keep_journal_seq(tmp_path):
+    book = saved_book(tmp_path)
+    book.journal_seq = 7
+    book["Name001"].add_phone("0670000001")
+    book.save()
+
+    shard = sharded.shard_of("Name001", 4)
+    with open(os.path.join(tmp_path, f"shard-{shard:03d}.jsonl"), encoding="utf-8") as file:
+        assert json.loads(file.readline()) == {"__journal_seq__": 7}
+    loaded = ShardedAddressBook(str(tmp_path))
+    assert loaded.journal_seq == 7
+    assert loaded._saved_seq("Name001") == 7
+    other = next(name for name in book if sharded.shard_of(name, 4) != shard)
+    assert loaded._saved_seq(other) == 0 # шард записан раньше
+
+
+def test_counts_follow_shards_after_crash(tmp_path):
+    book = saved_book(tmp_path)
+    with open(os.path.join(tmp_path, sharded.MANIFEST), encoding="utf-8") as file:
+        manifest = json.load(file)
+    manifest["counts"] = [0] * 4 # манифест остался от прошлого сохранения
+    with open(os.path.join(tmp_path, sharded.MANIFEST), "w", encoding="utf-8") as file:
+        json.dump(manifest, file)
+
+    loaded = ShardedAddressBook(str(tmp_path))
+    assert list(loaded) == list(book)
+    assert len(loaded) == 40
+
+
+def test_search_and_query_read_all_shards(tmp_path):
+    saved_book(tmp_path)
+    book = ShardedAddressBook(str(tmp_path))
+    assert [record.name.value for record in book.search("Name01")] == [f"Name{i:03d}" for i in range(10, 20)]
+    assert len(book.name_range("Name010", "Name020")) == 10
@@ -0,0 +1,34 @@
+from package import AddressBook, Record, SnapshotAddressBook, write_snapshot
+
+
+class Materialized(SnapshotAddressBook):
+    """
+    Remembers the contacts turned into records, through the signature of AddressBook.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.calls = []
+        super().__init__(*args, **kwargs)
+
+    def _materialize(self, name: str, raw: tuple[list[str], str | None]) -> Record:
+        self.calls.append((name, raw))
+        return super()._materialize(name, raw)
+
+
+def test_materialize_keeps_the_signature_of_address_book(tmp_path):
+    path = str(tmp_path / "book.snapshot")
+    memory = AddressBook()
+    memory.add_record(Record("Ann", ["0501234567"], "2000-02-29"))
+    memory.add_record(Record("Bob", []))
+    write_snapshot(memory, path)
+
+    book = Materialized(path)
+    record = book["Ann"]
+    assert book.calls == [("Ann", (["0501234567"], "2000-02-29"))]
+    assert record.book is book and book["Ann"] is record
+    assert [record.name.value for record in book.values()] == ["Ann", "Bob"]
+    assert book.calls[1:] == [("Bob", ([], None))]
+
+    record.add_phone("0671234567") # запись из файла меняет индексы книги
+    assert [found.name.value for found in book.search("067")] == ["Ann"]
+    book.close()
@@ -0,0 +1,126 @@
+import io
+import json
+
+import pytest
+
+from package import AddressBook, Record, load_json, save_json
+from package.storage import CONTACTS, JOURNAL_SEQ, iter_json_contacts
+
+
+def small_book() -> AddressBook:
+    book = AddressBook()
+    book.add_record(Record("Ann", ["0501234567"], "2000-02-29"))
+    book.add_record(Record("Bob", ["0671234567", "0931234567"]))
+    return book
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 40))
+def test_numbers_cut_by_the_chunk_boundary(chunk_size):
+    text = f'{{"{JOURNAL_SEQ}": 1234567, "{CONTACTS}": {{"Ann": {{"phones": [], "birthday": null}}}}}}'
+    assert list(iter_json_contacts(io.StringIO(text), chunk_size)) == [
+        (JOURNAL_SEQ, 1234567), ("Ann", {"phones": [], "birthday": None}),
+    ]
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+def test_journal_seq_is_kept_out_of_the_contacts(tmp_path, suffix):
+    path = str(tmp_path / f"book{suffix}")
+    book = small_book()
+    book.journal_seq = 1234567
+    save_json(book, path)
+
+    loaded = AddressBook()
+    load_json(loaded, path, lazy=True)
+    assert loaded.journal_seq == 1234567
+    assert loaded.to_dict() == book.to_dict()
+    if suffix == ".json":
+        with open(path, encoding="utf-8") as file:
+            plain = AddressBook()
+            plain.from_dict(json.load(file)[CONTACTS])
+        assert plain.to_dict() == book.to_dict()
+
+
+def test_book_without_journal_seq_stays_plain(tmp_path):
+    path = str(tmp_path / "book.json")
+    save_json(small_book(), path)
+    with open(path, encoding="utf-8") as file:
+        assert set(json.load(file)) == {"Ann", "Bob"}
+    loaded = AddressBook()
+    load_json(loaded, path)
+    assert loaded.journal_seq == 0 and list(loaded) == ["Ann", "Bob"]
+
+
+def test_contact_named_like_the_wrapper(tmp_path):
+    path = tmp_path / "book.json"
+    path.write_text(json.dumps({CONTACTS: {"phones": [], "birthday": None}}), encoding="utf-8")
+    book = AddressBook()
+    load_json(book, str(path))
+    assert list(book) == [CONTACTS]
+
+
+@pytest.mark.parametrize("text", [
+    '{"Ann": 5}', '{"Ann": {"phones": [], "birthday": null}} extra', f'{{"{JOURNAL_SEQ}": 5, "people": {{}}}}', '{"Ann"',
+])
+def test_invalid_files(tmp_path, text):
+    path = tmp_path / "book.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_json(AddressBook(), str(path))
+
+
+def generated_contacts(count: int = 200) -> dict:
+    return {
+        f'Name {i} "Ї\\\\{chr(0x1F600 + i % 5)}': {
+            "phones": [f"050{i:07d}"] * (i % 3),
+            "birthday": None if i % 2 else f"19{50 + i % 50}-0{1 + i % 9}-1{i % 10}",
+        }
+        for i in range(count)
+    }
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 16])
+@pytest.mark.parametrize("indent", [None, 4])
+def test_contacts_are_streamed_like_json_load(chunk_size, indent):
+    contacts = generated_contacts()
+    text = json.dumps(contacts, indent=indent, ensure_ascii=indent is None)
+    assert list(iter_json_contacts(io.StringIO(text), chunk_size)) == list(contacts.items())
+    assert list(iter_json_contacts(io.StringIO(" { } \n"), chunk_size)) == []
+
+
+def test_first_contact_comes_before_the_file_is_read():
+    text = json.dumps(generated_contacts())
+    file = io.StringIO(text)
+    contacts = iter_json_contacts(file, 256)
+    next(contacts)
+    assert file.tell() <= 512 < len(text)
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+@pytest.mark.parametrize("lazy", [False, True])
+def test_load_what_was_saved(tmp_path, suffix, lazy):
+    path = str(tmp_path / f"book{suffix}")
+    book = AddressBook()
+    book.from_dict(generated_contacts())
+    save_json(book, path)
+    loaded = AddressBook()
+    load_json(loaded, path, lazy)
+    assert list(loaded) == (sorted(book) if suffix == ".json" else list(book)) # json пишется с sort_keys
+    assert loaded.to_dict() == book.to_dict()
+    assert sorted(record.name.value for record in loaded.search("Name 1")) == sorted(
+        record.name.value for record in book.search("Name 1")
+    )
+
+
+def test_jsonl_lines(tmp_path):
+    path = tmp_path / "book.jsonl"
+    path.write_text(
+        '{"Ann": {"phones": [], "birthday": null}}\n\n'
+        '{"Bob": {"phones": ["0501234567"], "birthday": null}, "Cid": {"phones": [], "birthday": "2000-02-29"}}\n',
+        encoding="utf-8",
+    )
+    book = AddressBook()
+    load_json(book, str(path))
+    assert list(book) == ["Ann", "Bob", "Cid"]
+    path.write_text('{"Ann": {"phones": [], "birthday": null}}\n[1, 2]\n', encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_json(AddressBook(), str(path))